@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTML字段提取基准测试
+对比重构前的BeautifulSoup逐选择器提取与 html_extractor 的lxml单次遍历引擎，
+校验两者提取的字段一致并报告每页解析时间
+
+用法: python benchmarks/bench_extract.py [HTML文件 ...]
+不提供文件时使用按微博文章页结构生成的页面（包括几种不规范标记的页面）；也可以传入调试模式保存的 article_debug_*.html
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import contextlib
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+import html_extractor
+from legacy_html_extract import LegacySoupExtractor
+
+SAMPLE_JSON = os.path.join(REPO_DIR, 'ttarticle_chapters_20250724_002808.json')
+COMPARED_FIELDS = ['title', 'author', 'author_uid', 'publish_time', 'content', 'next_chapter_url', 'scripts']
+
+
+def sample_paragraphs():
+    """样本书中第一个有正文的章节（第一章只有不可见字符，提取不到正文，无法比较正文字段）"""
+    with open(SAMPLE_JSON, 'r', encoding='utf-8') as f:
+        chapters = json.load(f)['all_chapters']
+    for chapter in chapters:
+        paragraphs = [line for line in chapter['content'].split('\n') if line.strip()]
+        if len(paragraphs) >= 20:
+            return chapter['title'], paragraphs
+    return chapters[0]['title'], [line for line in chapters[0]['content'].split('\n') if line.strip()]
+
+
+def page_header(title):
+    nav = ''.join(f'<li><a href="https://weibo.com/u/{1000 + i}" class="nav-link">频道{i}</a></li>' for i in range(60))
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title} - 微博</title>
+<style>.WB_text {{ line-height: 1.8; }}</style>
+<script>var $CONFIG = {{}}; $CONFIG['uid'] = '5192590544'; $CONFIG['lang'] = 'zh-cn';</script>
+</head><body><div class="WB_frame"><div class="gn_header"><ul class="gn_nav">{nav}</ul></div>
+"""
+
+
+def comments(count):
+    return ''.join(
+        f'<div class="list_li"><div class="WB_face"><img src="/face/{i}.jpg"></div>'
+        f'<div class="list_con"><div class="WB_text"><a href="https://weibo.com/u/{2000 + i}" class="W_f14">评论用户{i}</a>：'
+        f'第{i}条评论<!-- c{i} --></div><div class="WB_func"><span class="time">07-24 00:{i % 60:02d}</span></div></div></div>\n'
+        for i in range(count))
+
+
+def ttarticle_page(title, paragraphs):
+    """weibo.com/ttarticle/p/show 页面：正文在 WB_editor_iframe_new 中，评论区有大量用户链接"""
+    body = '\n'.join(f'<p>{line}<br>　</p>' for line in paragraphs)
+    return page_header(title) + f"""<div class="WB_artical"><div class="WB_detail">
+<h1 class="title">{title}</h1>
+<div class="WB_info"><a href="https://weibo.com/u/5192590544" class="W_f14 author">作者昵称 </a></div>
+<div class="time">2025-07-24 00:28</div>
+<div class="WB_editor_iframe_new" node-type="contentBody">{body}</div>
+<div class="special-button"><a href="/ttarticle/p/show?id=2309405192590544797954" title="下一篇">下一篇：下一章标题</a></div>
+</div><div class="WB_feed_repeat">{comments(150)}</div></div></div></body></html>"""
+
+
+def card_page(title, paragraphs):
+    """card.weibo.com/article/m/show 移动版页面：正文在 .article-content 中，下一章只能按链接文字找到"""
+    body = ''.join(f'<div>{line}</div>' for line in paragraphs)
+    return page_header(title) + f"""<div class="main"><h2 class="article-title">{title}</h2>
+<div class="user-info"><span class="screen-name">作者昵称</span><span class="publish-time">07-24</span></div>
+<div class="article-content">{body}</div>
+<a href="https://weibo.com/ttarticle/x/m/show#/id=2309405192590544797954"><span>下一页</span></a>
+{comments(40)}</div></div></body></html>"""
+
+
+def script_page(title, paragraphs):
+    """正文只出现在内嵌JSON中的页面"""
+    long_text = '<br />'.join(paragraphs).replace('"', '\\"')
+    return page_header(title) + f"""<div id="app" data-author="作者昵称"></div>
+<script>window.__DATA__ = {{"status": {{"longTextContent": "{long_text}", "id": 1}}}};</script>
+</div></body></html>"""
+
+
+def malformed_pages(title, paragraphs):
+    """
+    不规范的标记：lxml会修正结构而html.parser按字面嵌套，
+    html_extractor 应改用html.parser建树，字段仍与原实现一致
+    """
+    page = ttarticle_page(title, paragraphs)
+    return [
+        # <p>中嵌套<div>：lxml在<div>处提前闭合<p>
+        ('malformed: div in p', page.replace('<br>　</p>', '<div class="note">（注）</div>　</p>')),
+        # 未闭合的<p>：lxml在下一个<p>处隐式闭合
+        ('malformed: unclosed p', page.replace('<br>　</p>', '<br>　')),
+        # 嵌套的<a>：lxml把内层链接拆到外层之后
+        ('malformed: nested a', page.replace('<a href="https://weibo.com/u/5192590544" class="W_f14 author">作者昵称 </a>',
+                                             '<a href="https://weibo.com/u/5192590544" class="W_f14 author">作者'
+                                             '<a href="https://weibo.com/u/5192590544?from=nick">X</a></a>')),
+        # 非空元素的自闭合写法：html.parser视为空元素，lxml忽略斜杠
+        ('malformed: self-closing div', page.replace('<div class="time">', '<div class="clear"/><div class="time">')),
+    ]
+
+
+def generated_pages():
+    title, paragraphs = sample_paragraphs()
+    return [
+        ('ttarticle/p/show', ttarticle_page(title, paragraphs)),
+        ('card m/show', card_page(title, paragraphs)),
+        ('script longTextContent', script_page(title, paragraphs)),
+    ] + malformed_pages(title, paragraphs)
+
+
+def legacy_extract(html_content):
+    fields = LegacySoupExtractor().extract_article_fields(html_content)
+    if not fields.get('author') and fields.get('data_author'):
+        fields['author'] = fields['data_author']
+    return fields
+
+
+def lxml_extract(html_content):
+    fields = html_extractor.extract_article_fields(html_content)
+    if not fields['author'] and fields['data_author']:
+        fields['author'] = fields['data_author']
+    return fields
+
+
+def comparable(fields):
+    return {key: fields.get(key) or None for key in COMPARED_FIELDS}
+
+
+def best_time(func, html_content, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.process_time()
+        func(html_content)
+        best = min(best, time.process_time() - started)
+    return best
+
+
+def main():
+    if len(sys.argv) > 1:
+        pages = []
+        for path in sys.argv[1:]:
+            with open(path, 'r', encoding='utf-8') as f:
+                pages.append((os.path.basename(path), f.read()))
+    else:
+        pages = generated_pages()
+
+    mismatches = 0
+    print(f"{'页面':<28}{'大小 KB':>9}{'soup ms':>10}{'lxml ms':>10}{'加速比':>8}  字段一致")
+    for name, html_content in pages:
+        with contextlib.redirect_stdout(io.StringIO()):
+            same = comparable(legacy_extract(html_content)) == comparable(lxml_extract(html_content))
+            legacy = best_time(legacy_extract, html_content, 5)
+            engine = best_time(lxml_extract, html_content, 5)
+        mismatches += not same
+        size_kb = len(html_content.encode('utf-8')) / 1024
+        print(f"{name[:27]:<28}{size_kb:>9.1f}{legacy * 1000:>10.2f}{engine * 1000:>10.2f}"
+              f"{legacy / engine if engine else float('inf'):>7.1f}x  {'是' if same else '否'}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文本规范化基准测试
+对比重构前的多遍处理流程与 text_normalizer 的单遍引擎，校验输出逐字节一致并报告吞吐量（MB/s）
+
+用法: python benchmarks/bench_normalize.py [Markdown文件]
+"""
+
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+import legacy_pipeline
+import text_normalizer
+from weibo_ttarticle_crawler import MARKDOWN_QUOTES
+
+DEFAULT_SAMPLE = os.path.join(REPO_DIR, 'ttarticle_chapters_20250724_002808.md')
+
+
+def legacy_normalize(text):
+    return legacy_pipeline.convert_to_simplified_fullwidth(legacy_pipeline.add_pangu_spacing(text))
+
+
+def fused_normalize(text):
+    return text_normalizer.normalize_text(text, **MARKDOWN_QUOTES)
+
+
+def best_time(func, text, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    sample_file = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_SAMPLE
+    with open(sample_file, 'r', encoding='utf-8') as f:
+        text = f.read()
+    size_mb = len(text.encode('utf-8')) / (1024 * 1024)
+    
+    identical = legacy_normalize(text) == fused_normalize(text)
+    legacy_seconds = best_time(legacy_normalize, text, 3)
+    fused_seconds = best_time(fused_normalize, text, 3)
+    
+    print(f"样本: {sample_file} ({size_mb:.2f} MB)")
+    print(f"输出一致: {'是' if identical else '否'}")
+    print(f"原流程: {legacy_seconds * 1000:.1f} ms, {size_mb / legacy_seconds:.2f} MB/s")
+    print(f"单遍引擎: {fused_seconds * 1000:.1f} ms, {size_mb / fused_seconds:.2f} MB/s")
+    print(f"加速比: {legacy_seconds / fused_seconds:.2f}x")
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+详情接口响应解析基准测试
+用各接口典型结构的响应测量公开的 get_article_content 解码和解析每章的CPU时间：
+被测接口返回构造的响应，其他接口返回404，不发送网络请求（同时替换 request 和 session.get，
+最早的版本没有 request 方法）；
+指定 --baseline 时从该git版本加载爬虫模块进行对比（包括优化前的原始版本），
+并校验基线解析出的字段在当前版本中保持一致（当前版本可以多解析出字段）
+
+用法: python benchmarks/bench_parse.py [--baseline REV] [--repeat N]
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import argparse
+import contextlib
+import subprocess
+import importlib.util
+
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+
+import weibo_ttarticle_crawler
+from weibo_ttarticle_crawler import CachedResponse
+
+SAMPLE_JSON = os.path.join(REPO_DIR, 'ttarticle_chapters_20250724_002808.json')
+ARTICLE_ID = '2309405192590544797953'
+NEXT_ID = '2309405192590544797954'
+
+
+def sample_chapter():
+    """取样例输出中第一个有正文的章节作为响应正文（第一章只有不可见字符）"""
+    with open(SAMPLE_JSON, 'r', encoding='utf-8') as f:
+        chapters = json.load(f)['all_chapters']
+    chapter = next((chapter for chapter in chapters if len(chapter['content'].strip()) > 1000), chapters[0])
+    return chapter['title'], chapter['content']
+
+
+def as_response(url, body, content_type):
+    if not isinstance(body, str):
+        body = json.dumps(body, ensure_ascii=False)
+    return CachedResponse(url, 200, {'Content-Type': content_type}, body.encode('utf-8'), 'utf-8')
+
+
+def as_live_response(url, body):
+    """未声明编码的requests.Response，读取text时需要检测编码"""
+    response = requests.Response()
+    response.status_code = 200
+    response.headers['Content-Type'] = 'application/json'
+    response._content = json.dumps(body, ensure_ascii=False).encode('utf-8')
+    response.encoding = None
+    return response
+
+
+def build_fixtures():
+    """构造各详情接口的典型响应：（名称, 接口序号, URL, 响应）"""
+    title, content = sample_chapter()
+    html_content = ''.join(f"<p>{line}</p>" for line in content.split('\n') if line)
+    status = {'longTextContent': content.replace('\n', '<br />'),
+              'user': {'id': 5192590544, 'screen_name': '作者'}, 'created_at': 'Thu Jul 24 00:28:08 +0800 2025'}
+    detail = {'code': '100000', 'msg': '', 'data': {
+        'title': title, 'uid': 5192590544, 'author': '作者', 'create_at': '2025-07-24',
+        'content': html_content, 'sibling': {'next': {'id': NEXT_ID, 'title': '下一章',
+                                                       'url': f"https://weibo.com/ttarticle/p/show?id={NEXT_ID}"}}}}
+    detail_url = f"https://weibo.com/ttarticle/x/m/aj/detail?id={ARTICLE_ID}"
+    fixtures = [
+        ('ttarticle detail (code=100000)', 1, detail_url, as_response('', detail, 'application/json;charset=utf-8')),
+        ('ttarticle detail, no charset', 1, detail_url, as_live_response('', detail)),
+        ('statuses/extend (ok=1)', 2, f"https://m.weibo.cn/statuses/extend?id={ARTICLE_ID}",
+         as_response('', {'ok': 1, 'data': status}, 'application/json; charset=utf-8')),
+        ('statuses/longtext (text/html JSON)', 3, f"https://weibo.com/ajax/statuses/longtext?id={ARTICLE_ID}",
+         as_response('', {'ok': 1, 'http_code': 200, 'data': {'longTextContent': status['longTextContent']}},
+                     'text/html; charset=utf-8')),
+        ('empty JSON (ok=0)', 6, f"https://weibo.com/ajax/statuses/show?id={ARTICLE_ID}",
+         as_response('', {'ok': 0, 'message': 'not found', 'url': '', 'data': {}}, 'application/json')),
+        ('article HTML page', 5, f"https://weibo.com/ttarticle/p/show?id={ARTICLE_ID}",
+         as_response('', f"""<html><head><meta charset="utf-8"><title>{title}</title></head><body>
+<div class="WB_detail"><div class="author"><a href="/u/5192590544">作者</a></div><div class="time">2025-07-24</div>
+<div class="WB_editor_iframe_new" node-type="contentBody">{html_content}</div>
+<a href="/ttarticle/p/show?id={NEXT_ID}">下一章</a></div></body></html>""", 'text/html; charset=utf-8')),
+    ]
+    for _, _, url, response in fixtures:
+        response.url = url
+    return fixtures
+
+
+class NoSleepTime:
+    """代替基线模块中的time模块：原始版本在接口之间time.sleep(1)，基准测试中跳过等待"""
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+    @staticmethod
+    def sleep(seconds):
+        pass
+
+
+def load_baseline(rev):
+    """从git版本加载爬虫模块"""
+    source = subprocess.run(['git', 'show', f"{rev}:weibo_ttarticle_crawler.py"], cwd=REPO_DIR,
+                            check=True, capture_output=True).stdout
+    spec = importlib.util.spec_from_loader("baseline_crawler", loader=None)
+    module = importlib.util.module_from_spec(spec)
+    exec(compile(source, f"{rev}:weibo_ttarticle_crawler.py", 'exec'), module.__dict__)
+    module.time = NoSleepTime()
+    return module
+
+
+def make_crawler(module, url, response):
+    with contextlib.redirect_stdout(io.StringIO()):
+        crawler = module.WeiboTTArticleCrawler()
+    not_found = CachedResponse(url, 404, {'Content-Type': 'text/html'}, b'', 'utf-8')
+
+    # 不发送网络请求：被测接口返回构造的响应，其他接口返回404
+    def respond(request_url, *args, **kwargs):
+        return response if request_url == url else not_found
+
+    crawler.request = respond
+    crawler.session.get = respond
+    return crawler
+
+
+def parse_once(crawler):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return crawler.get_article_content(ARTICLE_ID)
+
+
+def same_fields(current, previous):
+    """基线解析出的每个字段在当前结果中都相同"""
+    if current is None or previous is None:
+        return current is previous
+    return all(current.get(key) == value for key, value in previous.items())
+
+
+def best_time(crawler, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.process_time()
+        parse_once(crawler)
+        best = min(best, time.process_time() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='详情接口响应解析基准测试')
+    parser.add_argument('--baseline', metavar='REV', help='对比的git版本（例如优化前的提交）')
+    parser.add_argument('--repeat', type=int, default=20, help='每种响应的重复次数，取最快一次 (默认: 20)')
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.baseline) if args.baseline else None
+    mismatches = 0
+    print(f"{'响应类型':<36}{'当前 ms':>10}" + (f"{'基线 ms':>10}{'加速比':>8}" if baseline else ''))
+    for name, i, url, response in build_fixtures():
+        current_crawler = make_crawler(weibo_ttarticle_crawler, url, response)
+        current = best_time(current_crawler, args.repeat)
+        line = f"{name:<36}{current * 1000:>10.3f}"
+        if baseline:
+            baseline_crawler = make_crawler(baseline, url, response)
+            previous = best_time(baseline_crawler, args.repeat)
+            line += f"{previous * 1000:>10.3f}{previous / current if current else float('inf'):>7.1f}x"
+            if not same_fields(parse_once(current_crawler), parse_once(baseline_crawler)):
+                mismatches += 1
+                line += '  结果不一致'
+        print(line)
+    if baseline:
+        print(f"解析结果一致: {'是' if not mismatches else f'否（{mismatches} 种响应不一致）'}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+重构前基于BeautifulSoup（html.parser）的HTML字段提取，原样保留作为 html_extractor 的对照基准
+每个选择器单独调用一次 select_one，下一章链接再全量扫描一次 <a> 标签
+"""
+
+import re
+from bs4 import BeautifulSoup
+
+import legacy_pipeline
+
+
+class LegacySoupExtractor:
+    def add_pangu_spacing(self, text):
+        """添加盘古之白：使用重构前的逐条re.sub实现"""
+        return legacy_pipeline.add_pangu_spacing(text)
+    
+    def extract_formatted_text(self, element):
+        """提取保留换行格式的文本内容"""
+        if not element:
+            return ''
+        
+        # 处理段落标签，保留换行
+        for p in element.find_all('p'):
+            p.append('\n\n')
+        
+        # 处理换行标签
+        for br in element.find_all('br'):
+            br.replace_with('\n')
+        
+        # 处理div标签，在末尾添加换行
+        for div in element.find_all('div'):
+            div.append('\n')
+        
+        # 获取文本并清理多余的空行
+        text = element.get_text()
+        # 将多个连续的换行符替换为最多两个
+        text = re.sub(r'\n{3,}', '\n\n', text)
+        
+        # 应用盘古之白格式化
+        text = self.add_pangu_spacing(text)
+        
+        return text.strip()
+    
+    def find_next_chapter_url(self, soup):
+        """查找下一章的URL"""
+        # 查找下一篇文章的链接
+        next_selectors = [
+            'a[href*="ttarticle"][title*="下一篇"]',
+            'a[href*="ttarticle"]:contains("下一篇")',
+            'a[href*="ttarticle"]:contains("下一章")',
+            '.special-button a[href*="ttarticle"]',
+            'a[href*="show?id="]:contains("下")',
+        ]
+        
+        for selector in next_selectors:
+            try:
+                next_link = soup.select_one(selector)
+                if next_link and next_link.get('href'):
+                    href = next_link.get('href')
+                    # 确保是完整的URL
+                    if href.startswith('http'):
+                        return href
+                    elif href.startswith('/'):
+                        return f"https://weibo.com{href}"
+                    else:
+                        return f"https://weibo.com/ttarticle/p/{href}"
+            except:
+                continue
+        
+        # 如果没有找到，尝试通过文本查找
+        links = soup.find_all('a', href=True)
+        for link in links:
+            link_text = link.get_text(strip=True)
+            if any(keyword in link_text for keyword in ['下一篇', '下一章', '下一页']):
+                href = link.get('href')
+                if 'ttarticle' in href or 'show?id=' in href:
+                    if href.startswith('http'):
+                        return href
+                    elif href.startswith('/'):
+                        return f"https://weibo.com{href}"
+        
+        return None
+    
+    def extract_article_fields(self, html_content):
+        """返回与 html_extractor.extract_article_fields 对应的字段（标题、作者、UID、时间、正文、下一章、script）"""
+        article_data = {'title': '', 'content': '', 'author': '', 'publish_time': '', 'next_chapter_url': None}
+        
+        soup = BeautifulSoup(html_content, 'html.parser')
+        
+        # 查找标题
+        title_selectors = [
+            'title',
+            'h1.title',
+            '.WB_detail .title',
+            '.article-title',
+            '[class*="title"]'
+        ]
+        
+        for selector in title_selectors:
+            title_elem = soup.select_one(selector)
+            if title_elem and title_elem.get_text(strip=True):
+                title_text = title_elem.get_text(strip=True)
+                # 清理标题中的网站名称
+                if '微博' in title_text:
+                    title_text = title_text.split('微博')[0].strip()
+                article_data['title'] = title_text
+                print(f"从HTML提取标题: {title_text}")
+                break
+        
+        # 查找作者信息
+        author_selectors = [
+            '.WB_detail .author',
+            '.author-name',
+            '.username',
+            '.user-name',
+            '.screen-name',
+            '.nickname',
+            '.WB_detail .WB_cardwrap .WB_info .W_f14',
+            '.WB_info .W_f14',
+            '.author',
+            '.user',
+            '[class*="author"]',
+            '[class*="user"]',
+            '[data-author]',
+            'a[href*="/u/"]',
+            'a[href*="weibo.com/"]'
+        ]
+        
+        for selector in author_selectors:
+            author_elem = soup.select_one(selector)
+            if author_elem and author_elem.get_text(strip=True):
+                author_text = author_elem.get_text(strip=True)
+                # 清理作者名称中的多余信息
+                author_text = author_text.split('\n')[0].strip()  # 取第一行
+                author_text = re.sub(r'\s+', ' ', author_text)  # 合并多个空格
+                if len(author_text) > 0 and len(author_text) < 50:  # 合理的作者名称长度
+                    article_data['author'] = author_text
+                    print(f"通过选择器 {selector} 找到作者: {author_text}")
+                    
+                    # 尝试从链接中提取UID
+                    author_link = author_elem.find('a') if author_elem.name != 'a' else author_elem
+                    if author_link and author_link.get('href'):
+                        href = author_link.get('href')
+                        uid_match = re.search(r'/(?:u/)?([0-9]+)', href)
+                        if uid_match:
+                            article_data['author_uid'] = uid_match.group(1)
+                            print(f"提取到作者UID: {uid_match.group(1)}")
+                    break
+        
+        # 如果还没找到作者，尝试从data属性中提取
+        if not article_data.get('author'):
+            author_data_elem = soup.find(attrs={'data-author': True})
+            if author_data_elem:
+                author_name = author_data_elem.get('data-author')
+                if author_name:
+                    article_data['author'] = author_name
+                    print(f"从data-author属性找到作者: {author_name}")
+        
+        # 查找发布时间
+        time_selectors = [
+            '.WB_detail .time',
+            '.publish-time',
+            '.created-time',
+            '[class*="time"]'
+        ]
+        
+        for selector in time_selectors:
+            time_elem = soup.select_one(selector)
+            if time_elem and time_elem.get_text(strip=True):
+                article_data['publish_time'] = time_elem.get_text(strip=True)
+                break
+        
+        # 查找文章内容 - 使用更精确的选择器
+        content_selectors = [
+            '.WB_editor_iframe_new[node-type="contentBody"]',
+            '.WB_detail .WB_text',
+            '.article-content',
+            '.content-body',
+            '[class*="content"][class*="body"]'
+        ]
+        
+        for selector in content_selectors:
+            content_elem = soup.select_one(selector)
+            if content_elem:
+                content_text = self.extract_formatted_text(content_elem)
+                if len(content_text) > 50:
+                    article_data['content'] = content_text
+                    print(f"通过选择器 {selector} 找到内容，长度: {len(content_text)}")
+                    break
+        
+        # 查找下一章链接
+        next_url = self.find_next_chapter_url(soup)
+        if next_url:
+            article_data['next_chapter_url'] = next_url
+            print(f"找到下一章链接: {next_url}")
+        
+        # 含longTextContent的script文本（JSON解析由调用方完成）
+        article_data['scripts'] = [script.get_text() for script in soup.find_all('script')
+                                   if 'longTextContent' in script.get_text()]
+        
+        return article_data
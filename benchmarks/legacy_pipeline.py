@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+重构前的文本处理流程（逐条re.sub、逐个str.replace、逐字符循环），
+仅用于基准测试的对照和输出一致性校验，不要在爬虫中使用
+"""
+
+import re
+from zhconv import convert
+
+
+def add_pangu_spacing(text):
+    """添加盘古之白：在中文字符和英文字母/数字之间添加空格"""
+    if not text:
+        return text
+    
+    # 在中文字符和英文字母/数字之间添加空格
+    # 中文字符后跟英文字母/数字
+    text = re.sub(r'([\u4e00-\u9fff])([a-zA-Z0-9])', r'\1 \2', text)
+    # 英文字母/数字后跟中文字符
+    text = re.sub(r'([a-zA-Z0-9])([\u4e00-\u9fff])', r'\1 \2', text)
+    
+    # 在中文字符和英文标点之间添加空格（可选）
+    text = re.sub(r'([\u4e00-\u9fff])([!"#$%&\'()*+,\-./:;<=>?@\[\\\]^_`{|}~])', r'\1 \2', text)
+    text = re.sub(r'([!"#$%&\'()*+,\-./:;<=>?@\[\\\]^_`{|}~])([\u4e00-\u9fff])', r'\1 \2', text)
+    
+    # 清理多余的空格，但保留换行符
+    text = re.sub(r'[ \t]+', ' ', text)
+    
+    return text
+
+def clean_invisible_characters(text):
+    """清理文本中的不可见字符和特殊空白符"""
+    if not text:
+        return text
+    
+    # 定义需要清理的不可见字符
+    invisible_chars = {
+        '\u00A0': ' ',  # 不间断空格 (Non-breaking Space) -> 普通空格
+        '\u200B': '',   # 零宽空格 (Zero-width space) -> 删除
+        '\u200C': '',   # 零宽非连字符 (Zero-width non-joiner) -> 删除
+        '\u200D': '',   # 零宽连字符 (Zero-width joiner) -> 删除
+        '\u2060': '',   # 词连接符 (Word joiner) -> 删除
+        '\uFEFF': '',   # 零宽非断空格 (Zero-width no-break space) -> 删除
+        '\u180E': '',   # 蒙古文元音分隔符 (Mongolian vowel separator) -> 删除
+        '\u2000': ' ',  # En quad -> 普通空格
+        '\u2001': ' ',  # Em quad -> 普通空格
+        '\u2002': ' ',  # En space -> 普通空格
+        '\u2003': ' ',  # Em space -> 普通空格
+        '\u2004': ' ',  # Three-per-em space -> 普通空格
+        '\u2005': ' ',  # Four-per-em space -> 普通空格
+        '\u2006': ' ',  # Six-per-em space -> 普通空格
+        '\u2007': ' ',  # Figure space -> 普通空格
+        '\u2008': ' ',  # Punctuation space -> 普通空格
+        '\u2009': ' ',  # Thin space -> 普通空格
+        '\u200A': ' ',  # Hair space -> 普通空格
+        '\u202F': ' ',  # Narrow no-break space -> 普通空格
+        '\u205F': ' ',  # Medium mathematical space -> 普通空格
+        '\u3000': ' ',  # 全角空格 -> 普通空格
+    }
+    
+    # 替换不可见字符
+    for invisible_char, replacement in invisible_chars.items():
+        text = text.replace(invisible_char, replacement)
+    
+    return text
+
+def convert_to_simplified_fullwidth(text):
+    """将繁体中文转换为简体中文，并将半角标点转换为全角标点"""
+    if not text:
+        return text
+    
+    # 0. 首先清理不可见字符
+    text = clean_invisible_characters(text)
+    
+    # 1. 繁体转简体（如果zhconv可用）
+    if convert is not None:
+        try:
+            text = convert(text, 'zh-cn')
+        except Exception as e:
+            print(f"繁体转简体失败: {e}")
+    
+    # 2. 半角到全角标点符号映射（不包括引号）
+    half_to_full_map_base = {
+        '!': '！', '(': '（', ')': '）', ',': '，', ':': '：', ';': '；', '?': '？', '[': '【', ']': '】'
+    }
+    
+    # 3. 智能处理双引号和单引号
+    in_double_quote = False
+    in_single_quote = False
+    processed_content_with_quotes = []
+    
+    for char in text:
+        if char == '"':
+            if not in_double_quote:
+                processed_content_with_quotes.append('"')
+                in_double_quote = True
+            else:
+                processed_content_with_quotes.append('"')
+                in_double_quote = False
+        elif char == "'":
+            if not in_single_quote:
+                processed_content_with_quotes.append(''')
+                    in_single_quote = True
+                else:
+                    processed_content_with_quotes.append(''')
+                in_single_quote = False
+        else:
+            processed_content_with_quotes.append(char)
+    
+    # 转换回字符串
+    content_after_quotes = "".join(processed_content_with_quotes)
+    
+    # 4. 转换其他半角符号为全角（不包括已处理的引号）
+    final_fullwidth_content = []
+    for char in content_after_quotes:
+        final_fullwidth_content.append(half_to_full_map_base.get(char, char))
+    
+    return "".join(final_fullwidth_content)
+
+
+def render_markdown(all_chapters, other_articles=[]):
+    """重构前 save_results_with_chapters 中的Markdown组装和格式化"""
+    # 先组装所有内容为完整文本
+    full_content = []
+    
+    if all_chapters:
+        # 组装所有章节内容
+        for i, chapter in enumerate(all_chapters):
+            title = chapter.get('title', '未知')
+            full_content.append(f"## {title}\n\n")
+            
+            content = chapter.get('content', '无内容')
+            # content中多行换行改成只空一行，没空行也换成空一行
+            # 将多个连续换行符替换为双个换行符（一个空行）
+            formatted_content = re.sub(r'\n\s*\n+', '\n\n', content)
+            # 将单个换行符也替换为双个换行符（确保段落间有空行）
+            formatted_content = re.sub(r'(?<!\n)\n(?!\n)', '\n\n', formatted_content)
+            full_content.append(f"{formatted_content}\n\n")
+    
+    if other_articles:
+        for i, article in enumerate(other_articles, 1):
+            title = article.get('title', '未知')
+            full_content.append(f"## {title}\n")
+            
+            article_url = article.get('url', '无链接')
+            full_content.append(f"{article_url}\n")
+            
+            content = article.get('content', '无内容')[:200] + '...'
+            formatted_content = re.sub(r'\n\s*\n+', '\n', content)
+            full_content.append(f"{formatted_content}\n\n")
+    
+    # 将所有内容合并为一个字符串
+    final_text = ''.join(full_content)
+    
+    # 统一进行盘古之白格式化处理
+    final_formatted_text = add_pangu_spacing(final_text)
+    
+    # 应用繁体转简体和标点符号转换
+    final_converted_text = convert_to_simplified_fullwidth(final_formatted_text)
+    
+    return final_converted_text
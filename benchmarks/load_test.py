@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+端到端负载测试
+在子进程中启动本地模拟微博服务器，用 base_url 把 WeiboTTArticleCrawler 的请求转发过去，
+并发爬取所有模拟连载，报告章节吞吐量、每章请求数、章节延迟的p50/p99和峰值内存；
+加上 --refresh 时修订服务器上的部分章节后再爬取一遍，报告条件请求节省的下载字节和CPU时间
+
+用法:
+    python benchmarks/load_test.py [--serials 4] [--chapters 50] [--latency 20] [--concurrency 4] [--prefetch 2]
+    python benchmarks/load_test.py --throttle-rate 0.05 --adaptive-rate --output load.json
+    python benchmarks/load_test.py --refresh --revised-rate 0.2
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import resource
+import argparse
+import contextlib
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+import mock_weibo_server
+from weibo_ttarticle_crawler import WeiboTTArticleCrawler, HostRateLimiter, AdaptiveHostRateLimiter, HttpTransport, ValidatorStore
+
+
+def start_mock_server(args):
+    """在子进程中启动模拟服务器（峰值内存只统计爬虫进程），返回（进程, 地址）"""
+    command = [sys.executable, os.path.join(BENCH_DIR, 'mock_weibo_server.py'), '--port', '0',
+               '--serials', str(args.serials), '--chapters', str(args.chapters), '--paragraphs', str(args.paragraphs),
+               '--latency', str(args.latency), '--jitter', str(args.jitter), '--throttle-rate', str(args.throttle_rate),
+               '--login-rate', str(args.login_rate), '--malformed-rate', str(args.malformed_rate),
+               '--revised-rate', str(args.revised_rate), '--revision', str(args.revision)]
+    if args.series_toc:
+        command.append('--series-toc')
+    if args.seed is not None:
+        command += ['--seed', str(args.seed)]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True, encoding='utf-8')
+    first_line = process.stdout.readline()
+    if 'http://' not in first_line:
+        process.kill()
+        raise RuntimeError(f"模拟服务器启动失败: {first_line.strip()}")
+    return process, first_line.strip().rsplit(' ', 1)[-1]
+
+
+def percentile(values, fraction):
+    """最近秩百分位数"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))]
+
+
+def crawl_serial(args, base_url, rate_limiter, transport, validators, start_url):
+    """爬取一个模拟连载，返回（章节数, 每章延迟列表）"""
+    crawler = WeiboTTArticleCrawler(cookies_dict={'SUB': 'load-test'}, rate_limiter=rate_limiter, transport=transport,
+                                    validators=validators)
+    crawler.base_url = base_url
+    crawler.use_journal = False
+    crawler.async_fetch = args.async_fetch
+    crawler.fanout = args.fanout
+    crawler.prefetch_depth = args.prefetch
+    crawler.full_catalog = args.full_catalog
+    crawler.discover_toc = args.toc
+    crawler.toc_workers = args.toc_workers
+    latencies = []
+    last = [time.perf_counter()]
+
+    def sink(chapter):
+        # 章节延迟：上一章完成到本章完成的间隔（开启预取时即为流水线的实际节拍）
+        now = time.perf_counter()
+        latencies.append(now - last[0])
+        last[0] = now
+
+    crawler.crawl_all_chapters(start_url, args.chapters, chapter_sink=sink)
+    if args.with_author:
+        uid = start_url[-16:-6]
+        crawler.get_author_articles({'author': f"作者{int(uid) - mock_weibo_server.UID_BASE}", 'author_uid': uid})
+    # 等待并发模式下已发出的请求结束，使请求数统计完整
+    crawler.wait_for_fanout()
+    return len(latencies), latencies
+
+
+def server_delta(before, after):
+    return {key: {name: after[key].get(name, 0) - before[key].get(name, 0) for name in after[key]}
+            for key in ('requests', 'statuses', 'faults')}
+
+
+def run_pass(args, base_url, rate_limiter, transport, validators, start_urls):
+    """并发爬取所有连载一遍，返回本遍的章节数、耗时、CPU时间、请求数、下载字节和章节延迟"""
+    before = requests.get(f"{base_url}/__stats", timeout=5).json()
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    with contextlib.redirect_stdout(io.StringIO()):
+        with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as executor:
+            results = list(executor.map(lambda url: crawl_serial(args, base_url, rate_limiter, transport, validators, url),
+                                        start_urls))
+    elapsed = time.perf_counter() - started
+    cpu = time.process_time() - cpu_started
+    after = requests.get(f"{base_url}/__stats", timeout=5).json()
+
+    chapters = sum(count for count, _ in results)
+    latencies = [latency for _, serial_latencies in results for latency in serial_latencies]
+    requests_made = after['total'] - before['total']
+    return {
+        'chapters': chapters,
+        'elapsed_s': elapsed,
+        'cpu_s': cpu,
+        'chapters_per_s': chapters / elapsed if elapsed else None,
+        'requests': requests_made,
+        'requests_per_chapter': requests_made / chapters if chapters else None,
+        'bytes': after['bytes'] - before['bytes'],
+        'latencies': latencies,
+        'server': server_delta(before, after),
+    }
+
+
+def run_load(args, base_url):
+    if args.adaptive_rate:
+        rate_limiter = AdaptiveHostRateLimiter(default_rate=args.rate, max_rate=args.rate)
+    else:
+        rate_limiter = HostRateLimiter(default_rate=args.rate, burst=max(1, args.concurrency))
+    transport = HttpTransport(pool_size=args.pool_size, retries=args.retries)
+    # 只在内存中保存校验信息，不写文件
+    validators = ValidatorStore(None) if args.refresh else None
+    config = mock_weibo_server.MockConfig(args.serials, args.chapters)
+    start_urls = mock_weibo_server.start_urls(config)
+
+    first = run_pass(args, base_url, rate_limiter, transport, validators, start_urls)
+    connections = transport.connection_stats()
+    new_connections = sum(entry['connections'] for entry in connections.values())
+    pool_requests = sum(entry['requests'] for entry in connections.values())
+    latencies = first.pop('latencies')
+    report = dict(first, **{
+        'serials': args.serials,
+        'chapters_expected': args.serials * args.chapters,
+        'connections': new_connections,
+        'connection_reuse_rate': 1 - new_connections / pool_requests if pool_requests else None,
+        'chapter_latency_p50_s': percentile(latencies, 0.50),
+        'chapter_latency_p99_s': percentile(latencies, 0.99),
+        # Linux上ru_maxrss的单位是KB，macOS上是字节
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024),
+        'settings': {key: getattr(args, key) for key in
+                     ('concurrency', 'prefetch', 'async_fetch', 'fanout', 'rate', 'adaptive_rate', 'pool_size', 'retries',
+                      'latency', 'jitter', 'throttle_rate', 'login_rate', 'malformed_rate', 'revised_rate', 'with_author',
+                      'full_catalog', 'toc', 'toc_workers', 'series_toc')},
+    })
+    if args.refresh:
+        # 修订服务器上的部分章节，用同一份校验信息再爬取一遍
+        requests.get(f"{base_url}/__revise", params={'revision': args.revision + 1}, timeout=5)
+        refresh = run_pass(args, base_url, rate_limiter, transport, validators, start_urls)
+        refresh.pop('latencies')
+        refresh['not_modified'] = validators.not_modified
+        refresh['modified'] = validators.modified
+        report['refresh'] = refresh
+    return report
+
+
+def print_report(report):
+    print(f"章节: {report['chapters']}/{report['chapters_expected']}，耗时 {report['elapsed_s']:.2f} 秒")
+    print(f"吞吐量: {report['chapters_per_s'] or 0:.2f} 章/秒")
+    print(f"请求数: {report['requests']}，每章 {report['requests_per_chapter'] or 0:.2f} 次")
+    if report['connection_reuse_rate'] is not None:
+        print(f"新建连接: {report['connections']} 个，连接复用率 {report['connection_reuse_rate']:.1%}")
+    if report['chapter_latency_p50_s'] is not None:
+        print(f"章节延迟: p50 {report['chapter_latency_p50_s'] * 1000:.1f} ms，p99 {report['chapter_latency_p99_s'] * 1000:.1f} ms")
+    print(f"下载字节: {report['bytes']}，CPU {report['cpu_s']:.2f} 秒")
+    print(f"峰值内存: {report['peak_rss_mb']:.1f} MB")
+    print(f"各接口请求数: {report['server']['requests']}")
+    print(f"状态码: {report['server']['statuses']}")
+    if report['server']['faults']:
+        print(f"注入的故障: {report['server']['faults']}")
+    refresh = report.get('refresh')
+    if refresh:
+        print(f"\n重新爬取: 章节 {refresh['chapters']}，耗时 {refresh['elapsed_s']:.2f} 秒，CPU {refresh['cpu_s']:.2f} 秒"
+              f"（首次 {report['cpu_s']:.2f} 秒）")
+        print(f"下载字节: {refresh['bytes']}（首次 {report['bytes']}，"
+              f"{refresh['bytes'] / report['bytes'] if report['bytes'] else 0:.1%}）")
+        print(f"未修改(304) {refresh['not_modified']} 次，已修改 {refresh['modified']} 次")
+        print(f"状态码: {refresh['server']['statuses']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='用本地模拟微博服务器对爬虫进行端到端负载测试')
+    mock_weibo_server.add_config_arguments(parser)
+    parser.add_argument('--server', help='使用已启动的模拟服务器地址（需与本次的 --serials/--chapters 一致），不再自动启动')
+    parser.add_argument('--concurrency', type=int, default=4, help='同时爬取的连载数 (默认: 4)')
+    parser.add_argument('--prefetch', type=int, default=0, help='流水线预取深度 (默认: 0)')
+    parser.add_argument('--async-fetch', action='store_true', help='并发请求所有详情API')
+    parser.add_argument('--fanout', type=int, default=6, help='并发模式下同时请求的API数 (默认: 6)')
+    parser.add_argument('--rate', type=float, default=1000.0, help='每个主机每秒允许的请求数 (默认: 1000)')
+    parser.add_argument('--adaptive-rate', action='store_true', help='使用AIMD自适应限速（--rate 为最高速率）')
+    parser.add_argument('--pool-size', type=int, default=10, help='连接池大小 (默认: 10)')
+    parser.add_argument('--retries', type=int, default=3, help='连接错误和5xx响应的自动重试次数 (默认: 3)')
+    parser.add_argument('--refresh', action='store_true',
+                        help='爬取完成后修订服务器上的部分章节（比例见 --revised-rate），用条件请求再爬取一遍')
+    parser.add_argument('--with-author', action='store_true', help='每个连载爬完后再请求作者文章列表接口')
+    parser.add_argument('--toc', action='store_true', help='目录发现：先获取专栏目录再并行获取各章')
+    parser.add_argument('--toc-workers', type=int, default=4, help='按目录并行获取章节的并发数 (默认: 4)')
+    parser.add_argument('--full-catalog', action='store_true', help='请求作者文章列表时翻页获取完整目录（配合 --with-author）')
+    parser.add_argument('--output', '-o', help='把结果保存为JSON文件')
+    args = parser.parse_args()
+
+    process = None
+    base_url = args.server
+    if not base_url:
+        process, base_url = start_mock_server(args)
+    try:
+        report = run_load(args, base_url)
+    finally:
+        if process:
+            process.terminate()
+            process.wait()
+
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存到: {args.output}")
+    return 0 if report['chapters'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地模拟微博服务器
+提供爬虫使用的六个文章详情接口和作者文章列表/搜索接口，内容为按编号生成的连载（用 sibling.next 串联），
+可以注入延迟、418/429限流、登录墙和损坏的JSON。文章接口带有ETag/Last-Modified，支持条件请求（304）；
+作者文章列表支持page和since_id分页；--series-toc 时详情接口带有整个连载的章节目录。爬虫设置 base_url 后请求路径为 /主机/路径，
+例如 https://weibo.com/ttarticle/x/m/aj/detail?id=X 对应 {base_url}/weibo.com/ttarticle/x/m/aj/detail?id=X
+
+GET /__stats 返回各接口的请求数、状态码、响应字节数和注入的故障数（JSON）
+GET /__revise?revision=N 把修订版本设为N：按 --revised-rate 选中的章节内容随修订版本变化，其余章节保持不变
+
+用法: python benchmarks/mock_weibo_server.py [--port 8000] [--serials 4] [--chapters 50] [--latency 20]
+"""
+
+import re
+import sys
+import json
+import time
+import random
+import hashlib
+from email.utils import formatdate
+import argparse
+import threading
+from urllib.parse import urlparse, parse_qs, unquote
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# 连载编号和章节号编码在头条文章ID中：230940 + 作者UID（10位）+ 章节号（6位）
+ARTICLE_ID_PREFIX = '230940'
+UID_BASE = 5000000000
+ARTICLE_ID_PATTERN = re.compile(r'^230940(\d{10})(\d{6})$')
+# 章节的Last-Modified基准时间（2025-07-01 00:00 UTC）
+MODIFIED_BASE = 1751328000
+
+SENTENCES = [
+    '夜色漸深，城市的燈火一盞盞亮了起來。', '她把手機放回口袋，轉身走進了雨裡。', '“你確定要這樣做嗎？”他低聲問道。',
+    '會議室裡只剩下投影儀的嗡嗡聲。', '第3次排練結束時已經是凌晨2點。', '窗外的風吹動了桌上的稿紙，寫滿了iPhone和Wi-Fi的筆記。',
+    '沒有人知道那封信是誰寄來的。', '他笑了笑，說：“明天見。”', '走廊盡頭的門虛掩著，透出一線光。',
+]
+
+
+class MockConfig:
+    """连载规模和故障注入参数"""
+
+    def __init__(self, serials=4, chapters=50, paragraphs=30, latency_ms=0.0, jitter_ms=0.0,
+                 throttle_rate=0.0, login_rate=0.0, malformed_rate=0.0, seed=None, revised_rate=0.0, revision=0,
+                 series_toc=False):
+        self.serials = serials
+        self.chapters = chapters
+        self.paragraphs = paragraphs
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.throttle_rate = throttle_rate
+        self.login_rate = login_rate
+        self.malformed_rate = malformed_rate
+        self.revised_rate = revised_rate
+        self.revision = revision
+        self.series_toc = series_toc
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def roll(self):
+        """为一次请求抽取（延迟秒数, 故障类型或None）"""
+        with self.lock:
+            latency = max(0.0, self.latency_ms + self.random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+            value = self.random.random()
+        if value < self.throttle_rate:
+            return latency, 'throttle'
+        value -= self.throttle_rate
+        if value < self.login_rate:
+            return latency, 'login'
+        value -= self.login_rate
+        if value < self.malformed_rate:
+            return latency, 'malformed'
+        return latency, None
+
+    def throttle_status(self):
+        with self.lock:
+            return self.random.choice((418, 429))
+
+
+def article_id(serial, chapter):
+    return f"{ARTICLE_ID_PREFIX}{UID_BASE + serial}{chapter:06d}"
+
+
+def start_urls(config):
+    """每个连载第一章的页面URL"""
+    return [f"https://weibo.com/ttarticle/p/show?id={article_id(serial, 1)}" for serial in range(config.serials)]
+
+
+def locate(config, value):
+    """文章ID -> （连载编号, 章节号），不存在时返回None"""
+    match = ARTICLE_ID_PATTERN.match(value or '')
+    if not match:
+        return None
+    serial, chapter = int(match.group(1)) - UID_BASE, int(match.group(2))
+    if 0 <= serial < config.serials and 1 <= chapter <= config.chapters:
+        return serial, chapter
+    return None
+
+
+def chapter_record(config, serial, chapter):
+    """按编号确定性地生成一章"""
+    rng = random.Random(serial * 1000003 + chapter)
+    paragraphs = [''.join(rng.choice(SENTENCES) for _ in range(rng.randint(2, 6))) for _ in range(config.paragraphs)]
+    next_id = article_id(serial, chapter + 1) if chapter < config.chapters else None
+    revised = bool(config.revision) and random.Random(f"{serial}-{chapter}").random() < config.revised_rate
+    if revised:
+        paragraphs.append(f"（第{config.revision}次修訂）")
+    return {
+        'id': article_id(serial, chapter),
+        'uid': UID_BASE + serial,
+        'author': f"作者{serial}",
+        'title': f"連載{serial} 第{chapter}章",
+        'create_at': f"07-{1 + chapter % 28:02d} 12:00",
+        'paragraphs': paragraphs,
+        'next_id': next_id,
+        'modified': MODIFIED_BASE + chapter * 3600 + (config.revision * 86400 if revised else 0),
+        'toc': [article_id(serial, number) for number in range(1, config.chapters + 1)] if config.series_toc else None,
+    }
+
+
+def page_url(value):
+    return f"https://weibo.com/ttarticle/p/show?id={value}"
+
+
+def status_data(record):
+    return {'id': record['id'], 'longTextContent': '<br />'.join(record['paragraphs']),
+            'user': {'id': record['uid'], 'screen_name': record['author']}, 'created_at': record['create_at']}
+
+
+def render_detail(record):
+    """头条文章详情接口 ttarticle/x/m/aj/detail"""
+    data = {'object_id': f"1022:{record['id']}", 'uid': record['uid'], 'title': record['title'],
+            'create_at': record['create_at'], 'url': page_url(record['id']),
+            'userinfo': {'uid': record['uid'], 'screen_name': record['author']},
+            'content': ''.join(f"<p>{line}</p>" for line in record['paragraphs'])}
+    if record['next_id']:
+        data['sibling'] = {'next': {'id': record['next_id'], 'title': '下一章', 'url': page_url(record['next_id'])}}
+    if record['toc']:
+        data['collection'] = {'list': [{'id': value, 'url': page_url(value)} for value in record['toc']]}
+    return 'application/json;charset=UTF-8', {'code': '100000', 'msg': 'success', 'data': data}
+
+
+def render_extend(record):
+    """m.weibo.cn/statuses/extend"""
+    return 'application/json; charset=utf-8', {'ok': 1, 'data': status_data(record)}
+
+
+def render_longtext(record):
+    """weibo.com/ajax/statuses/longtext（以text/html返回JSON）"""
+    return 'text/html; charset=utf-8', {'ok': 1, 'http_code': 200,
+                                        'data': {'longTextContent': status_data(record)['longTextContent']}}
+
+
+def render_status(record):
+    """weibo.com/ajax/statuses/show"""
+    return 'application/json; charset=utf-8', dict(status_data(record), ok=1)
+
+
+def render_article_page(record):
+    """weibo.com/ttarticle/p/show 文章页"""
+    body = ''.join(f"<p>{line}</p>" for line in record['paragraphs'])
+    next_link = (f'<div class="special-button"><a href="/ttarticle/p/show?id={record["next_id"]}" title="下一篇">下一篇</a></div>'
+                 if record['next_id'] else '')
+    return 'text/html; charset=utf-8', f"""<!DOCTYPE html><html><head><meta charset="utf-8"><title>{record['title']} - 微博</title></head>
+<body><div class="WB_artical"><div class="WB_detail"><h1 class="title">{record['title']}</h1>
+<div class="WB_info"><a href="https://weibo.com/u/{record['uid']}" class="W_f14 author">{record['author']}</a></div>
+<div class="time">{record['create_at']}</div>
+<div class="WB_editor_iframe_new" node-type="contentBody">{body}</div>{next_link}</div></div></body></html>"""
+
+
+def render_card_page(record):
+    """card.weibo.com/article/m/show/id/ 移动版文章页"""
+    body = ''.join(f"<div>{line}</div>" for line in record['paragraphs'])
+    next_link = (f'<a href="https://weibo.com/ttarticle/x/m/show#/id={record["next_id"]}"><span>下一页</span></a>'
+                 if record['next_id'] else '')
+    return 'text/html; charset=utf-8', f"""<!DOCTYPE html><html><head><meta charset="utf-8"><title>{record['title']}</title></head>
+<body><div class="main"><h2 class="article-title">{record['title']}</h2>
+<div class="user-info"><span class="screen-name">{record['author']}</span><span class="publish-time">{record['create_at']}</span></div>
+<div class="article-content">{body}</div>{next_link}</div></body></html>"""
+
+
+DETAIL_ROUTES = {
+    'weibo.com/ttarticle/x/m/aj/detail': render_detail,
+    'm.weibo.cn/statuses/extend': render_extend,
+    'weibo.com/ajax/statuses/longtext': render_longtext,
+    'weibo.com/ttarticle/p/show': render_article_page,
+    'weibo.com/ajax/statuses/show': render_status,
+}
+CARD_PATH_PATTERN = re.compile(r'^card\.weibo\.com/article/m/show/id/([^/]+)$')
+
+
+def serial_articles(config, serial):
+    return [chapter_record(config, serial, chapter) for chapter in range(1, config.chapters + 1)]
+
+
+def article_cards(records):
+    return [{'mblog': {'page_info': {'type': 'article', 'page_title': record['title'], 'page_url': page_url(record['id'])},
+                       'created_at': record['create_at'], 'text': record['paragraphs'][0]}} for record in records]
+
+
+def paginate(records, query, page_size):
+    """按 since_id（上一页最后一篇的ID）或 page 取一页，返回（本页记录, 下一页的since_id或空串）"""
+    since_id = query.get('since_id', [''])[0]
+    if since_id:
+        ids = [record['id'] for record in records]
+        start = ids.index(since_id) + 1 if since_id in ids else len(records)
+    else:
+        page = query.get('page', ['1'])[0]
+        start = (int(page) - 1) * page_size if page.isdigit() and int(page) > 0 else 0
+    items = records[start:start + page_size]
+    return items, items[-1]['id'] if items and start + page_size < len(records) else ''
+
+
+def render_author_api(config, route, query):
+    """作者文章列表（支持page和since_id分页，每页20篇）和搜索接口，找不到作者时返回空列表"""
+    serial = None
+    if route == 'weibo.com/ajax/statuses/mymblog' or route == 'weibo.com/ttarticle/api/profile/articles':
+        uid = query.get('uid', [''])[0]
+        serial = int(uid) - UID_BASE if uid.isdigit() else None
+    elif route == 'm.weibo.cn/api/container/getIndex':
+        containerid = unquote(query.get('containerid', [''])[0])
+        if containerid.startswith('107603') and containerid[6:].isdigit():
+            serial = int(containerid[6:]) - UID_BASE
+        else:
+            name = containerid.rpartition('q=')[2]
+            serial = int(name[2:]) if name.startswith('作者') and name[2:].isdigit() else None
+    elif route == 'weibo.com/ajax/search/searchall':
+        name = query.get('q', [''])[0]
+        serial = int(name[2:]) if name.startswith('作者') and name[2:].isdigit() else None
+    else:
+        return None
+    records = serial_articles(config, serial) if serial is not None and 0 <= serial < config.serials else []
+
+    if route == 'weibo.com/ajax/statuses/mymblog':
+        records, since_id = paginate(records, query, 20)
+        items = [{'page_info': {'type': 'article', 'page_title': record['title'], 'page_url': page_url(record['id'])},
+                  'created_at': record['create_at'], 'text_raw': record['paragraphs'][0]} for record in records]
+        return 'application/json; charset=utf-8', {'ok': 1, 'data': {'list': items, 'since_id': since_id}}
+    if route == 'weibo.com/ttarticle/api/profile/articles':
+        page_size = query.get('page_size', ['20'])[0]
+        records, _ = paginate(records, query, int(page_size) if page_size.isdigit() and int(page_size) > 0 else 20)
+        items = [{'id': record['id'], 'title': record['title'], 'create_time': record['create_at'],
+                  'read_count': 100, 'summary': record['paragraphs'][0]} for record in records]
+        # 桌面端头条文章接口格式（没有ok字段）
+        return 'application/json; charset=utf-8', {'code': 100000, 'data': {'articles': items}}
+    if route == 'm.weibo.cn/api/container/getIndex' and containerid.startswith('107603'):
+        records, since_id = paginate(records, query, 20)
+        return 'application/json; charset=utf-8', {'ok': 1, 'data': {'cardlistInfo': {'since_id': since_id},
+                                                                      'cards': article_cards(records)}}
+    return 'application/json; charset=utf-8', {'ok': 1, 'data': {'cards': article_cards(records)}}
+
+
+class MockStats:
+    """按接口统计请求数、状态码和注入的故障"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = {}
+        self.statuses = {}
+        self.faults = {}
+        self.bytes = 0
+
+    def record(self, route, status, fault, size=0):
+        with self.lock:
+            self.requests[route] = self.requests.get(route, 0) + 1
+            self.statuses[str(status)] = self.statuses.get(str(status), 0) + 1
+            self.bytes += size
+            if fault:
+                self.faults[fault] = self.faults.get(fault, 0) + 1
+
+    def snapshot(self):
+        with self.lock:
+            return {'total': sum(self.requests.values()), 'requests': dict(self.requests),
+                    'statuses': dict(self.statuses), 'faults': dict(self.faults), 'bytes': self.bytes}
+
+
+class MockWeiboHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, status, content_type, body, headers=None):
+        payload = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+        return len(payload)
+
+    def send_not_modified(self, headers):
+        self.send_response(304)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+
+    def is_not_modified(self, validators):
+        """按If-None-Match（优先）或If-Modified-Since判断客户端保存的版本是否仍然有效"""
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            return validators['ETag'] in [tag.strip() for tag in if_none_match.split(',')]
+        return self.headers.get('If-Modified-Since') == validators['Last-Modified']
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        route = parsed.path.strip('/')
+        if route == '__stats':
+            self.send_body(200, 'application/json', json.dumps(self.server.stats.snapshot()))
+            return
+        if route == '__revise':
+            revision = parse_qs(parsed.query).get('revision', [''])[0]
+            self.server.config.revision = int(revision) if revision.isdigit() else self.server.config.revision + 1
+            self.send_body(200, 'application/json', json.dumps({'revision': self.server.config.revision}))
+            return
+
+        config = self.server.config
+        latency, fault = config.roll()
+        if latency:
+            time.sleep(latency)
+        card_match = CARD_PATH_PATTERN.match(route)
+        stats_route = 'card.weibo.com/article/m/show/id' if card_match else route
+
+        if fault == 'throttle':
+            status = config.throttle_status()
+            size = self.send_body(status, 'text/html; charset=utf-8', '<html><body>请求过于频繁</body></html>')
+            self.server.stats.record(stats_route, status, fault, size)
+            return
+        if fault == 'login':
+            size = self.send_body(200, 'text/html; charset=utf-8',
+                                  '<html><head><title>微博-随时随地发现新鲜事</title></head><body>请登录后查看</body></html>')
+            self.server.stats.record(stats_route, 200, fault, size)
+            return
+
+        query = parse_qs(parsed.query)
+        rendered = None
+        record = None
+        if card_match or route in DETAIL_ROUTES:
+            located = locate(config, card_match.group(1) if card_match else query.get('id', [''])[0])
+            if located:
+                render = render_card_page if card_match else DETAIL_ROUTES[route]
+                record = chapter_record(config, *located)
+                rendered = render(record)
+        else:
+            rendered = render_author_api(config, route, query)
+
+        if rendered is None:
+            size = self.send_body(404, 'application/json', json.dumps({'ok': 0, 'msg': 'not found'}))
+            self.server.stats.record(stats_route, 404, None, size)
+            return
+        content_type, body = rendered
+        if not isinstance(body, str):
+            body = json.dumps(body, ensure_ascii=False)
+            if fault == 'malformed':
+                body = body[:len(body) // 2]
+        else:
+            fault = None  # 只对JSON接口注入损坏的响应
+        validators = None
+        if record:
+            validators = {'ETag': f'"{hashlib.sha1(body.encode("utf-8")).hexdigest()[:16]}"',
+                          'Last-Modified': formatdate(record['modified'], usegmt=True)}
+            if self.is_not_modified(validators):
+                self.server.stats.record(stats_route, 304, None)
+                self.send_not_modified(validators)
+                return
+        size = self.send_body(200, content_type, body, validators)
+        self.server.stats.record(stats_route, 200, fault, size)
+
+
+def create_server(config, host='127.0.0.1', port=0):
+    """创建模拟服务器（port为0时自动选择端口），调用 serve_forever 开始服务"""
+    server = ThreadingHTTPServer((host, port), MockWeiboHandler)
+    server.daemon_threads = True
+    server.config = config
+    server.stats = MockStats()
+    return server
+
+
+def add_config_arguments(parser):
+    parser.add_argument('--serials', type=int, default=4, help='连载数 (默认: 4)')
+    parser.add_argument('--chapters', type=int, default=50, help='每个连载的章节数 (默认: 50)')
+    parser.add_argument('--paragraphs', type=int, default=30, help='每章的段落数 (默认: 30)')
+    parser.add_argument('--latency', type=float, default=0.0, help='每个请求的延迟，单位毫秒 (默认: 0)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='延迟的随机抖动范围，单位毫秒 (默认: 0)')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='返回418/429限流的请求比例 (默认: 0)')
+    parser.add_argument('--login-rate', type=float, default=0.0, help='返回登录墙页面的请求比例 (默认: 0)')
+    parser.add_argument('--malformed-rate', type=float, default=0.0, help='JSON接口返回损坏JSON的请求比例 (默认: 0)')
+    parser.add_argument('--seed', type=int, help='故障注入的随机种子')
+    parser.add_argument('--revised-rate', type=float, default=0.0, help='每次修订时内容发生变化的章节比例 (默认: 0)')
+    parser.add_argument('--revision', type=int, default=0, help='初始修订版本 (默认: 0，所有章节为原始内容)')
+    parser.add_argument('--series-toc', action='store_true', help='详情接口的 collection.list 中带有整个连载的章节目录')
+
+
+def config_from_args(args):
+    return MockConfig(args.serials, args.chapters, args.paragraphs, args.latency, args.jitter,
+                      args.throttle_rate, args.login_rate, args.malformed_rate, args.seed,
+                      args.revised_rate, args.revision, args.series_toc)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='本地模拟微博服务器')
+    parser.add_argument('--host', default='127.0.0.1', help='监听地址 (默认: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8000, help='监听端口，0表示自动选择 (默认: 8000)')
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    config = config_from_args(args)
+    server = create_server(config, args.host, args.port)
+    print(f"模拟服务器已启动: http://{args.host}:{server.server_address[1]}", flush=True)
+    for url in start_urls(config):
+        print(f"  {url}")
+    sys.stdout.flush()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
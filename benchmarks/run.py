@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+爬虫CPU热点微基准测试套件
+用样例输出 ttarticle_chapters_20250724_002808.json（及其 raw_html 详情接口响应）和样例Markdown
+构造输入，逐个测量解析、文本处理和保存各阶段的耗时；结果可保存为JSON，
+并可与保存的基线结果对比，超过阈值变慢的阶段标记为性能回退（此时退出码为1）
+
+每次运行阶段前先运行一次固定的参考负载，对比时用阶段耗时与紧邻的参考负载耗时之比的中位数，
+消除机器整体速度的漂移；阈值之外再按两次结果中该比值各自的四分位距加上噪声带
+
+用法:
+    python benchmarks/run.py [--stage 名称 ...] [--repeat N] [--output 结果.json]
+    python benchmarks/run.py --compare 基线.json [--threshold 10]
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+import contextlib
+import subprocess
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+import html_extractor
+import convert
+from weibo_ttarticle_crawler import WeiboTTArticleCrawler
+from bench_extract import ttarticle_page
+
+SAMPLE_JSON = os.path.join(REPO_DIR, 'ttarticle_chapters_20250724_002808.json')
+SAMPLE_MD = os.path.join(REPO_DIR, 'ttarticle_chapters_20250724_002808.md')
+RESULT_FORMAT = 2
+
+
+def load_chapters():
+    with open(SAMPLE_JSON, 'r', encoding='utf-8') as f:
+        return json.load(f)['all_chapters']
+
+
+def leading_fields(raw_html):
+    """
+    从截断的 raw_html（只保存了前1000个字符）中恢复 data 对象里完整保存下来的字段
+    """
+    decoder = json.JSONDecoder()
+    start = raw_html.find('"data":{')
+    fields = {}
+    if start < 0:
+        return fields
+    pos = start + len('"data":{')
+    while True:
+        try:
+            key, pos = decoder.raw_decode(raw_html, pos)
+            pos = raw_html.index(':', pos) + 1
+            value, pos = decoder.raw_decode(raw_html, pos)
+        except ValueError:
+            return fields
+        fields[key] = value
+        if raw_html[pos:pos + 1] != ',':
+            return fields
+        pos += 1
+
+
+def detail_payload(chapter):
+    """
+    按头条文章详情接口的结构重建完整响应：raw_html 中保存下来的字段加上正文和下一章信息
+    （样例中的 raw_html 被截断，无法直接解析）
+    """
+    data = leading_fields(chapter['raw_html'])
+    data['content'] = ''.join(f"<p>{line}</p>" for line in chapter['content'].split('\n') if line)
+    if chapter.get('next_chapter_url'):
+        next_id = chapter['next_chapter_url'].rsplit('=', 1)[-1]
+        data['sibling'] = {'next': {'id': next_id, 'url': chapter['next_chapter_url']}}
+    return json.dumps({'code': '100000', 'msg': 'success', 'data': data}, ensure_ascii=False)
+
+
+def make_crawler():
+    with contextlib.redirect_stdout(io.StringIO()):
+        return WeiboTTArticleCrawler(cookies_dict={'bench': '1'})
+
+
+class Fixtures:
+    """各阶段共用的输入数据，只构造一次"""
+
+    def __init__(self):
+        self.chapters = load_chapters()
+        self.crawler = make_crawler()
+        self.json_responses = [(chapter['source_url'], detail_payload(chapter)) for chapter in self.chapters]
+        self.html_pages = [(chapter['source_url'].replace('/x/m/aj/detail', '/p/show'),
+                            ttarticle_page(chapter['title'], [line for line in chapter['content'].split('\n') if line.strip()]))
+                           for chapter in self.chapters]
+        self.content_elements = [html_extractor.parse_html(page).xpath('//*[@node-type="contentBody"]')[0]
+                                 for _, page in self.html_pages]
+        with open(SAMPLE_MD, 'r', encoding='utf-8') as f:
+            self.markdown = f.read()
+        self.workdir = tempfile.mkdtemp(prefix='weibo_bench_')
+
+    def cleanup(self):
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+def size_of(texts):
+    return sum(len(text.encode('utf-8')) for text in texts)
+
+
+# 每个阶段返回（待测函数, 每次运行处理的字节数）
+def stage_parse_json(fx):
+    def run():
+        for url, text in fx.json_responses:
+            fx.crawler.parse_article_content(text, url)
+    return run, size_of(text for _, text in fx.json_responses)
+
+
+def stage_parse_html(fx):
+    def run():
+        for url, page in fx.html_pages:
+            fx.crawler.parse_article_content(page, url)
+    return run, size_of(page for _, page in fx.html_pages)
+
+
+def stage_extract_formatted_text(fx):
+    # 原 extract_formatted_text 已由 html_extractor.element_text(formatted=True) 实现
+    def run():
+        for element in fx.content_elements:
+            html_extractor.element_text(element, formatted=True)
+    return run, size_of(chapter['content'] for chapter in fx.chapters)
+
+
+def stage_add_pangu_spacing(fx):
+    return (lambda: fx.crawler.add_pangu_spacing(fx.markdown)), size_of([fx.markdown])
+
+
+def stage_clean_invisible_characters(fx):
+    return (lambda: fx.crawler.clean_invisible_characters(fx.markdown)), size_of([fx.markdown])
+
+
+def stage_convert_to_simplified_fullwidth(fx):
+    return (lambda: fx.crawler.convert_to_simplified_fullwidth(fx.markdown)), size_of([fx.markdown])
+
+
+def stage_save_results_with_chapters(fx):
+    output_name = os.path.join(fx.workdir, 'chapters')
+    return (lambda: fx.crawler.save_results_with_chapters(fx.chapters, [], output_name)), \
+        size_of(chapter['content'] for chapter in fx.chapters)
+
+
+def stage_convert_md(fx):
+    output_file = os.path.join(fx.workdir, 'converted.md')
+    return (lambda: convert.convert_md_to_simplified_fullwidth(SAMPLE_MD, output_file)), size_of([fx.markdown])
+
+
+STAGES = {
+    'parse_article_content[json]': stage_parse_json,
+    'parse_article_content[html]': stage_parse_html,
+    'extract_formatted_text': stage_extract_formatted_text,
+    'add_pangu_spacing': stage_add_pangu_spacing,
+    'clean_invisible_characters': stage_clean_invisible_characters,
+    'convert_to_simplified_fullwidth': stage_convert_to_simplified_fullwidth,
+    'save_results_with_chapters': stage_save_results_with_chapters,
+    'convert_md_to_simplified_fullwidth': stage_convert_md,
+}
+
+
+def calibration_workload():
+    """固定的纯Python参考负载（字符串和字典操作），用于换算机器当前的速度"""
+    words = [str(i) for i in range(20000)]
+    counts = {}
+    for word in words:
+        counts[word[-1]] = counts.get(word[-1], 0) + len(word)
+    return ' '.join(words).replace('1', '一'), counts
+
+
+def timed(func):
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started
+
+
+def measure(func, repeat):
+    """
+    预热一次后运行repeat次，每次之前先运行一次参考负载；
+    返回（阶段每次的耗时, 参考负载每次的耗时），单位为秒
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        func()
+        timings = []
+        calibrations = []
+        for _ in range(repeat):
+            calibrations.append(timed(calibration_workload))
+            timings.append(timed(func))
+    return timings, calibrations
+
+
+def git_revision():
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+                                  check=True, capture_output=True, text=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=REPO_DIR,
+                               check=True, capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return revision + ('-dirty' if dirty else '')
+
+
+def relative_stats(timings, calibrations):
+    """
+    每次阶段耗时与紧邻的参考负载耗时之比：返回（比值的中位数, 四分位距占中位数的百分比）
+    """
+    ratios = [timing / calibration for timing, calibration in zip(timings, calibrations)]
+    median = statistics.median(ratios)
+    if len(ratios) < 2:
+        return median, 0.0
+    lower, _, upper = statistics.quantiles(ratios, n=4)
+    return median, (upper - lower) / median * 100
+
+
+def run_stages(names, repeat):
+    fx = Fixtures()
+    results = {}
+    try:
+        for name in names:
+            func, size = STAGES[name](fx)
+            timings, calibrations = measure(func, repeat)
+            best = min(timings)
+            relative, relative_spread = relative_stats(timings, calibrations)
+            results[name] = {
+                'best_s': best,
+                'median_s': statistics.median(timings),
+                'mean_s': statistics.fmean(timings),
+                'relative': relative,
+                'relative_spread': relative_spread,
+                'repeat': repeat,
+                'bytes': size,
+                'mb_per_s': size / (1024 * 1024) / best if best else None,
+            }
+            print(f"{name:<38}{best * 1000:>10.2f}{results[name]['median_s'] * 1000:>10.2f}"
+                  f"{results[name]['mb_per_s'] or 0:>9.2f}")
+    finally:
+        fx.cleanup()
+    return {
+        'format': RESULT_FORMAT,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'stages': results,
+    }
+
+
+def compare(report, baseline, threshold):
+    """
+    对比两次结果中阶段耗时相对参考负载的比值，返回变慢超过阈值加噪声带的阶段名列表；
+    噪声带为两次结果中比值的四分位距之和
+    """
+    regressions = []
+    print(f"\n与基线对比（基线版本 {baseline.get('git_revision')}，Python {baseline.get('python')}，阈值 {threshold:.0f}%）")
+    if baseline.get('python') != report['python'] or baseline.get('platform') != report['platform']:
+        print("警告: 基线在不同的Python版本或平台上生成，结果可能不可比")
+    print(f"{'阶段':<38}{'基线 ms':>10}{'当前 ms':>10}{'变化':>9}{'噪声带':>9}")
+    for name, current in report['stages'].items():
+        previous = baseline.get('stages', {}).get(name)
+        if not previous:
+            print(f"{name:<38}{'-':>10}{current['best_s'] * 1000:>10.2f}{'新增':>9}")
+            continue
+        if previous.get('relative'):
+            change = (current['relative'] / previous['relative'] - 1) * 100
+            noise = previous['relative_spread'] + current['relative_spread']
+            flag = ''
+        else:
+            # 旧格式的基线没有参考负载，只能直接对比最快耗时，噪声带取本次的离散程度
+            change = (current['best_s'] / previous['best_s'] - 1) * 100 if previous['best_s'] else 0.0
+            noise = current['relative_spread']
+            flag = '  未换算'
+        if change > threshold + noise:
+            regressions.append(name)
+            flag += '  性能回退'
+        print(f"{name:<38}{previous['best_s'] * 1000:>10.2f}{current['best_s'] * 1000:>10.2f}{change:>+8.1f}%"
+              f"{noise:>8.1f}%{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='爬虫CPU热点微基准测试')
+    parser.add_argument('--stage', action='append', choices=list(STAGES), help='只运行指定阶段（可重复指定，默认全部）')
+    parser.add_argument('--repeat', type=int, default=10, help='每个阶段的重复次数 (默认: 10)')
+    parser.add_argument('--output', '-o', help='把结果保存为JSON文件（可作为之后对比的基线）')
+    parser.add_argument('--compare', metavar='BASELINE', help='与保存的基线结果JSON对比')
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help='换算后的最快耗时比基线增加超过该百分比（再加上噪声带）时视为性能回退 (默认: 10)')
+    args = parser.parse_args()
+
+    print(f"{'阶段':<38}{'最快 ms':>10}{'中位 ms':>10}{'MB/s':>9}")
+    report = run_stages(args.stage or list(STAGES), args.repeat)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存到: {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"性能回退: {', '.join(regressions)}")
+            sys.exit(1)
+        print("没有性能回退")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,74 +1,235 @@
-import re
 import os # Import the os module for path manipulation
-from zhconv import convert # Changed to zhconv for conversion
+import sys
+import glob
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-def convert_md_to_simplified_fullwidth(input_filepath, output_filepath):
+import text_normalizer
+
+# Files longer than this many characters are converted in paragraph-aligned chunks of roughly this size
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+# Suffix appended to the output file name (e.g. "my_document_converted.md")
+OUTPUT_SUFFIX = '_converted'
+
+
+def read_paragraph_chunks(f_in, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yields the file content in chunks that end on a paragraph boundary (a blank line).
+
+    A chunk that grows to four times chunk_size without a blank line is cut at the
+    current line instead. No zhconv dictionary entry spans a newline, so converting
+    the chunks one by one gives the same result as converting the whole file.
+
+    Args:
+        f_in: A text file object opened for reading.
+        chunk_size (int): The approximate number of characters per chunk.
+    """
+    lines = []
+    size = 0
+    for line in f_in:
+        lines.append(line)
+        size += len(line)
+        if (size >= chunk_size and not line.strip()) or size >= chunk_size * 4:
+            yield ''.join(lines)
+            lines = []
+            size = 0
+    if lines:
+        yield ''.join(lines)
+
+
+def convert_md_to_simplified_fullwidth(input_filepath, output_filepath, chunk_size=DEFAULT_CHUNK_SIZE):
     """
     Converts Traditional Chinese characters to Simplified Chinese characters
     and half-width symbols to full-width symbols in a Markdown file.
     Specifically handles the correct conversion of Chinese quotation marks.
 
+    The file is streamed in paragraph-aligned chunks; the quotation mark state is
+    carried from one chunk to the next, so the output matches a whole-file conversion.
+
     Args:
         input_filepath (str): The path to the input Markdown file.
         output_filepath (str): The path where the converted Markdown file will be saved.
+        chunk_size (int): The approximate number of characters converted at a time.
+
+    Returns:
+        bool: True if the file was converted successfully.
     """
+    # Write to a temporary file first so an interrupted run never leaves a partial
+    # output that looks newer than its input
+    temp_filepath = f"{output_filepath}.{os.getpid()}.tmp"
     try:
-        with open(input_filepath, 'r', encoding='utf-8') as f_in:
-            content = f_in.read()
-
-        # 1. Convert Traditional Chinese characters to Simplified Chinese using zhconv
-        # 'zh-cn' represents Simplified Chinese (Mainland China)
-        simplified_content = convert(content, 'zh-cn')
-
-        # Base map for half-width to full-width symbols (excluding quotation marks)
-        half_to_full_map_base = {
-            '!': '！', '(': '（', ')': '）', ',': '，', ':': '：', ';': '；', '?': '？', '[': '【', ']': '】'
-        }
-
-        # 2. Smartly handle double and single quotation marks
-        in_double_quote = False
-        in_single_quote = False
-        processed_content_with_quotes = []
-
-        for char in simplified_content:
-            if char == '"':
-                if not in_double_quote:
-                    processed_content_with_quotes.append('“') # First double quote, use opening quote
-                    in_double_quote = True
-                else:
-                    processed_content_with_quotes.append('”') # Second double quote, use closing quote
-                    in_double_quote = False
-            elif char == "'":
-                if not in_single_quote:
-                    processed_content_with_quotes.append('‘') # First single quote, use opening quote
-                    in_single_quote = True
-                else:
-                    processed_content_with_quotes.append('’') # Second single quote, use closing quote
-                    in_single_quote = False
-            else:
-                processed_content_with_quotes.append(char)
-
-        # Convert the list back to a string
-        content_after_quotes = "".join(processed_content_with_quotes)
-
-        # 3. Convert other half-width symbols to full-width (excluding already processed quotes)
-        final_fullwidth_content = []
-        for char in content_after_quotes:
-            final_fullwidth_content.append(half_to_full_map_base.get(char, char))
-        final_fullwidth_content = "".join(final_fullwidth_content)
-
-        with open(output_filepath, 'w', encoding='utf-8') as f_out:
-            f_out.write(final_fullwidth_content)
+        quote_state = (False, False)
+        with open(input_filepath, 'r', encoding='utf-8') as f_in, \
+                open(temp_filepath, 'w', encoding='utf-8') as f_out:
+            for chunk in read_paragraph_chunks(f_in, chunk_size):
+                # 1. Convert Traditional Chinese characters to Simplified Chinese using zhconv
+                simplified_chunk = text_normalizer.to_simplified(chunk)
+                # 2. Pair quotation marks and convert other half-width symbols to full-width
+                converted_chunk, quote_state = text_normalizer.to_fullwidth(simplified_chunk, quote_state=quote_state)
+                f_out.write(converted_chunk)
+        os.replace(temp_filepath, output_filepath)
 
         print(f"文件 '{input_filepath}' 已成功转换为简体全角，并保存到 '{output_filepath}'。")
+        return True
 
     except FileNotFoundError:
         print(f"错误：未找到文件 '{input_filepath}'。请检查文件路径是否正确。")
     except Exception as e:
         print(f"处理文件时发生错误：{e}")
+    if os.path.exists(temp_filepath):
+        os.remove(temp_filepath)
+    return False
 
-# --- 使用示例 ---
-if __name__ == "__main__":
+
+def output_path_for(input_filepath, output_dir=None, relative_path=None):
+    """
+    Builds the output path (e.g. "my_document_converted.md") for an input file.
+
+    Args:
+        input_filepath (str): The path to the input Markdown file.
+        output_dir (str): Directory for the output file; defaults to the input file's directory.
+        relative_path (str): The input's path relative to the directory or glob it was found in;
+            its subdirectories are kept under output_dir. Defaults to the file name.
+    """
+    if not output_dir:
+        input_directory, input_filename = os.path.split(input_filepath)
+        name, ext = os.path.splitext(input_filename)
+        return os.path.join(input_directory, f"{name}{OUTPUT_SUFFIX}{ext}")
+    name, ext = os.path.splitext(relative_path or os.path.basename(input_filepath))
+    return os.path.join(output_dir, f"{name}{OUTPUT_SUFFIX}{ext}")
+
+
+def is_up_to_date(input_filepath, output_filepath):
+    """Returns True if the output file exists and is not older than the input file."""
+    try:
+        return os.path.getmtime(output_filepath) >= os.path.getmtime(input_filepath)
+    except OSError:
+        return False
+
+
+def glob_root(pattern):
+    """Returns the leading directories of a glob pattern that contain no wildcards."""
+    parts = []
+    for part in os.path.normpath(os.path.dirname(pattern)).split(os.sep):
+        if glob.has_magic(part):
+            break
+        parts.append(part)
+    return os.sep.join(parts) or os.curdir
+
+
+def collect_input_files(paths):
+    """
+    Expands files, glob patterns and directories into a sorted list of Markdown files.
+
+    Directories are searched recursively for *.md files; files produced by a
+    previous conversion (ending in "_converted.md") are left out unless named explicitly.
+    Each file is paired with its path relative to the directory (or the fixed part of
+    the glob pattern) it was found in, so an output directory can mirror the input tree.
+
+    Args:
+        paths (list): File paths, glob patterns or directories.
+
+    Returns:
+        list: Sorted (input_file, relative_path) pairs.
+    """
+    files = {}
+    for path in paths:
+        if os.path.isfile(path):
+            files.setdefault(path, os.path.basename(path))
+            continue
+        if os.path.isdir(path):
+            root = path
+            matches = glob.glob(os.path.join(glob.escape(path), '**', '*.md'), recursive=True)
+        else:
+            root = glob_root(path)
+            matches = [match for match in glob.glob(path, recursive=True) if os.path.isfile(match)]
+        matches = [match for match in matches if not os.path.splitext(match)[0].endswith(OUTPUT_SUFFIX)]
+        if not matches:
+            print(f"警告：未找到匹配的文件 '{path}'")
+        for match in matches:
+            files.setdefault(match, os.path.relpath(match, root))
+    return sorted(files.items())
+
+
+def find_output_collisions(outputs):
+    """
+    Returns the output paths that more than one input file would be written to.
+
+    Args:
+        outputs (list): (input_file, output_file) pairs.
+
+    Returns:
+        dict: Output path -> list of the input files that map to it.
+    """
+    inputs_by_output = {}
+    for input_file, output_file in outputs:
+        key = os.path.normcase(os.path.abspath(output_file))
+        inputs_by_output.setdefault(key, []).append(input_file)
+    return {output_file: inputs for output_file, inputs in inputs_by_output.items() if len(inputs) > 1}
+
+
+def convert_files(input_files, output_dir=None, workers=None, force=False, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Converts many files in parallel worker processes, skipping outputs that are up to date.
+
+    Output paths are checked for collisions before any worker starts; if two inputs
+    would write the same output file nothing is converted.
+
+    Args:
+        input_files (list): Paths of the Markdown files to convert, or (input_file,
+            relative_path) pairs as returned by collect_input_files.
+        output_dir (str): Directory for the output files, mirroring each input's relative
+            path; defaults to each input file's directory.
+        workers (int): Number of worker processes; defaults to the number of CPUs.
+        force (bool): Convert even if the output is newer than the input.
+        chunk_size (int): The approximate number of characters converted at a time.
+
+    Returns:
+        tuple: (converted, skipped, failed) file counts.
+    """
+    outputs = []
+    for item in input_files:
+        input_file, relative_path = item if isinstance(item, tuple) else (item, None)
+        outputs.append((input_file, output_path_for(input_file, output_dir, relative_path)))
+
+    collisions = find_output_collisions(outputs)
+    if collisions:
+        for output_file, inputs in collisions.items():
+            print(f"错误：多个输入文件会写入同一个输出文件 '{output_file}'：{', '.join(inputs)}")
+        print(f"完成：转换 0 个，跳过 0 个，失败 {len(outputs)} 个")
+        return 0, 0, len(outputs)
+
+    jobs = []
+    skipped = 0
+    for input_file, output_file in outputs:
+        if output_dir:
+            os.makedirs(os.path.dirname(output_file), exist_ok=True)
+        if not force and is_up_to_date(input_file, output_file):
+            skipped += 1
+            continue
+        jobs.append((input_file, output_file))
+    if skipped:
+        print(f"跳过 {skipped} 个已是最新的文件")
+
+    converted = 0
+    workers = min(workers or os.cpu_count() or 1, len(jobs)) if jobs else 0
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(convert_md_to_simplified_fullwidth, input_file, output_file, chunk_size)
+                       for input_file, output_file in jobs]
+            for future in as_completed(futures):
+                converted += future.result()
+    else:
+        for input_file, output_file in jobs:
+            converted += convert_md_to_simplified_fullwidth(input_file, output_file, chunk_size)
+
+    failed = len(jobs) - converted
+    print(f"完成：转换 {converted} 个，跳过 {skipped} 个，失败 {failed} 个")
+    return converted, skipped, failed
+
+
+def prompt_for_file():
+    """Interactively asks for a single Markdown file and converts it next to the input."""
     while True:
         input_file = input("请输入您的Markdown文件路径（例如：my_document.md）：")
 
@@ -80,19 +241,32 @@ if __name__ == "__main__":
             print("错误：指定的路径不是一个文件。请输入有效的文件路径。")
             continue
 
-        # Get the directory of the input file
-        input_directory = os.path.dirname(input_file)
-        # Get the base name of the input file (e.g., "my_document.md")
-        input_filename = os.path.basename(input_file)
-        
-        # Construct the output filename (e.g., "my_document_converted.md")
-        # Split the filename into name and extension
-        name, ext = os.path.splitext(input_filename)
-        output_filename = f"{name}_converted{ext}"
-        
-        # Construct the full output path in the same directory as the input file
-        output_file = os.path.join(input_directory, output_filename)
-
         # Perform the conversion
-        convert_md_to_simplified_fullwidth(input_file, output_file)
+        convert_md_to_simplified_fullwidth(input_file, output_path_for(input_file))
         break # Exit the loop after successful conversion or error handling
+
+
+# --- 使用示例 ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Markdown繁体转简体、半角标点转全角（支持批量处理）')
+    parser.add_argument('paths', nargs='*', help='Markdown文件、通配符或目录（目录会递归查找.md文件）；不提供时交互式输入')
+    parser.add_argument('--output-dir', '-o', help='输出目录 (默认: 与输入文件相同的目录)')
+    parser.add_argument('--workers', '-j', type=int, default=0, help='并行进程数 (默认: 0，使用CPU核数)')
+    parser.add_argument('--force', '-f', action='store_true', help='即使输出文件比输入文件新也重新转换')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE // 1024,
+                        help=f'分块处理大文件时每块的大小，单位为千字符（按字符数而非字节数计算） (默认: {DEFAULT_CHUNK_SIZE // 1024})')
+    args = parser.parse_args()
+
+    if not args.paths:
+        prompt_for_file()
+        sys.exit(0)
+
+    input_files = collect_input_files(args.paths)
+    if not input_files:
+        print("错误：没有找到需要转换的Markdown文件。")
+        sys.exit(1)
+
+    print(f"共 {len(input_files)} 个文件待处理")
+    _, _, failed = convert_files(input_files, args.output_dir, args.workers or None, args.force,
+                                 args.chunk_size * 1024)
+    sys.exit(1 if failed else 0)
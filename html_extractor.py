@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTML文章页字段提取引擎
+把标题、作者、发布时间、正文和下一章链接的选择器列表编译为一个匹配计划，
+用lxml解析后只遍历一次文档树就收集所有字段，结果与逐个选择器调用 select_one 相同
+
+lxml按HTML规则修正不规范的标记（隐式闭合未闭合的<p>、<p>中遇到<div>时提前闭合、拆开嵌套的<a>），
+而原实现使用的html.parser按字面嵌套建树，两者的树不同，提取的字段也会不同；
+因此只有标签严格配对且lxml没有修正过结构时才使用lxml的树，否则改用BeautifulSoup（html.parser）建树，
+再交给同一个匹配计划，结果与原实现一致
+"""
+
+import re
+from lxml import etree
+
+import text_normalizer
+
+# 各字段的选择器，按优先级排列
+TITLE_SELECTORS = [
+    'title',
+    'h1.title',
+    '.WB_detail .title',
+    '.article-title',
+    '[class*="title"]'
+]
+
+AUTHOR_SELECTORS = [
+    '.WB_detail .author',
+    '.author-name',
+    '.username',
+    '.user-name',
+    '.screen-name',
+    '.nickname',
+    '.WB_detail .WB_cardwrap .WB_info .W_f14',
+    '.WB_info .W_f14',
+    '.author',
+    '.user',
+    '[class*="author"]',
+    '[class*="user"]',
+    '[data-author]',
+    'a[href*="/u/"]',
+    'a[href*="weibo.com/"]'
+]
+
+TIME_SELECTORS = [
+    '.WB_detail .time',
+    '.publish-time',
+    '.created-time',
+    '[class*="time"]'
+]
+
+CONTENT_SELECTORS = [
+    '.WB_editor_iframe_new[node-type="contentBody"]',
+    '.WB_detail .WB_text',
+    '.article-content',
+    '.content-body',
+    '[class*="content"][class*="body"]'
+]
+
+# 原实现交给soupsieve的 :contains 是 :-soup-contains 的旧别名，只会给出FutureWarning，按get_text()的文本匹配；
+# 这里的匹配规则与之相同，下一章链接的查找结果不变
+NEXT_SELECTORS = [
+    'a[href*="ttarticle"][title*="下一篇"]',
+    'a[href*="ttarticle"]:contains("下一篇")',
+    'a[href*="ttarticle"]:contains("下一章")',
+    '.special-button a[href*="ttarticle"]',
+    'a[href*="show?id="]:contains("下")',
+]
+
+NEXT_LINK_KEYWORDS = ['下一篇', '下一章', '下一页']
+
+# 这些标签内的文字不计入父元素的文本（与BeautifulSoup的get_text一致）
+SKIPPED_TEXT_TAGS = frozenset(['script', 'style', 'template', 'rt', 'rp'])
+# BeautifulSoup把只含ASCII空白的文本折叠为一个换行或空格，这些标签内除外
+WHITESPACE_PRESERVING_TAGS = frozenset(['pre', 'textarea'])
+ASCII_WHITESPACE = ' \n\t\f\r'
+
+# 没有结束标签的空元素
+VOID_TAGS = frozenset(['area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param',
+                       'source', 'track', 'wbr', 'keygen', 'command', 'basefont', 'frame', 'isindex'])
+# 注释、script/style（html.parser不解析其中的标签）和普通标签；findall的分组为（原始文本标签, 结束斜杠, 标签名, 属性）
+MARKUP_PATTERN = re.compile(
+    r'<!--.*?-->'
+    r'|<(script|style)\b[^>]*>.*?</\1\s*>'
+    r'|<(/?)([a-zA-Z][^\s/>]*)([^>]*)>',
+    re.DOTALL | re.IGNORECASE
+)
+
+EXTRA_NEWLINES_PATTERN = re.compile(r'\n{3,}')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+UID_IN_HREF_PATTERN = re.compile(r'/(?:u/)?([0-9]+)')
+
+# 选择器语法：标签、.类、[属性]、[属性=值]、[属性*=值]、[属性^=值]、[属性$=值]、:contains("文本")，复合选择器之间为后代关系
+SELECTOR_TOKEN_PATTERN = re.compile(
+    r'(?P<tag>^[a-zA-Z][\w-]*)'
+    r'|\.(?P<cls>[\w-]+)'
+    r'|\[(?P<attr>[\w-]+)(?:(?P<op>[*^$]?=)"(?P<value>[^"]*)")?\]'
+    r'|:contains\("(?P<contains>[^"]*)"\)'
+)
+DESCENDANT_PATTERN = re.compile(r'\s+(?=(?:[^"]*"[^"]*")*[^"]*$)')
+
+
+def compile_compound(text):
+    """编译复合选择器（如 a[href*="x"]:contains("y")）为（标签, 类, 属性条件, 包含文本）"""
+    tag = None
+    classes, attrs, contains = [], [], []
+    position = 0
+    for match in SELECTOR_TOKEN_PATTERN.finditer(text):
+        if match.start() != position:
+            break
+        position = match.end()
+        if match.group('tag'):
+            tag = match.group('tag').lower()
+        elif match.group('cls'):
+            classes.append(match.group('cls'))
+        elif match.group('attr'):
+            attrs.append((match.group('attr').lower(), match.group('op'), match.group('value')))
+        else:
+            contains.append(match.group('contains'))
+    if position != len(text):
+        raise ValueError(f"不支持的选择器: {text}")
+    return tag, tuple(classes), tuple(attrs), tuple(contains)
+
+
+def compile_selector(text):
+    """编译选择器为复合选择器列表（最右边的复合选择器匹配目标元素）"""
+    return [compile_compound(part) for part in DESCENDANT_PATTERN.split(text.strip())]
+
+
+def element_text(element, formatted=False):
+    """
+    元素的文本内容，不包括注释和script/style等标签内的文字
+
+    formatted 为 True 时模拟原 extract_formatted_text：后代段落末尾加空行，
+    后代div末尾加换行，<br>替换为换行
+    """
+    parts = []
+    _collect_text(element, parts, formatted, _preserves_whitespace(element))
+    return ''.join(parts)
+
+
+def _preserves_whitespace(element):
+    if element.tag in WHITESPACE_PRESERVING_TAGS:
+        return True
+    return any(ancestor.tag in WHITESPACE_PRESERVING_TAGS for ancestor in element.iterancestors())
+
+
+def _text_node(text, preserve):
+    if preserve or text.strip(ASCII_WHITESPACE):
+        return text
+    return '\n' if '\n' in text else ' '
+
+
+def _collect_text(element, parts, formatted, preserve):
+    if element.text:
+        parts.append(_text_node(element.text, preserve))
+    for child in element:
+        tag = child.tag
+        if isinstance(tag, str) and tag not in SKIPPED_TEXT_TAGS:
+            if formatted and tag == 'br':
+                parts.append('\n')
+            else:
+                _collect_text(child, parts, formatted, preserve or tag in WHITESPACE_PRESERVING_TAGS)
+                if formatted and tag == 'p':
+                    parts.append('\n\n')
+                elif formatted and tag == 'div':
+                    parts.append('\n')
+        if child.tail:
+            parts.append(_text_node(child.tail, preserve))
+
+
+def stripped_text(element):
+    """等同于BeautifulSoup的 get_text(strip=True)"""
+    return ''.join(part.strip() for part in _text_parts(element))
+
+
+def _text_parts(element):
+    parts = []
+    _collect_text(element, parts, False, _preserves_whitespace(element))
+    return parts
+
+
+def _match_compound(element, compound):
+    tag, classes, attrs, contains = compound
+    if tag and element.tag != tag:
+        return False
+    if classes:
+        class_names = (element.get('class') or '').split()
+        for class_name in classes:
+            if class_name not in class_names:
+                return False
+    for name, op, value in attrs:
+        actual = element.get(name)
+        if actual is None:
+            return False
+        if name == 'class':
+            actual = ' '.join(actual.split())
+        if op == '=':
+            if actual != value:
+                return False
+        elif op == '*=':
+            if not value or value not in actual:
+                return False
+        elif op == '^=':
+            if not value or not actual.startswith(value):
+                return False
+        elif op == '$=':
+            if not value or not actual.endswith(value):
+                return False
+    if contains:
+        # 与soupsieve的 :contains/:-soup-contains 相同：匹配元素的全部文本（不含注释和script/style）
+        text = element_text(element)
+        for value in contains:
+            if value not in text:
+                return False
+    return True
+
+
+def _match_selector(element, compounds):
+    if not _match_compound(element, compounds[-1]):
+        return False
+    ancestor = element.getparent()
+    for compound in reversed(compounds[:-1]):
+        while ancestor is not None and not _match_compound(ancestor, compound):
+            ancestor = ancestor.getparent()
+        if ancestor is None:
+            return False
+        ancestor = ancestor.getparent()
+    return True
+
+
+class SelectorPlan:
+    """编译后的选择器匹配计划：按最右侧复合选择器的标签/类/属性建立索引，每个元素只检查可能匹配的选择器"""
+
+    def __init__(self, fields):
+        self.fields = {}  # 字段名 -> 选择器序号列表（按优先级）
+        self.selectors = []  # （选择器文本, 编译结果）
+        self.by_tag, self.by_class, self.by_attr, self.universal = {}, {}, {}, []
+        for field, selector_texts in fields.items():
+            indexes = []
+            for text in selector_texts:
+                index = len(self.selectors)
+                compounds = compile_selector(text)
+                self.selectors.append((text, compounds))
+                indexes.append(index)
+                tag, classes, attrs, _ = compounds[-1]
+                if tag:
+                    self.by_tag.setdefault(tag, []).append(index)
+                elif classes:
+                    self.by_class.setdefault(classes[0], []).append(index)
+                elif attrs:
+                    self.by_attr.setdefault(attrs[0][0], []).append(index)
+                else:
+                    self.universal.append(index)
+            self.fields[field] = indexes
+
+    def candidates(self, element):
+        """可能匹配该元素的选择器序号"""
+        found = list(self.universal)
+        found.extend(self.by_tag.get(element.tag, ()))
+        if self.by_class:
+            for class_name in (element.get('class') or '').split():
+                found.extend(self.by_class.get(class_name, ()))
+        if self.by_attr:
+            for name in element.keys():
+                found.extend(self.by_attr.get(name, ()))
+        return found
+
+    def first_matches(self, root):
+        """
+        一次遍历文档，返回每个选择器在文档顺序中的第一个匹配元素，
+        以及遍历中顺带收集的带href的链接、第一个带data-author属性的元素和script文本
+        """
+        first = [None] * len(self.selectors)
+        links = []
+        data_author = None
+        scripts = []
+        for element in root.iter():
+            tag = element.tag
+            if not isinstance(tag, str):
+                continue  # 注释和处理指令
+            for index in self.candidates(element):
+                if first[index] is None and _match_selector(element, self.selectors[index][1]):
+                    first[index] = element
+            if tag == 'a' and element.get('href') is not None:
+                links.append(element)
+            elif tag == 'script':
+                scripts.append(element.text or '')
+            if data_author is None and element.get('data-author') is not None:
+                data_author = element
+        return first, links, data_author, scripts
+
+    def ordered(self, first, field):
+        """某字段各选择器的（选择器文本, 第一个匹配元素），按优先级排列，跳过没有匹配的选择器"""
+        for index in self.fields[field]:
+            if first[index] is not None:
+                yield self.selectors[index][0], first[index]
+
+
+ARTICLE_PLAN = SelectorPlan({
+    'title': TITLE_SELECTORS,
+    'author': AUTHOR_SELECTORS,
+    'time': TIME_SELECTORS,
+    'content': CONTENT_SELECTORS,
+    'next': NEXT_SELECTORS,
+})
+
+
+def is_strictly_nested(html_content):
+    """标签是否严格配对：每个非空元素都有对应的结束标签且按嵌套顺序闭合，没有自闭合的非空元素"""
+    stack = []
+    for raw, end, tag, attrs in MARKUP_PATTERN.findall(html_content):
+        if not tag:
+            continue
+        tag = tag.lower()
+        if tag in VOID_TAGS:
+            if end:
+                return False
+        elif end:
+            if not stack or stack.pop() != tag:
+                return False
+        elif attrs.endswith('/'):
+            return False
+        else:
+            stack.append(tag)
+    return not stack
+
+
+def parse_html(html_content):
+    """
+    解析HTML，空文档返回None
+    标记规范时用lxml解析；标签不配对或lxml修正过结构时改用html.parser建树（与原实现的树相同）
+    """
+    if not html_content or not html_content.strip():
+        return None
+    if not is_strictly_nested(html_content):
+        return parse_html_literally(html_content)
+    # 编码为UTF-8字节并指定编码，避免字符串中的编码声明或控制字符导致解析失败
+    parser = etree.HTMLParser(encoding='utf-8')
+    root = etree.fromstring(html_content.encode('utf-8', errors='replace'), parser)
+    # 标签配对但违反HTML内容模型（如<p>中的<div>、嵌套的<a>）时，lxml提前闭合元素，随后的结束标签不匹配
+    if any(error.type_name == 'ERR_TAG_NAME_MISMATCH' for error in parser.error_log):
+        return parse_html_literally(html_content)
+    return root
+
+
+def parse_html_literally(html_content):
+    """用BeautifulSoup（html.parser）按字面嵌套建树并转换为lxml元素"""
+    from lxml.html import soupparser
+    return soupparser.fromstring(html_content)
+
+
+def absolute_next_url(href, allow_relative=True):
+    """把下一章链接补全为完整URL"""
+    if href.startswith('http'):
+        return href
+    elif href.startswith('/'):
+        return f"https://weibo.com{href}"
+    elif allow_relative:
+        return f"https://weibo.com/ttarticle/p/{href}"
+    return None
+
+
+def extract_article_fields(html_content, plan=ARTICLE_PLAN):
+    """
+    一次遍历提取文章页的字段，返回字典：
+    title, author, author_selector, author_uid, data_author, publish_time,
+    content, content_selector, next_chapter_url, scripts（含longTextContent的script文本）
+    未找到的字段为None
+    """
+    fields = dict.fromkeys(['title', 'author', 'author_selector', 'author_uid', 'data_author',
+                            'publish_time', 'content', 'content_selector', 'next_chapter_url'])
+    fields['scripts'] = []
+    root = parse_html(html_content)
+    if root is None:
+        return fields
+    first, links, data_author, scripts = plan.first_matches(root)
+
+    for _, element in plan.ordered(first, 'title'):
+        title_text = stripped_text(element)
+        if title_text:
+            # 清理标题中的网站名称
+            if '微博' in title_text:
+                title_text = title_text.split('微博')[0].strip()
+            fields['title'] = title_text
+            break
+
+    for selector, element in plan.ordered(first, 'author'):
+        author_text = stripped_text(element)
+        if not author_text:
+            continue
+        # 清理作者名称中的多余信息：取第一行并合并多个空格
+        author_text = WHITESPACE_PATTERN.sub(' ', author_text.split('\n')[0].strip())
+        if 0 < len(author_text) < 50:  # 合理的作者名称长度
+            fields['author'] = author_text
+            fields['author_selector'] = selector
+            # 尝试从链接中提取UID
+            author_link = element if element.tag == 'a' else next(element.iterdescendants('a'), None)
+            if author_link is not None and author_link.get('href'):
+                uid_match = UID_IN_HREF_PATTERN.search(author_link.get('href'))
+                if uid_match:
+                    fields['author_uid'] = uid_match.group(1)
+            break
+
+    if data_author is not None:
+        fields['data_author'] = data_author.get('data-author') or None
+
+    for _, element in plan.ordered(first, 'time'):
+        time_text = stripped_text(element)
+        if time_text:
+            fields['publish_time'] = time_text
+            break
+
+    for selector, element in plan.ordered(first, 'content'):
+        # 与原 extract_formatted_text 相同：合并空行后加盘古之白再去掉首尾空白，长度判断也基于加空格后的文本
+        content_text = EXTRA_NEWLINES_PATTERN.sub('\n\n', element_text(element, formatted=True))
+        content_text = text_normalizer.add_pangu_spacing(content_text).strip()
+        if len(content_text) > 50:
+            fields['content'] = content_text
+            fields['content_selector'] = selector
+            break
+
+    for _, element in plan.ordered(first, 'next'):
+        href = element.get('href')
+        if href:
+            fields['next_chapter_url'] = absolute_next_url(href)
+            break
+    else:
+        # 选择器都没有找到时，按链接文字查找
+        for link in links:
+            href = link.get('href')
+            if any(keyword in stripped_text(link) for keyword in NEXT_LINK_KEYWORDS):
+                if 'ttarticle' in href or 'show?id=' in href:
+                    next_url = absolute_next_url(href, allow_relative=False)
+                    if next_url:
+                        fields['next_chapter_url'] = next_url
+                        break
+
+    fields['scripts'] = [script for script in scripts if 'longTextContent' in script]
+    return fields
@@ -6,20 +6,1580 @@
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.retry import Retry
 import json
 import time
 import re
+import hashlib
+import gzip
+import zlib
 from urllib.parse import  urlparse, parse_qs
 import os
 from datetime import datetime
-from bs4 import BeautifulSoup
 import argparse
-from zhconv import convert
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed, wait
+import ast
+import io
+import contextlib
+import signal
+import random
+import sys
+import cProfile
+import pstats
+import text_normalizer
+import html_extractor
+
+# Markdown格式化使用的预编译正则
+EXTRA_NEWLINES_PATTERN = re.compile(r'\n{3,}')
+BLANK_LINES_PATTERN = re.compile(r'\n\s*\n+')
+SINGLE_NEWLINE_PATTERN = re.compile(r'(?<!\n)\n(?!\n)')
+
+# JSON字段中HTML片段的清理
+BR_TAG_PATTERN = re.compile(r'<br>|<br/>|<br />')
+HTML_TAG_PATTERN = re.compile(r'<[^>]+>')
+
+# 原实现中单引号的替换值误写成了跨行的三引号字符串，已有输出中的每个单引号都被替换成了这段文本；
+# 双引号的开/闭引号都是半角双引号，等同于不处理。保留这两点以保证新旧输出（包括增量追加的内容）逐字节一致
+LEGACY_SINGLE_QUOTE = ')\n                    in_single_quote = True\n                else:\n                    processed_content_with_quotes.append('
+MARKDOWN_QUOTES = {'double_quotes': None, 'single_quotes': (LEGACY_SINGLE_QUOTE, LEGACY_SINGLE_QUOTE)}
+
+# 头条文章列表接口每页请求的篇数
+CATALOG_PAGE_SIZE = 20
+# 作者目录链接中的文章ID（?id=、#/id=、/id/ 三种形式）
+CATALOG_ID_PATTERN = re.compile(r'(?:[?&]id=|#/id=|/id/)(\d+)')
+
+# 专栏目录发现：详情数据中可能带有章节列表的键，以及标题中的章节序号
+SERIES_KEY_PATTERN = re.compile(r'series|collection|chapter|catalog|column', re.IGNORECASE)
+CHAPTER_NUMBER_PATTERN = re.compile(r'第\s*([0-9]+|[零〇一二两三四五六七八九十百千]+)\s*[章节節回集话話部篇卷]')
+TRAILING_NUMBER_PATTERN = re.compile(r'[\s(（\[【]*(\d+)[)）\]】]*\s*$')
+CHINESE_DIGITS = {'零': 0, '〇': 0, '一': 1, '二': 2, '两': 2, '三': 3, '四': 4, '五': 5, '六': 6, '七': 7, '八': 8, '九': 9}
+CHINESE_UNITS = {'十': 10, '百': 100, '千': 1000}
+
+# 各类接口在会话公共请求头之上覆盖的请求头，只构造一次
+MOBILE_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (iPhone; CPU iPhone OS 14_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0 Mobile/15E148 Safari/604.1',
+    'Referer': 'https://m.weibo.cn/',
+}
+AJAX_HEADERS = {
+    'X-Requested-With': 'XMLHttpRequest',
+    'Accept': 'application/json, text/plain, */*',
+}
+
+# 微博的限流响应状态码
+THROTTLE_STATUS_CODES = (414, 418, 429)
+
+
+class TokenBucket:
+    """令牌桶：按固定速率补充令牌，令牌不足时预约并等待"""
+    
+    def __init__(self, rate, capacity=1):
+        self.rate = rate  # 每秒补充的令牌数
+        self.capacity = capacity  # 桶容量（允许的突发请求数）
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """取出一个令牌，返回等待的秒数"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+    
+    def set_rate(self, rate):
+        """修改补充速率：先按旧速率结算已经过去的时间，与acquire互斥"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.rate = rate
+
+
+class HostRateLimiter:
+    """按主机划分的令牌桶限速器，多个爬虫实例共享时总请求速率仍受每个主机的上限约束"""
+    
+    def __init__(self, default_rate=1.0, host_rates=None, burst=1):
+        self.default_rate = default_rate
+        self.host_rates = dict(host_rates or {})
+        self.burst = burst
+        self.buckets = {}
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.request_counts = {}
+    
+    def bucket_for(self, host):
+        """获取指定主机的令牌桶（按需创建）"""
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.host_rates.get(host, self.default_rate), self.burst)
+                self.buckets[host] = bucket
+            return bucket
+    
+    def acquire(self, url):
+        """为URL所属主机取出一个令牌，返回等待的秒数"""
+        return self.bucket_for(urlparse(url).netloc).acquire()
+    
+    def observe(self, url, status_code, latency, throttled=False):
+        """记录一次请求的结果（固定速率限速器只做统计）"""
+        host = urlparse(url).netloc
+        with self.lock:
+            self.request_counts[host] = self.request_counts.get(host, 0) + 1
+    
+    def summary(self):
+        """返回每个主机的当前速率、请求数和实际请求速率"""
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        with self.lock:
+            return {
+                host: {
+                    'rate': bucket.rate,
+                    'requests': self.request_counts.get(host, 0),
+                    'effective_rps': self.request_counts.get(host, 0) / elapsed,
+                }
+                for host, bucket in self.buckets.items()
+            }
+    
+    def print_summary(self):
+        """打印限速统计"""
+        print("\n请求速率统计:")
+        for host, stats in self.summary().items():
+            line = f"  {host}: 请求 {stats['requests']} 次，实际 {stats['effective_rps']:.2f} 请求/秒，当前限速 {stats['rate']:.2f} 请求/秒"
+            if 'backoffs' in stats:
+                line += f"，退避 {stats['backoffs']} 次"
+            print(line)
+
+
+class AdaptiveHostRateLimiter(HostRateLimiter):
+    """AIMD自适应限速器：响应正常时加性提高速率，遇到限流信号或延迟持续升高时乘性降低速率"""
+    
+    THROTTLE_STATUS_CODES = THROTTLE_STATUS_CODES
+    
+    def __init__(self, default_rate=1.0, host_rates=None, burst=1, min_rate=0.05, max_rate=4.0,
+                 increase_step=0.05, decrease_factor=0.5, latency_factor=3.0, latency_floor=0.25, slow_streak=3):
+        super().__init__(default_rate, host_rates, burst)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase_step = increase_step  # 每次正常响应增加的速率（请求/秒）
+        self.decrease_factor = decrease_factor  # 遇到限流时速率乘以该系数
+        self.latency_factor = latency_factor  # 延迟超过基线的倍数即视为变慢
+        self.latency_floor = latency_floor  # 低于该延迟（秒）的响应不算变慢，避免毫秒级延迟的抖动触发退避
+        self.slow_streak = slow_streak  # 连续多少个变慢的响应才视为拥塞
+        self.slow_counts = {}
+        self.baseline_latency = {}
+        self.last_backoff = {}
+        self.backoffs = {}
+    
+    def observe(self, url, status_code, latency, throttled=False):
+        """根据响应状态和延迟调整该主机的请求速率"""
+        super().observe(url, status_code, latency, throttled)
+        host = urlparse(url).netloc
+        bucket = self.bucket_for(host)
+        with self.lock:
+            baseline = self.baseline_latency.get(host)
+            if baseline is not None and latency > max(baseline * self.latency_factor, self.latency_floor):
+                self.slow_counts[host] = self.slow_counts.get(host, 0) + 1
+            else:
+                self.slow_counts[host] = 0
+            congested = self.slow_counts[host] >= self.slow_streak
+            if throttled or status_code is None or status_code in self.THROTTLE_STATUS_CODES or congested:
+                # 同一轮突发的多个限流信号只退避一次
+                now = time.monotonic()
+                if now - self.last_backoff.get(host, 0.0) >= 1.0 / bucket.rate:
+                    bucket.set_rate(max(self.min_rate, bucket.rate * self.decrease_factor))
+                    self.last_backoff[host] = now
+                    self.backoffs[host] = self.backoffs.get(host, 0) + 1
+                    self.slow_counts[host] = 0
+                    print(f"检测到限流信号，{host} 速率降至 {bucket.rate:.2f} 请求/秒")
+            else:
+                bucket.set_rate(min(self.max_rate, bucket.rate + self.increase_step))
+                if not self.slow_counts[host]:
+                    self.baseline_latency[host] = latency if baseline is None else baseline * 0.9 + latency * 0.1
+    
+    def summary(self):
+        stats = super().summary()
+        with self.lock:
+            for host, host_stats in stats.items():
+                host_stats['backoffs'] = self.backoffs.get(host, 0)
+        return stats
+
+
+class TransportRetry(Retry):
+    """带Retry-After头的响应是服务端的限流信号，不在urllib3内部重试，直接返回给限速器处理"""
+
+    def is_retry(self, method, status_code, has_retry_after=False):
+        if has_retry_after:
+            return False
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+class HttpTransport:
+    """
+    共享的HTTP传输层：按主机设置连接池大小，所有爬虫实例和接口共用同一组适配器以复用keep-alive连接，
+    幂等的GET请求遇到连接错误或5xx时由urllib3按指数退避重试
+    418/429以及带Retry-After头的413/429/503不在重试范围内，仍交给限速器处理
+    """
+
+    RETRY_STATUS_CODES = (500, 502, 503, 504)
+
+    def __init__(self, pool_size=10, host_pool_sizes=None, retries=3, backoff=0.5):
+        self.pool_size = pool_size
+        self.host_pool_sizes = dict(host_pool_sizes or {})
+        # 不按Retry-After在适配器里休眠重试，否则限流响应既绕过AIMD退避又占住工作线程
+        self.retry = TransportRetry(total=retries, connect=retries, read=retries, status=retries,
+                                    backoff_factor=backoff, status_forcelist=self.RETRY_STATUS_CODES,
+                                    allowed_methods=frozenset({'GET', 'HEAD'}), raise_on_status=False,
+                                    respect_retry_after_header=False)
+        self.default_adapter = self.create_adapter(pool_size)
+        self.host_adapters = {host: self.create_adapter(size) for host, size in self.host_pool_sizes.items()}
+
+    def create_adapter(self, pool_size):
+        # pool_connections是缓存的主机连接池个数，pool_maxsize是每个主机保留的空闲连接数
+        return HTTPAdapter(pool_connections=max(32, len(self.host_pool_sizes) + 1), pool_maxsize=pool_size,
+                           max_retries=self.retry)
+
+    def mount(self, session):
+        """把共享的适配器挂载到会话上（按主机的适配器前缀更长，优先匹配）"""
+        session.mount('https://', self.default_adapter)
+        session.mount('http://', self.default_adapter)
+        for host, adapter in self.host_adapters.items():
+            session.mount(f'https://{host}/', adapter)
+            session.mount(f'http://{host}/', adapter)
+
+    def connection_stats(self):
+        """返回每个主机新建的连接数和发出的请求数（含重试），复用率 = 1 - 新建连接数 / 请求数"""
+        stats = {}
+        for adapter in [self.default_adapter, *self.host_adapters.values()]:
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                host = f"{key.key_host}:{key.key_port}" if key.key_port else key.key_host
+                entry = stats.setdefault(host, {'connections': 0, 'requests': 0})
+                entry['connections'] += pool.num_connections
+                entry['requests'] += pool.num_requests
+        for entry in stats.values():
+            entry['reuse_rate'] = 1 - entry['connections'] / entry['requests'] if entry['requests'] else 0.0
+        return stats
+
+    def print_summary(self):
+        """打印连接复用统计"""
+        stats = self.connection_stats()
+        if not stats:
+            return
+        print("\n连接复用统计:")
+        for host, entry in stats.items():
+            size = self.host_pool_sizes.get(host.split(':')[0], self.pool_size)
+            print(f"  {host}: 请求 {entry['requests']} 次，新建连接 {entry['connections']} 个，"
+                  f"复用率 {entry['reuse_rate']:.1%}（连接池 {size}）")
+
+
+def split_endpoint_url(url):
+    """把URL拆分为（接口, 文章ID），无法识别文章ID的URL以完整查询串代替文章ID"""
+    parsed = urlparse(url)
+    path = parsed.path.rstrip('/')
+    id_match = re.search(r'/id/([^/]+)$', path)
+    if id_match:
+        return f"{parsed.netloc}{path[:id_match.start()]}/id", id_match.group(1)
+    query = parse_qs(parsed.query)
+    if set(query) == {'id'}:
+        return f"{parsed.netloc}{path}", query['id'][0]
+    return f"{parsed.netloc}{path}", parsed.query
+
+
+def catalog_key(article):
+    """作者目录中文章的去重键：链接中的文章ID，没有ID时使用链接本身"""
+    url = article.get('url', '')
+    match = CATALOG_ID_PATTERN.search(url)
+    return match.group(1) if match else url
+
+
+def chinese_number(text):
+    """把阿拉伯数字或中文数字（如 十二、一百零五）转换为整数"""
+    if text.isdigit():
+        return int(text)
+    total, current = 0, 0
+    for char in text:
+        if char in CHINESE_DIGITS:
+            current = CHINESE_DIGITS[char]
+        elif char in CHINESE_UNITS:
+            total += (current or 1) * CHINESE_UNITS[char]
+            current = 0
+    return total + current
+
+
+def split_chapter_title(title):
+    """把章节标题拆分为（专栏名, 章节序号），如 "书名 第十二章 标题" -> ("书名", 12)；无法识别序号时返回（None, None）"""
+    match = CHAPTER_NUMBER_PATTERN.search(title)
+    if match:
+        return title[:match.start()].strip() or None, chinese_number(match.group(1))
+    match = TRAILING_NUMBER_PATTERN.search(title)
+    if match and match.start() > 0:
+        return title[:match.start()].strip() or None, int(match.group(1))
+    return None, None
+
+
+def toc_item_id(item):
+    """目录条目（文章ID、链接或包含id/url字段的字典）中的文章ID"""
+    if isinstance(item, (str, int)):
+        value = str(item)
+    elif isinstance(item, dict):
+        value = next((str(item[key]) for key in ('id', 'article_id', 'object_id', 'oid') if item.get(key)), '')
+        if not value:
+            match = CATALOG_ID_PATTERN.search(str(item.get('url') or item.get('page_url') or ''))
+            value = match.group(1) if match else ''
+    else:
+        return None
+    match = CATALOG_ID_PATTERN.search(value)
+    if match:
+        return match.group(1)
+    # object_id 形如 1022:2309404...
+    return value.rpartition(':')[2] or None
+
+
+def find_series_toc(data):
+    """在头条文章详情数据的 series/collection/chapter 等键下查找章节列表，返回头条文章ID列表（至少两章）"""
+    for key, value in data.items():
+        if not SERIES_KEY_PATTERN.search(key):
+            continue
+        if isinstance(value, dict):
+            value = next((value[name] for name in ('list', 'articles', 'chapters', 'items', 'data')
+                          if isinstance(value.get(name), list)), None)
+        if not isinstance(value, list):
+            continue
+        ids = [toc_item_id(item) for item in value]
+        ids = list(dict.fromkeys(article_id for article_id in ids if article_id and article_id_shape(article_id) == 'ttarticle'))
+        if len(ids) >= 2:
+            return ids
+    return None
+
+
+def order_toc(ids, current_id, next_id):
+    """
+    把目录整理为当前章之后按阅读顺序排列的文章ID：用下一章链接确定目录方向（有的目录按发布时间倒序）；
+    当前章或下一章不在目录中时目录不可信，返回None
+    """
+    if current_id not in ids or not next_id or next_id not in ids:
+        return None
+    if ids.index(next_id) < ids.index(current_id):
+        ids = ids[::-1]
+    return ids[ids.index(current_id) + 1:]
+
+
+def article_id_shape(article_id):
+    """判断文章ID的形态：头条文章ID、纯数字微博ID或其他（如bid）"""
+    article_id = str(article_id)
+    if article_id.isdigit():
+        return 'ttarticle' if article_id.startswith('230940') else 'mid'
+    return 'bid'
+
+
+class EndpointScoreboard:
+    """
+    详情接口健康记分板：按接口和文章ID形态统计成功率与延迟，动态排序并对连续失败的接口熔断
+
+    只有头条文章详情接口的响应带有下一章链接，其他接口成功率再高也拿不到下一章，排到前面会使专栏爬取在当前章静默结束，
+    因此头条文章ID总是先尝试详情接口（不受排序和熔断影响），其余接口按健康程度排序
+    """
+    
+    SERIES_ENDPOINTS = ('weibo.com/ttarticle/x/m/aj/detail',)
+    
+    def __init__(self, state_file='.weibo_endpoint_health.json', failure_threshold=3, cooldown=600):
+        self.state_file = state_file
+        self.failure_threshold = failure_threshold  # 连续失败多少次后熔断
+        self.cooldown = cooldown  # 熔断后多久允许再次试探（秒）
+        self.lock = threading.Lock()
+        self.stats = self._load()
+    
+    def _load(self):
+        if not self.state_file or not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"加载接口健康记录失败: {e}")
+            return {}
+    
+    def save(self):
+        """持久化记分板，供下次运行使用"""
+        if not self.state_file:
+            return
+        with self.lock:
+            tmp_file = self.state_file + '.tmp'
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self.stats, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_file, self.state_file)
+    
+    def _key(self, api_url):
+        endpoint, article_id = split_endpoint_url(api_url)
+        return f"{endpoint}|{article_id_shape(article_id)}"
+    
+    def record(self, api_url, success, latency):
+        """记录一次接口尝试的结果"""
+        key = self._key(api_url)
+        with self.lock:
+            entry = self.stats.setdefault(key, {
+                'successes': 0, 'failures': 0, 'consecutive_failures': 0,
+                'avg_latency': latency, 'open_until': 0.0,
+            })
+            entry['avg_latency'] = entry['avg_latency'] * 0.8 + latency * 0.2
+            if success:
+                entry['successes'] += 1
+                entry['consecutive_failures'] = 0
+                entry['open_until'] = 0.0
+            else:
+                entry['failures'] += 1
+                entry['consecutive_failures'] += 1
+                if entry['consecutive_failures'] >= self.failure_threshold:
+                    entry['open_until'] = time.time() + self.cooldown
+    
+    def _score(self, entry):
+        # 平滑后的成功率，没有记录的接口按0.5计
+        return (entry['successes'] + 1) / (entry['successes'] + entry['failures'] + 2)
+    
+    def is_series_endpoint(self, api_url):
+        endpoint, article_id = split_endpoint_url(api_url)
+        return endpoint in self.SERIES_ENDPOINTS and article_id_shape(article_id) == 'ttarticle'
+    
+    def order(self, api_urls):
+        """按健康程度重排（序号, URL）列表并跳过处于熔断中的接口；头条文章的详情接口固定排在最前"""
+        now = time.time()
+        pinned = [(i, api_url) for i, api_url in api_urls if self.is_series_endpoint(api_url)]
+        with self.lock:
+            ranked = []
+            for position, (i, api_url) in enumerate(api_urls):
+                if (i, api_url) in pinned:
+                    continue
+                entry = self.stats.get(self._key(api_url))
+                if entry is None:
+                    ranked.append((0.5, 0.0, position, i, api_url, False))
+                else:
+                    is_open = entry['open_until'] > now
+                    ranked.append((self._score(entry), entry['avg_latency'], position, i, api_url, is_open))
+        ranked.sort(key=lambda item: (-item[0], item[1], item[2]))
+        available = [(i, api_url) for _, _, _, i, api_url, is_open in ranked if not is_open]
+        # 所有接口都在熔断中时仍按健康程度全部尝试
+        return pinned + (available or [(i, api_url) for _, _, _, i, api_url, _ in ranked])
+    
+    def print_summary(self):
+        """打印各接口的健康状况"""
+        now = time.time()
+        print("\n接口健康状况:")
+        with self.lock:
+            for key, entry in sorted(self.stats.items(), key=lambda item: -self._score(item[1])):
+                total = entry['successes'] + entry['failures']
+                state = '熔断中' if entry['open_until'] > now else '正常'
+                print(f"  {key}: 成功 {entry['successes']}/{total}，平均延迟 {entry['avg_latency']:.2f}秒，{state}")
+
+
+class MetricsRegistry:
+    """按接口（主机+路径）统计请求、延迟、下载字节、解析耗时、接口回退深度、限速等待和章节速率，导出为Prometheus文本格式和JSON"""
+    
+    LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    PARSE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+    
+    def __init__(self, output_dir='weibo_metrics', flush_interval=60):
+        self.output_dir = output_dir
+        self.flush_interval = flush_interval  # 长时间运行时每隔多少秒写出一次（0表示只在结束时写出）
+        self.run_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+        # 信号处理函数中也会导出，使用可重入锁
+        self.lock = threading.RLock()
+        self.started = time.monotonic()
+        self.last_flush = self.started
+        self.requests = {}  # (主机, 路径, 状态) -> 次数
+        self.latency = {}  # (主机, 路径) -> 直方图
+        self.bytes = {}  # (主机, 路径) -> 字节数
+        self.parse = {}  # (主机, 路径) -> 直方图
+        self.cache_hits = {}  # (主机, 路径) -> 次数
+        self.fallback = {}  # （尝试次序, 接口序号）-> 成功次数
+        self.detail_failures = 0  # 所有接口都失败的文章数
+        self.sleep = {}  # 主机 -> 限速等待秒数
+        self.chapters = 0
+    
+    @staticmethod
+    def endpoint_labels(url):
+        endpoint, _ = split_endpoint_url(url)
+        host = urlparse(url).netloc
+        return host, endpoint[len(host):] or '/'
+    
+    def _observe(self, histograms, key, buckets, value):
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = {'buckets': [0] * len(buckets), 'count': 0, 'sum': 0.0}
+        for index, bound in enumerate(buckets):
+            if value <= bound:
+                histogram['buckets'][index] += 1
+        histogram['count'] += 1
+        histogram['sum'] += value
+    
+    def record_request(self, url, status_code, latency, size):
+        """记录一次网络请求（status_code为None表示请求出错）"""
+        host, path = self.endpoint_labels(url)
+        status = str(status_code) if status_code is not None else 'error'
+        with self.lock:
+            key = (host, path, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self._observe(self.latency, (host, path), self.LATENCY_BUCKETS, latency)
+            self.bytes[(host, path)] = self.bytes.get((host, path), 0) + size
+    
+    def record_cache_hit(self, url):
+        key = self.endpoint_labels(url)
+        with self.lock:
+            self.cache_hits[key] = self.cache_hits.get(key, 0) + 1
+    
+    def record_parse(self, url, seconds):
+        with self.lock:
+            self._observe(self.parse, self.endpoint_labels(url), self.PARSE_BUCKETS, seconds)
+    
+    def record_fallback(self, depth, api_index):
+        """记录文章内容由第几次尝试的哪个接口获取成功；depth为None表示所有接口都失败"""
+        with self.lock:
+            if depth is None:
+                self.detail_failures += 1
+            else:
+                key = (depth, api_index)
+                self.fallback[key] = self.fallback.get(key, 0) + 1
+    
+    def record_sleep(self, url, seconds):
+        if seconds <= 0:
+            return
+        host = urlparse(url).netloc
+        with self.lock:
+            self.sleep[host] = self.sleep.get(host, 0.0) + seconds
+    
+    def record_chapter(self):
+        """记录完成一章；距上次写出超过flush_interval时写出一次当前统计"""
+        with self.lock:
+            self.chapters += 1
+            due = self.flush_interval and time.monotonic() - self.last_flush >= self.flush_interval
+        if due:
+            self.write()
+    
+    def chapters_per_second(self):
+        return self.chapters / max(time.monotonic() - self.started, 1e-6)
+    
+    @staticmethod
+    def _labels(**labels):
+        return '{' + ','.join(f'{name}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+                              for name, value in labels.items()) + '}'
+    
+    def _histogram_lines(self, name, histograms, buckets):
+        lines = []
+        for (host, path), histogram in sorted(histograms.items()):
+            for bound, count in zip(buckets, histogram['buckets']):
+                lines.append(f"{name}_bucket{self._labels(host=host, path=path, le=bound)} {count}")
+            lines.append(f"{name}_bucket{self._labels(host=host, path=path, le='+Inf')} {histogram['count']}")
+            lines.append(f"{name}_sum{self._labels(host=host, path=path)} {histogram['sum']:.6f}")
+            lines.append(f"{name}_count{self._labels(host=host, path=path)} {histogram['count']}")
+        return lines
+    
+    def to_prometheus(self):
+        """Prometheus文本格式"""
+        with self.lock:
+            lines = ['# HELP weibo_requests_total 网络请求数（按接口和状态码）', '# TYPE weibo_requests_total counter']
+            lines += [f"weibo_requests_total{self._labels(host=host, path=path, status=status)} {count}"
+                      for (host, path, status), count in sorted(self.requests.items())]
+            lines += ['# HELP weibo_request_duration_seconds 请求延迟', '# TYPE weibo_request_duration_seconds histogram']
+            lines += self._histogram_lines('weibo_request_duration_seconds', self.latency, self.LATENCY_BUCKETS)
+            lines += ['# HELP weibo_response_bytes_total 下载的响应字节数', '# TYPE weibo_response_bytes_total counter']
+            lines += [f"weibo_response_bytes_total{self._labels(host=host, path=path)} {size}"
+                      for (host, path), size in sorted(self.bytes.items())]
+            lines += ['# HELP weibo_cache_hits_total 从响应缓存读取的请求数', '# TYPE weibo_cache_hits_total counter']
+            lines += [f"weibo_cache_hits_total{self._labels(host=host, path=path)} {count}"
+                      for (host, path), count in sorted(self.cache_hits.items())]
+            lines += ['# HELP weibo_parse_duration_seconds 详情接口响应的解码和解析耗时', '# TYPE weibo_parse_duration_seconds histogram']
+            lines += self._histogram_lines('weibo_parse_duration_seconds', self.parse, self.PARSE_BUCKETS)
+            lines += ['# HELP weibo_detail_success_total 获取文章内容成功的次数（depth为第几次尝试，api为接口序号1-6）',
+                      '# TYPE weibo_detail_success_total counter']
+            lines += [f"weibo_detail_success_total{self._labels(depth=depth, api=api)} {count}"
+                      for (depth, api), count in sorted(self.fallback.items())]
+            lines += ['# HELP weibo_detail_failures_total 所有接口都失败的文章数', '# TYPE weibo_detail_failures_total counter',
+                      f"weibo_detail_failures_total {self.detail_failures}"]
+            lines += ['# HELP weibo_politeness_sleep_seconds_total 按主机限速等待的时间', '# TYPE weibo_politeness_sleep_seconds_total counter']
+            lines += [f"weibo_politeness_sleep_seconds_total{self._labels(host=host)} {seconds:.6f}"
+                      for host, seconds in sorted(self.sleep.items())]
+            lines += ['# HELP weibo_chapters_total 爬取完成的章节数', '# TYPE weibo_chapters_total counter',
+                      f"weibo_chapters_total {self.chapters}",
+                      '# HELP weibo_chapters_per_second 本次运行的平均章节速率', '# TYPE weibo_chapters_per_second gauge',
+                      f"weibo_chapters_per_second {self.chapters_per_second():.6f}"]
+        return '\n'.join(lines) + '\n'
+    
+    @staticmethod
+    def _histogram_summary(histogram, buckets):
+        return {
+            'count': histogram['count'],
+            'sum': histogram['sum'],
+            'mean': histogram['sum'] / histogram['count'] if histogram['count'] else None,
+            'buckets': {str(bound): count for bound, count in zip(buckets, histogram['buckets'])},
+        }
+    
+    def to_dict(self):
+        """JSON摘要：按接口汇总，另含回退深度、限速等待和章节速率"""
+        with self.lock:
+            endpoints = {}
+            for (host, path, status), count in self.requests.items():
+                entry = endpoints.setdefault(f"{host}{path}", {'requests': {}})
+                entry['requests'][status] = count
+            for key, size in self.bytes.items():
+                endpoints.setdefault(''.join(key), {'requests': {}})['bytes'] = size
+            for key, histogram in self.latency.items():
+                endpoints[''.join(key)]['latency_seconds'] = self._histogram_summary(histogram, self.LATENCY_BUCKETS)
+            for key, histogram in self.parse.items():
+                endpoints.setdefault(''.join(key), {'requests': {}})['parse_seconds'] = self._histogram_summary(histogram, self.PARSE_BUCKETS)
+            for key, count in self.cache_hits.items():
+                endpoints.setdefault(''.join(key), {'requests': {}})['cache_hits'] = count
+            elapsed = time.monotonic() - self.started
+            return {
+                'run_id': self.run_id,
+                'written_at': datetime.now().isoformat(timespec='seconds'),
+                'elapsed_seconds': elapsed,
+                'chapters': self.chapters,
+                'chapters_per_second': self.chapters_per_second(),
+                'endpoints': dict(sorted(endpoints.items())),
+                'fallback': [{'depth': depth, 'api': api, 'successes': count}
+                             for (depth, api), count in sorted(self.fallback.items())],
+                'detail_failures': self.detail_failures,
+                'politeness_sleep_seconds': dict(sorted(self.sleep.items())),
+            }
+    
+    def write(self):
+        """写出 weibo_crawler.prom（固定文件名，供node_exporter的textfile收集器读取）和本次运行的JSON摘要"""
+        with self.lock:
+            self.last_flush = time.monotonic()
+            try:
+                os.makedirs(self.output_dir, exist_ok=True)
+                prom_file = os.path.join(self.output_dir, 'weibo_crawler.prom')
+                json_file = os.path.join(self.output_dir, f"weibo_metrics_{self.run_id}.json")
+                for path, content in ((prom_file, self.to_prometheus()),
+                                      (json_file, json.dumps(self.to_dict(), ensure_ascii=False, indent=2))):
+                    tmp_file = path + '.tmp'
+                    with open(tmp_file, 'w', encoding='utf-8') as f:
+                        f.write(content)
+                    os.replace(tmp_file, path)
+                return prom_file, json_file
+            except OSError as e:
+                print(f"写入运行指标失败: {e}")
+                return None, None
+    
+    def print_summary(self):
+        """打印指标文件位置和章节速率"""
+        prom_file, json_file = self.write()
+        if prom_file:
+            print(f"运行指标: {prom_file}, {json_file}（{self.chapters} 章，{self.chapters_per_second():.2f} 章/秒）")
+
+
+class _NullSpan:
+    """未采样时使用的空span"""
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        return False
+    
+    def set(self, **args):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+    
+    def __enter__(self):
+        self.started = time.perf_counter_ns()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type:
+            self.args['error'] = exc_type.__name__
+        self.tracer._add_event(self.name, self.started, time.perf_counter_ns() - self.started, self.args)
+        return False
+    
+    def set(self, **args):
+        """补充span的属性（如状态码）"""
+        self.args.update(args)
+
+
+class _RootSpan(_Span):
+    def __init__(self, tracer, name, args, sampled):
+        super().__init__(tracer, name, args)
+        self.sampled = sampled
+    
+    def __enter__(self):
+        self.previous = getattr(self.tracer.local, 'sampled', False)
+        self.tracer.local.sampled = self.sampled
+        return super().__enter__() if self.sampled else self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.tracer.local.sampled = self.previous
+        return super().__exit__(exc_type, exc, tb) if self.sampled else False
+    
+    def set(self, **args):
+        if self.sampled:
+            super().set(**args)
+
+
+class Tracer:
+    """
+    轻量的章节追踪：每章一个根span，接口尝试、限速等待、解码、解析、补充请求和文本规范化为子span
+    按采样率决定是否记录一章，未采样的章节所有span都是空操作；导出为Chrome trace JSON，
+    可用 chrome://tracing、Perfetto 或 speedscope 打开查看瀑布图
+    """
+    
+    def __init__(self, path, sample_rate=1.0):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.pid = os.getpid()
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.events = []
+        self.threads = {}
+        self.origin = time.perf_counter_ns()
+        self.random = random.Random()
+    
+    def trace(self, name, force=False, **args):
+        """根span：按采样率决定本次（如一章）是否记录，force为True时总是记录"""
+        with self.lock:
+            sampled = force or self.random.random() < self.sample_rate
+        return _RootSpan(self, name, args, sampled)
+    
+    def span(self, name, **args):
+        """子span，当前线程不在已采样的根span内时为空操作"""
+        if not getattr(self.local, 'sampled', False):
+            return NULL_SPAN
+        return _Span(self, name, args)
+    
+    def wrap(self, func):
+        """把当前线程的采样状态带到线程池中执行的函数"""
+        sampled = getattr(self.local, 'sampled', False)
+        
+        def traced(*args, **kwargs):
+            previous = getattr(self.local, 'sampled', False)
+            self.local.sampled = sampled
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.local.sampled = previous
+        return traced
+    
+    def _add_event(self, name, started, duration, args):
+        thread = threading.current_thread()
+        event = {'name': name, 'ph': 'X', 'pid': self.pid, 'tid': thread.ident,
+                 'ts': (started - self.origin) / 1000, 'dur': duration / 1000}
+        if args:
+            event['args'] = args
+        with self.lock:
+            self.events.append(event)
+            self.threads.setdefault(thread.ident, thread.name)
+    
+    def write(self):
+        """写出Chrome trace JSON文件"""
+        with self.lock:
+            events = [{'name': 'thread_name', 'ph': 'M', 'pid': self.pid, 'tid': tid, 'args': {'name': name}}
+                      for tid, name in self.threads.items()]
+            events += sorted(self.events, key=lambda event: event['ts'])
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump({'traceEvents': events, 'displayTimeUnit': 'ms',
+                           'otherData': {'sample_rate': self.sample_rate}}, f, ensure_ascii=False)
+            print(f"追踪文件已保存到: {self.path}（{len(events) - len(self.threads)} 个span，采样率 {self.sample_rate:g}）")
+        except OSError as e:
+            print(f"写入追踪文件失败: {e}")
+
+
+class CrawlProfiler:
+    """
+    --profile 使用的性能分析器：cProfile记录主线程和之后创建的线程（预取、并发请求、批量爬取），
+    另有一个采样线程定时记录所有线程的调用栈，输出火焰图工具可读的折叠栈文本
+    """
+    
+    # 各阶段对应的函数（文件名, 函数名）；同一阶段内的函数互相调用时只计一次
+    STAGES = [
+        ('fetch', [('weibo_ttarticle_crawler.py', 'request')]),
+        ('decode', [('weibo_ttarticle_crawler.py', 'decode_json_response'),
+                    ('weibo_ttarticle_crawler.py', 'decode_escaped_text'), ('weibo_ttarticle_crawler.py', 'text'),
+                    ('models.py', 'text')]),
+        ('parse', [('weibo_ttarticle_crawler.py', 'parse_article_content')]),
+        ('extract', [('html_extractor.py', 'extract_article_fields')]),
+        ('normalize', [('text_normalizer.py', 'normalize_blocks'), ('text_normalizer.py', 'normalize_text')]),
+        ('save', [('weibo_ttarticle_crawler.py', 'save_results_with_chapters'),
+                  ('weibo_ttarticle_crawler.py', 'write_chapter')]),
+    ]
+    # 最内层帧位于这些文件时视为空闲等待的线程，不计入折叠栈
+    IDLE_FILES = ('threading.py', 'queue.py', 'thread.py')
+    
+    def __init__(self, prefix, interval=0.005):
+        self.prefix = prefix
+        self.interval = interval  # 采样间隔（秒）
+        self.profilers = []
+        self.lock = threading.Lock()
+        self.samples = {}
+        self.stopping = threading.Event()
+        self.sampler = None
+        self.started = None
+        self.elapsed = 0.0
+    
+    def _thread_hook(self, frame, event, arg):
+        # 新线程的第一个profile事件：为该线程启用独立的cProfile（enable会替换掉这个钩子）
+        profiler = cProfile.Profile()
+        with self.lock:
+            self.profilers.append(profiler)
+        profiler.enable()
+    
+    def start(self):
+        self.started = time.perf_counter()
+        # 采样线程在安装线程钩子之前启动，不计入cProfile统计
+        self.sampler = threading.Thread(target=self._sample, name='profile-sampler', daemon=True)
+        self.sampler.start()
+        threading.setprofile(self._thread_hook)
+        profiler = cProfile.Profile()
+        self.profilers.append(profiler)
+        profiler.enable()
+    
+    def _sample(self):
+        own = threading.get_ident()
+        names = {}
+        while not self.stopping.wait(self.interval):
+            for thread in threading.enumerate():
+                names[thread.ident] = thread.name
+            for ident, frame in sys._current_frames().items():
+                if ident == own or os.path.basename(frame.f_code.co_filename) in self.IDLE_FILES:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                # 按线程名分组，线程池的线程合并为一组
+                thread_name = re.sub(r'_\d+$', '', names.get(ident, 'thread'))
+                key = ';'.join([thread_name] + stack[::-1])
+                self.samples[key] = self.samples.get(key, 0) + 1
+    
+    def stop(self):
+        """停止分析，返回合并后的pstats.Stats"""
+        self.profilers[0].disable()
+        threading.setprofile(None)
+        self.elapsed = time.perf_counter() - self.started
+        self.stopping.set()
+        self.sampler.join()
+        with self.lock:
+            profilers = list(self.profilers)
+        stats = pstats.Stats(profilers[0])
+        for profiler in profilers[1:]:
+            profiler.disable()
+            try:
+                stats.add(profiler)
+            except TypeError:
+                # 尚未记录任何调用的线程
+                pass
+        return stats
+    
+    def stage_times(self, stats):
+        """各阶段的累计时间：阶段内函数的累计时间之和，扣除阶段内函数之间的调用"""
+        results = []
+        for stage, functions in self.STAGES:
+            keys = {key for key in stats.stats
+                    if (os.path.basename(key[0]), key[2]) in functions}
+            total = 0.0
+            calls = 0
+            for key in keys:
+                _, _, _, _, callers = stats.stats[key]
+                for caller, (cc, nc, tt, ct) in callers.items():
+                    if caller not in keys:
+                        total += ct
+                        calls += nc
+            results.append((stage, calls, total))
+        return results
+    
+    def stop_and_report(self):
+        """停止分析，写出统计文件和折叠栈文件并打印各阶段耗时"""
+        stats = self.stop()
+        stats_file = f"{self.prefix}.prof"
+        collapsed_file = f"{self.prefix}.collapsed.txt"
+        try:
+            stats.dump_stats(stats_file)
+            with open(collapsed_file, 'w', encoding='utf-8') as f:
+                for stack, count in sorted(self.samples.items()):
+                    f.write(f"{stack} {count}\n")
+        except OSError as e:
+            print(f"写入性能分析文件失败: {e}")
+        
+        print(f"\n性能分析（总耗时 {self.elapsed:.2f} 秒，{len(self.profilers)} 个线程）:")
+        print(f"  {'阶段':<12}{'调用次数':>10}{'累计秒数':>12}{'占比':>8}")
+        for stage, calls, total in self.stage_times(stats):
+            share = total / self.elapsed * 100 if self.elapsed else 0.0
+            print(f"  {stage:<12}{calls:>10}{total:>12.3f}{share:>7.1f}%")
+        print("  （多线程时各线程的时间累加，占比可能超过100%；parse包含extract和decode_escaped_text）")
+        print("\n自身耗时最多的函数:")
+        stats.sort_stats('tottime').print_stats(15)
+        print(f"性能统计已保存到: {stats_file}（可用 python -m pstats 或 snakeviz 查看）")
+        print(f"折叠栈已保存到: {collapsed_file}（{sum(self.samples.values())} 个样本，可用 flamegraph.pl 或 speedscope 生成火焰图）")
+
+
+class OfflineCacheMiss(requests.RequestException):
+    """离线模式下请求的URL不在缓存中"""
+
+
+class FetchCancelled(requests.RequestException):
+    """并发模式下其他接口已经成功，本次请求在发出前被取消"""
+
+
+class CachedResponse:
+    """从磁盘缓存恢复的响应，提供与requests.Response相同的常用属性"""
+    
+    def __init__(self, url, status_code, headers, content, encoding):
+        self.url = url
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+        self.encoding = encoding
+        self.from_cache = True
+    
+    @property
+    def text(self):
+        return str(self.content, self.encoding or 'utf-8', errors='replace')
+    
+    def json(self):
+        return json.loads(self.text)
+
+
+class ResponseCache:
+    """磁盘HTTP响应缓存：按规范化的文章ID和接口缓存，按接口设置过期时间，超出容量时按LRU淘汰"""
+    
+    # 接口路径前缀 -> 过期时间（秒）；已完成的章节几乎不会变化，作者列表变化较快
+    DEFAULT_TTLS = {
+        'weibo.com/ttarticle/x/m/aj/detail': 7 * 86400,
+        'm.weibo.cn/statuses/extend': 7 * 86400,
+        'weibo.com/ajax/statuses/longtext': 7 * 86400,
+        'card.weibo.com/article/m/show/id': 7 * 86400,
+        'weibo.com/ttarticle/p/show': 7 * 86400,
+        'weibo.com/ajax/statuses/show': 7 * 86400,
+        'weibo.com/ajax/statuses/mymblog': 3600,
+        'm.weibo.cn/api/container/getIndex': 3600,
+        'weibo.com/ttarticle/api/profile/articles': 3600,
+        'weibo.com/ajax/search/searchall': 3600,
+    }
+    
+    def __init__(self, cache_dir='.weibo_cache', max_bytes=200 * 1024 * 1024, ttls=None, default_ttl=86400,
+                 flush_every=50, flush_interval=30.0):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.ttls = dict(self.DEFAULT_TTLS, **(ttls or {}))
+        self.default_ttl = default_ttl
+        self.index_file = os.path.join(cache_dir, 'index.json')
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # 索引不在每次写入后重写：累计flush_every次写入或距上次保存超过flush_interval秒时保存，close时保存剩余部分
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.pending_writes = 0
+        self.last_flush = time.monotonic()
+        os.makedirs(cache_dir, exist_ok=True)
+        self.index = self._load_index()
+        self.total_bytes = sum(entry['size'] for entry in self.index.values())
+    
+    def _load_index(self):
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_index(self):
+        tmp_file = self.index_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, ensure_ascii=False)
+        os.replace(tmp_file, self.index_file)
+        self.pending_writes = 0
+        self.last_flush = time.monotonic()
+    
+    def key_for(self, url):
+        endpoint, article_id = split_endpoint_url(url)
+        return f"{endpoint}|{article_id}"
+    
+    def ttl_for(self, url):
+        endpoint, _ = split_endpoint_url(url)
+        return self.ttls.get(endpoint, self.default_ttl)
+    
+    def get(self, url, allow_expired=False):
+        """读取缓存的响应，未命中或已过期时返回None"""
+        key = self.key_for(url)
+        with self.lock:
+            entry = self.index.get(key)
+            if entry and (allow_expired or time.time() - entry['stored_at'] <= self.ttl_for(url)):
+                try:
+                    with open(os.path.join(self.cache_dir, entry['file']), 'rb') as f:
+                        content = f.read()
+                except OSError:
+                    self.total_bytes -= entry['size']
+                    del self.index[key]
+                else:
+                    entry['last_access'] = time.time()
+                    self.hits += 1
+                    return CachedResponse(url, entry['status_code'], entry['headers'], content, entry['encoding'])
+            self.misses += 1
+            return None
+    
+    def put(self, url, response):
+        """写入响应并按LRU淘汰超出容量的条目"""
+        key = self.key_for(url)
+        filename = hashlib.sha1(key.encode('utf-8')).hexdigest() + '.bin'
+        content = response.content
+        with self.lock:
+            with open(os.path.join(self.cache_dir, filename), 'wb') as f:
+                f.write(content)
+            previous = self.index.get(key)
+            if previous:
+                self.total_bytes -= previous['size']
+            self.total_bytes += len(content)
+            now = time.time()
+            self.index[key] = {
+                'url': url,
+                'file': filename,
+                'size': len(content),
+                'status_code': response.status_code,
+                'headers': dict(response.headers),
+                'encoding': response.encoding or response.apparent_encoding,
+                'stored_at': now,
+                'last_access': now,
+            }
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+            self.pending_writes += 1
+            if self.pending_writes >= self.flush_every or time.monotonic() - self.last_flush >= self.flush_interval:
+                self._save_index()
+    
+    def _evict(self):
+        for key, entry in sorted(self.index.items(), key=lambda item: item[1]['last_access']):
+            if self.total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, entry['file']))
+            except OSError:
+                pass
+            self.total_bytes -= entry['size']
+            del self.index[key]
+    
+    def close(self):
+        """保存尚未写入的条目和访问时间等索引信息"""
+        with self.lock:
+            self._save_index()
+    
+    def print_summary(self):
+        """打印缓存命中统计"""
+        total = self.hits + self.misses
+        hit_rate = self.hits / total * 100 if total else 0.0
+        print(f"\n响应缓存: 命中 {self.hits} 次，未命中 {self.misses} 次，命中率 {hit_rate:.1f}%，缓存条目 {len(self.index)} 个")
+
+
+class ValidatorStore:
+    """
+    条件请求的校验信息：按接口和文章ID保存详情接口和文章页面响应的ETag/Last-Modified，
+    再次请求时发送If-None-Match/If-Modified-Since，服务器返回304时直接复用上次解析好的章节，不再解码和解析
+
+    状态文件只保存校验信息和章节内容的SHA-256，解析好的章节按哈希单独存放在章节目录中，304时才从磁盘读取
+    """
+
+    def __init__(self, state_file='.weibo_validators.json', max_entries=20000, chapter_dir=None):
+        self.state_file = state_file
+        self.max_entries = max_entries
+        if chapter_dir is None and state_file:
+            chapter_dir = os.path.splitext(state_file)[0] + '_chapters'
+        self.chapter_dir = chapter_dir
+        self.memory_chapters = {}  # 没有章节目录时（如压测）章节JSON保存在内存中
+        self.lock = threading.Lock()
+        self.entries = self._load()
+        self.orphans = set()  # 可能已无条目引用的章节哈希，保存时清理
+        self.not_modified = 0
+        self.modified = 0
+        self.bytes_saved = 0
+
+    def _load(self):
+        if not self.state_file or not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"加载条件请求校验信息失败: {e}")
+            return {}
+        # 旧格式的条目内嵌整章数据，直接丢弃，下次请求时重新下载
+        return {key: entry for key, entry in entries.items() if 'chapter' in entry}
+
+    def save(self):
+        """持久化校验信息，超出上限时丢弃最久未使用的条目，并删除不再被引用的章节文件"""
+        with self.lock:
+            if len(self.entries) > self.max_entries:
+                ordered = sorted(self.entries.items(), key=lambda item: item[1]['last_used'], reverse=True)
+                self.orphans.update(entry['chapter'] for _, entry in ordered[self.max_entries:])
+                self.entries = dict(ordered[:self.max_entries])
+            referenced = {entry['chapter'] for entry in self.entries.values()}
+            for digest in self.orphans - referenced:
+                self._remove_chapter(digest)
+            self.orphans.clear()
+            if not self.state_file:
+                return
+            tmp_file = self.state_file + '.tmp'
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, ensure_ascii=False)
+            os.replace(tmp_file, self.state_file)
+
+    def key_for(self, url):
+        endpoint, article_id = split_endpoint_url(url)
+        return f"{endpoint}|{article_id}"
+
+    def chapter_path(self, digest):
+        return os.path.join(self.chapter_dir, digest[:2], digest + '.json')
+
+    def _write_chapter(self, digest, payload):
+        if not self.chapter_dir:
+            self.memory_chapters[digest] = payload
+            return
+        path = self.chapter_path(digest)
+        if os.path.exists(path):  # 内容相同的章节只保存一份
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_file = path + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            f.write(payload)
+        os.replace(tmp_file, path)
+
+    def _read_chapter(self, digest):
+        if not self.chapter_dir:
+            return self.memory_chapters.get(digest)
+        try:
+            with open(self.chapter_path(digest), 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _remove_chapter(self, digest):
+        if not self.chapter_dir:
+            self.memory_chapters.pop(digest, None)
+            return
+        try:
+            os.remove(self.chapter_path(digest))
+        except OSError:
+            pass
+
+    def conditional_headers(self, url):
+        """返回该URL的条件请求头，没有保存校验信息时返回空字典"""
+        with self.lock:
+            entry = self.entries.get(self.key_for(url))
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def not_modified_chapter(self, url):
+        """服务器返回304时从章节目录读取保存的章节；没有记录或章节文件已丢失时删除记录并返回None"""
+        key = self.key_for(url)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            payload = self._read_chapter(entry['chapter'])
+            if payload is None:
+                del self.entries[key]
+                return None
+            entry['last_used'] = time.time()
+            self.not_modified += 1
+            self.bytes_saved += entry['size']
+        return json.loads(payload)
+
+    def store(self, url, response, article_data):
+        """保存响应的校验信息和解析好的章节；响应没有ETag和Last-Modified时删除旧记录"""
+        key = self.key_for(url)
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified:
+            payload = json.dumps(article_data, ensure_ascii=False)
+            digest = hashlib.sha256(payload.encode('utf-8')).hexdigest()
+        with self.lock:
+            previous = self.entries.get(key)
+            if not etag and not last_modified:
+                if previous:
+                    self.orphans.add(previous['chapter'])
+                    del self.entries[key]
+                return
+            if previous and not getattr(response, 'from_cache', False):
+                self.modified += 1
+            if previous and previous['chapter'] != digest:
+                self.orphans.add(previous['chapter'])
+            self._write_chapter(digest, payload)
+            now = time.time()
+            self.entries[key] = {
+                'etag': etag,
+                'last_modified': last_modified,
+                'size': len(response.content),
+                'chapter': digest,
+                'stored_at': now,
+                'last_used': now,
+            }
+
+    def print_summary(self):
+        """打印条件请求统计"""
+        total = self.not_modified + self.modified
+        if not total:
+            return
+        print(f"\n条件请求: 未修改(304) {self.not_modified} 次，已修改 {self.modified} 次，"
+              f"未修改比例 {self.not_modified / total:.1%}，节省下载约 {self.bytes_saved / 1024:.1f} KB")
+
+
+class ResponseArchive:
+    """
+    原始响应归档：每次网络请求的完整响应字节和响应头追加写入一个压缩文件
+    
+    文件由多个独立的gzip成员拼接而成（可直接用zcat查看），每个成员是一行JSON头，blob成员后面紧跟响应字节；
+    响应按内容的SHA-256去重，相同内容只保存一次，fetch记录通过blob_offset引用它
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = None  # 第一次写入时才创建文件
+        self.blobs = {}  # SHA-256 -> blob成员在文件中的偏移
+        self.index = {}  # (文章ID, 接口) -> fetch记录列表
+        self.fetches = 0
+        self.deduplicated = 0
+        if os.path.exists(path):
+            for header, _ in self.iter_records(path, with_payload=False):
+                self._add_to_index(header)
+    
+    def _add_to_index(self, header):
+        if header['type'] == 'blob':
+            self.blobs[header['sha256']] = header['offset']
+        elif header['type'] == 'fetch':
+            self.index.setdefault((header['article_id'], header['endpoint']), []).append(header)
+    
+    def _write_member(self, header, payload=b''):
+        if self.file is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self.file = open(self.path, 'ab')
+        offset = self.file.tell()
+        data = json.dumps(header, ensure_ascii=False).encode('utf-8') + b'\n' + payload
+        self.file.write(gzip.compress(data))
+        self.file.flush()
+        return offset
+    
+    def record(self, url, response, latency=None):
+        """归档一次请求的响应（内容相同的响应只保存一次）"""
+        content = response.content or b''
+        digest = hashlib.sha256(content).hexdigest()
+        endpoint, article_id = split_endpoint_url(url)
+        try:
+            with self.lock:
+                if digest in self.blobs:
+                    self.deduplicated += 1
+                else:
+                    self.blobs[digest] = self._write_member({'type': 'blob', 'sha256': digest, 'size': len(content)}, content)
+                fetch = {
+                    'type': 'fetch',
+                    'article_id': article_id,
+                    'endpoint': endpoint,
+                    'url': url,
+                    'status_code': response.status_code,
+                    'headers': dict(response.headers),
+                    'encoding': response.encoding,
+                    'sha256': digest,
+                    'blob_offset': self.blobs[digest],
+                    'fetched_at': datetime.now().isoformat(),
+                    'latency': round(latency, 4) if latency is not None else None,
+                }
+                self._write_member(fetch)
+                self._add_to_index(fetch)
+                self.fetches += 1
+        except OSError as e:
+            print(f"写入响应归档失败: {e}")
+    
+    def lookup(self, article_id, endpoint=None):
+        """按文章ID（和接口）查找fetch记录，按请求顺序排列"""
+        records = []
+        for (record_id, record_endpoint), fetches in self.index.items():
+            if record_id == str(article_id) and (endpoint is None or record_endpoint == endpoint):
+                records.extend(fetches)
+        return sorted(records, key=lambda fetch: fetch['fetched_at'])
+    
+    def load_response(self, fetch):
+        """读取fetch记录对应的完整响应"""
+        if self.file:
+            with self.lock:
+                self.file.flush()
+        return self.read_response(self.path, fetch)
+    
+    @classmethod
+    def read_response(cls, path, fetch):
+        """从归档文件读取fetch记录对应的完整响应（只解压其blob成员）"""
+        with open(path, 'rb') as f:
+            f.seek(fetch['blob_offset'])
+            data = cls._read_member(f)
+        if data is None:
+            raise ValueError(f"归档记录已损坏: {fetch['url']}")
+        _, _, content = data.partition(b'\n')
+        return CachedResponse(fetch['url'], fetch['status_code'], fetch['headers'], content, fetch['encoding'])
+    
+    @staticmethod
+    def _read_member(f):
+        """从文件当前位置解压一个gzip成员，把文件位置留在该成员末尾；不完整或损坏时返回None"""
+        start = f.tell()
+        decompressor = zlib.decompressobj(wbits=31)
+        chunks = []
+        try:
+            while not decompressor.eof:
+                chunk = f.read(65536)
+                if not chunk:
+                    return None
+                chunks.append(decompressor.decompress(chunk))
+        except zlib.error:
+            return None
+        f.seek(f.tell() - len(decompressor.unused_data))
+        return b''.join(chunks) if f.tell() > start else None
+    
+    @classmethod
+    def iter_records(cls, path, with_payload=True):
+        """顺序读取归档中的（头, 响应字节），blob的头中附带其偏移offset；文件末尾不完整的记录会被忽略"""
+        with open(path, 'rb') as f:
+            while True:
+                offset = f.tell()
+                data = cls._read_member(f)
+                if data is None:
+                    return
+                line, _, payload = data.partition(b'\n')
+                try:
+                    header = json.loads(line)
+                except ValueError:
+                    return
+                if header.get('type') == 'blob':
+                    header['offset'] = offset
+                yield header, (payload if with_payload else None)
+    
+    def close(self):
+        with self.lock:
+            if self.file:
+                self.file.close()
+                self.file = None
+    
+    def print_summary(self):
+        """打印归档统计"""
+        if self.fetches:
+            print(f"响应归档: {self.path}（本次归档 {self.fetches} 次请求，其中 {self.deduplicated} 次内容重复未另存）")
+
+
+class ChapterJournal:
+    """追加写入的章节日志：每完成一章写入一行JSON，中断后可从最后一章的下一章链接继续"""
+    
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+    
+    def reset(self):
+        """开始新的爬取，清空旧日志"""
+        with self.lock:
+            open(self.path, 'w', encoding='utf-8').close()
+    
+    def append(self, chapter):
+        """写入一章并立即落盘"""
+        line = json.dumps(chapter, ensure_ascii=False)
+        with self.lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+    
+    def load(self):
+        """读取已完成的章节，返回（章节列表, 下一章链接）"""
+        chapters = {}
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        chapter = json.loads(line)
+                    except ValueError:
+                        # 中断时可能留下不完整的最后一行
+                        continue
+                    chapters[chapter['chapter_number']] = chapter
+        ordered = [chapters[number] for number in sorted(chapters)]
+        next_url = ordered[-1].get('next_chapter_url') if ordered else None
+        return ordered, next_url
+
+
+class ChapterStreamWriter:
+    """流式输出：每爬取一章立即写入JSONL和Markdown文件，结束时写入汇总JSON，内存占用与章节数无关"""
+    
+    def __init__(self, output_name, render_markdown):
+        self.output_name = output_name
+        self.render_markdown = render_markdown
+        self.chapters_file = f"{output_name}.jsonl"
+        self.md_file = f"{output_name}.md"
+        self.summary_file = f"{output_name}.json"
+        self.count = 0
+        self.first_chapter = None  # 第一章用于查找作者的其他文章
+        # 写入第一章时才创建文件，一章都没有获取到时不留下空文件
+        self.jsonl_out = None
+        self.md_out = None
+    
+    def write_chapter(self, chapter):
+        """写入一章（JSONL一行 + 该章的Markdown）"""
+        if self.jsonl_out is None:
+            self.jsonl_out = open(self.chapters_file, 'w', encoding='utf-8')
+            self.md_out = open(self.md_file, 'w', encoding='utf-8')
+        self.jsonl_out.write(json.dumps(chapter, ensure_ascii=False) + '\n')
+        self.jsonl_out.flush()
+        self.md_out.write(self.render_markdown([chapter]))
+        self.md_out.flush()
+        if self.first_chapter is None:
+            self.first_chapter = {key: value for key, value in chapter.items() if key != 'raw_html'}
+        self.count += 1
+    
+    def finalize(self, other_articles=[]):
+        """写入作者其他文章和汇总信息"""
+        if other_articles:
+            self.md_out.write(self.render_markdown([], other_articles))
+        self.close()
+        summary = {
+            'chapters_file': os.path.basename(self.chapters_file),
+            'other_articles': other_articles,
+            'crawl_time': datetime.now().isoformat(),
+            'total_chapters': self.count,
+            'total_other_articles': len(other_articles)
+        }
+        with open(self.summary_file, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        print(f"章节已流式保存到: {self.chapters_file}")
+        print(f"Markdown格式结果已保存到: {self.md_file}")
+        print(f"汇总信息已保存到: {self.summary_file}")
+        return self.summary_file, self.md_file
+    
+    def close(self):
+        if self.jsonl_out and not self.jsonl_out.closed:
+            self.jsonl_out.close()
+        if self.md_out and not self.md_out.closed:
+            self.md_out.close()
+
+
+class ChapterPrefetcher:
+    """章节预取器：下一章链接一旦已知就提前获取其内容，预取深度有上限"""
+    
+    def __init__(self, crawler, depth, limit, workers=None):
+        self.crawler = crawler
+        self.depth = depth  # 同时在途（已预取但未被取走）的最大章节数
+        self.limit = limit  # 本次爬取最多预取的章节数
+        self.scheduled = 0
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=max(1, workers or depth))
+    
+    def schedule(self, url):
+        """安排预取下一章（重复或超出深度的请求会被忽略）"""
+        article_id = self.crawler.extract_article_id_from_url(url)
+        if not article_id:
+            return
+        with self.lock:
+            if article_id in self.pending or len(self.pending) >= self.depth or self.scheduled >= self.limit:
+                return
+            self.scheduled += 1
+            self.pending[article_id] = self.executor.submit(self._fetch, article_id)
+        print(f"已开始预取下一章: {article_id}")
+    
+    def schedule_all(self, article_ids):
+        """按专栏目录一次安排多章（不受预取深度限制，并发数为线程数），返回实际安排的章节数"""
+        count = 0
+        with self.lock:
+            for article_id in article_ids:
+                if self.scheduled >= self.limit:
+                    break
+                if article_id in self.pending:
+                    continue
+                self.scheduled += 1
+                self.pending[article_id] = self.executor.submit(self._fetch, article_id)
+                count += 1
+        print(f"已按目录开始并行获取 {count} 章")
+        return count
+    
+    def _fetch(self, article_id):
+        with self.crawler.trace('prefetch', article_id=article_id):
+            return self.crawler.get_article_content(article_id)
+    
+    def take(self, article_id):
+        """取走已预取的章节，未预取时返回None"""
+        with self.lock:
+            return self.pending.pop(article_id, None)
+    
+    def close(self):
+        """取消尚未开始的预取任务"""
+        with self.lock:
+            for future in self.pending.values():
+                future.cancel()
+            self.pending.clear()
+        self.executor.shutdown(wait=False)
+
 
 class WeiboTTArticleCrawler:
-    def __init__(self, cookies_file=None, cookies_dict=None):
+    def __init__(self, cookies_file=None, cookies_dict=None, rate_limiter=None, response_cache=None, scoreboard=None,
+                 convert_cache=None, archive=None, metrics=None, tracer=None, transport=None, validators=None):
         self.debug_mode = False  # 调试模式开关
+        self.async_fetch = False  # 并发请求所有详情API
+        self.fanout = 6  # 并发请求的最大API数
+        self._fanout_futures = set()  # 并发模式下尚未结束的请求（包括已落选但已发出的）
+        self._fanout_lock = threading.Lock()
+        self.prefetch_depth = 0  # 流水线预取深度，0表示关闭
+        self._prefetcher = None
+        self.use_journal = True  # 每完成一章写入章节日志
+        self.resume = False  # 从章节日志的最后位置继续爬取
+        self.stream_output = False  # 每爬取一章立即写入输出文件
+        self.full_catalog = False  # 翻页获取作者的完整文章目录
+        self.catalog_max_pages = 50  # 每个作者目录接口最多翻的页数
+        self.catalog_workers = 4  # 作者目录翻页和正文获取的并发数
+        self.catalog_content = False  # 获取作者目录中每篇头条文章的完整正文
+        self.discover_toc = False  # 先发现专栏目录再并行获取章节，下一章链接只用于确认顺序
+        self.toc_workers = 4  # 按目录并行获取章节的并发数
+        # 按主机限速，批量模式下多个实例共享同一个限速器
+        self.rate_limiter = rate_limiter or HostRateLimiter()
+        # 磁盘响应缓存（None表示不使用缓存），离线模式下只从缓存读取
+        self.cache = response_cache
+        self.offline = False
+        self.refresh_cache = False  # 忽略缓存中的响应（仍会写入新响应）
+        # 详情接口健康记分板（None表示按固定顺序尝试）
+        self.scoreboard = scoreboard
+        # 繁简转换缓存（None表示不缓存）和并行转换的进程数（None表示CPU核数）
+        self.convert_cache = convert_cache
+        self.convert_workers = None
+        # 原始响应归档（None表示不归档）
+        self.archive = archive
+        # 运行指标（None表示不统计）
+        self.metrics = metrics
+        # 章节追踪（None表示不追踪）
+        self.tracer = tracer
+        # 条件请求校验信息（None表示不发送条件请求）
+        self.validators = validators
+        # 把请求转发到其他服务器（如本地模拟服务器），None表示直接请求微博
+        self.base_url = None
         self.session = requests.Session()
+        # 连接池和重试，批量模式下多个实例共享同一组连接池
+        self.transport = transport or HttpTransport()
+        self.transport.mount(self.session)
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
@@ -153,297 +1713,527 @@ class WeiboTTArticleCrawler:
             print(f"提取文章ID失败: {e}")
             return None
     
-    def get_article_content(self, article_id):
-        """获取文章内容"""
+    def request(self, url, headers=None, timeout=15, cancelled=None, use_cache=True):
+        """
+        发送GET请求：优先读取磁盘缓存，请求前按主机令牌桶限速，请求后把结果反馈给限速器；
+        cancelled（threading.Event）在等待限速前或发出请求前被设置时抛出FetchCancelled；
+        use_cache为False时不读缓存（离线模式除外），响应仍会写入缓存
+        """
+        if self.cache and (use_cache or self.offline) and not self.refresh_cache:
+            cached = self.cache.get(url, allow_expired=self.offline)
+            if cached:
+                if self.metrics:
+                    self.metrics.record_cache_hit(url)
+                return cached
+        if self.offline:
+            raise OfflineCacheMiss(f"离线模式下缓存未命中: {url}")
+        
+        if cancelled is not None and cancelled.is_set():
+            raise FetchCancelled(f"请求已取消: {url}")
+        with self.span('rate_limit_wait', host=urlparse(url).netloc):
+            waited = self.rate_limiter.acquire(url)
+        if self.metrics:
+            self.metrics.record_sleep(url, waited)
+        if cancelled is not None and cancelled.is_set():
+            raise FetchCancelled(f"请求已取消: {url}")
+        started = time.monotonic()
         try:
-            print(f"正在获取文章内容: {article_id}")
+            with self.span('http_get', url=url) as span:
+                response = self.session.get(self.resolve_url(url), headers=headers, timeout=timeout)
+                span.set(status=response.status_code, bytes=len(response.content))
+        except requests.RequestException:
+            self.rate_limiter.observe(url, None, time.monotonic() - started)
+            if self.metrics:
+                self.metrics.record_request(url, None, time.monotonic() - started, 0)
+            raise
+        # 未声明编码时只检测一次，之后每次读取response.text都直接解码
+        if response.encoding is None:
+            response.encoding = response.apparent_encoding
+        latency = time.monotonic() - started
+        text = response.text
+        throttled = ((response.status_code == 200 and '微博不存在或暂无查看权限' in text)
+                     or 'Retry-After' in response.headers)
+        self.rate_limiter.observe(url, response.status_code, latency, throttled)
+        if self.metrics:
+            self.metrics.record_request(url, response.status_code, latency, len(response.content))
+        if self.archive:
+            self.archive.record(url, response, latency)
+        if self.cache and response.status_code == 200 and not self.is_access_denied(text):
+            self.cache.put(url, response)
+        return response
+    
+    def trace(self, name, force=False, **args):
+        """章节等根span，未开启追踪时为空操作"""
+        return self.tracer.trace(name, force, **args) if self.tracer else NULL_SPAN
+    
+    def span(self, name, **args):
+        """子span，未开启追踪或当前章节未被采样时为空操作"""
+        return self.tracer.span(name, **args) if self.tracer else NULL_SPAN
+    
+    def resolve_url(self, url):
+        """设置了base_url时把 https://主机/路径?查询 改写为 {base_url}/主机/路径?查询；缓存、限速和归档仍使用原URL"""
+        if not self.base_url:
+            return url
+        parsed = urlparse(url)
+        resolved = f"{self.base_url.rstrip('/')}/{parsed.netloc}{parsed.path}"
+        return f"{resolved}?{parsed.query}" if parsed.query else resolved
+    
+    def is_access_denied(self, text):
+        """判断响应是否为登录页或无权限页面"""
+        return '请登录' in text or 'login' in text.lower() or '微博不存在或暂无查看权限' in text
+    
+    def build_detail_api_urls(self, article_id):
+        """构造获取文章内容的候选API列表（按优先级排列）"""
+        # 尝试多种API接口，优先使用移动端接口
+        return [
+            f"https://weibo.com/ttarticle/x/m/aj/detail?id={article_id}",
+            f"https://m.weibo.cn/statuses/extend?id={article_id}",
+            f"https://weibo.com/ajax/statuses/longtext?id={article_id}",
+            f"https://card.weibo.com/article/m/show/id/{article_id}",
+            f"https://weibo.com/ttarticle/p/show?id={article_id}",
+            f"https://weibo.com/ajax/statuses/show?id={article_id}"
+        ]
+    
+    def ordered_detail_api_urls(self, article_id):
+        """返回（序号, URL）列表，有记分板时按接口健康程度排序并跳过熔断中的接口"""
+        api_urls = list(enumerate(self.build_detail_api_urls(article_id), 1))
+        if self.scoreboard:
+            return self.scoreboard.order(api_urls)
+        return api_urls
+    
+    def build_api_headers(self, api_url, article_id):
+        """为不同的API使用不同的请求头"""
+        # 会话已带有公共请求头，这里只返回各类接口在此基础上覆盖的部分
+        if 'm.weibo.cn' in api_url:
+            return MOBILE_HEADERS
+        elif 'ajax' in api_url or 'aj/detail' in api_url:
+            return {**AJAX_HEADERS, 'Referer': f'https://weibo.com/ttarticle/p/show?id={article_id}'}
+        return None
+    
+    def fetch_article_from_api(self, i, api_url, article_id, cancelled=None):
+        """请求单个API并解析文章内容，失败时返回None；cancelled被设置后尚未发出的请求直接放弃"""
+        started = time.monotonic()
+        with self.span(f"api {i}", url=api_url) as span:
+            article_data = self._fetch_article_from_api(i, api_url, article_id, cancelled)
+            span.set(success=article_data is not None)
+        # 被取消的尝试和离线模式下的缓存未命中都不反映接口本身的健康状况，不计入记录
+        cancelled_attempt = article_data is None and cancelled is not None and cancelled.is_set()
+        if self.scoreboard and not self.offline and not cancelled_attempt:
+            self.scoreboard.record(api_url, article_data is not None, time.monotonic() - started)
+        return article_data
+    
+    def _fetch_article_from_api(self, i, api_url, article_id, cancelled=None):
+        try:
+            print(f"尝试API {i}: {api_url}")
             
-            # 尝试多种API接口，优先使用移动端接口
-            api_urls = [
-                f"https://weibo.com/ttarticle/x/m/aj/detail?id={article_id}",
-                f"https://m.weibo.cn/statuses/extend?id={article_id}",
-                f"https://weibo.com/ajax/statuses/longtext?id={article_id}",
-                f"https://card.weibo.com/article/m/show/id/{article_id}",
-                f"https://weibo.com/ttarticle/p/show?id={article_id}",
-                f"https://weibo.com/ajax/statuses/show?id={article_id}"
-            ]
+            base_headers = self.build_api_headers(api_url, article_id)
+            headers = base_headers
+            conditional = self.validators.conditional_headers(api_url) if self.validators else None
+            if conditional:
+                headers = {**(base_headers or {}), **conditional}
+            # 有校验信息时总是发条件请求，不使用缓存：304的代价很小，而缓存期内章节可能已被修改或有了下一章
+            response = self.request(api_url, headers=headers, timeout=15, cancelled=cancelled,
+                                    use_cache=not conditional)
+            print(f"响应状态码: {response.status_code}")
             
-            for i, api_url in enumerate(api_urls, 1):
-                try:
-                    print(f"尝试API {i}: {api_url}")
-                    
-                    # 为不同的API使用不同的请求头
-                    headers = self.headers.copy()
-                    if 'm.weibo.cn' in api_url:
-                        headers['User-Agent'] = 'Mozilla/5.0 (iPhone; CPU iPhone OS 14_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0 Mobile/15E148 Safari/604.1'
-                        headers['Referer'] = 'https://m.weibo.cn/'
-                    elif 'ajax' in api_url or 'aj/detail' in api_url:
-                        headers['X-Requested-With'] = 'XMLHttpRequest'
-                        headers['Referer'] = f'https://weibo.com/ttarticle/p/show?id={article_id}'
-                        headers['Accept'] = 'application/json, text/plain, */*'
-                    
-                    response = self.session.get(api_url, headers=headers, timeout=15)
-                    print(f"响应状态码: {response.status_code}")
-                    
-                    if response.status_code == 200:
-                        # 检查是否需要登录
-                        if '请登录' in response.text or 'login' in response.text.lower() or '微博不存在或暂无查看权限' in response.text:
-                            print(f"API {i} 需要登录或无权限，跳过")
-                            continue
-                            
-                        # 只在调试模式下保存调试信息
-                        if self.debug_mode:
-                            debug_filename = f"article_debug_{i}_{article_id}.html"
-                            with open(debug_filename, 'w', encoding='utf-8') as f:
-                                f.write(f"<!-- API URL: {api_url} -->\n")
-                                f.write(f"<!-- Status Code: {response.status_code} -->\n")
-                                f.write(f"<!-- Response Headers: {dict(response.headers)} -->\n")
-                                f.write(f"<!-- Response Content Length: {len(response.text)} -->\n")
-                                f.write(f"<!-- Response Content Type: {response.headers.get('Content-Type', 'unknown')} -->\n")
-                                f.write(response.text)
-                            print(f"调试信息已保存到: {debug_filename}")
-                        print(f"响应内容长度: {len(response.text)}")
-                        print(f"响应内容前200字符: {response.text[:200]}")
-                        
-                        # 如果是JSON响应，在调试模式下保存调试文件
-                        if 'application/json' in response.headers.get('Content-Type', '') or response.text.strip().startswith('{'):
-                            try:
-                                import json
-                                json_data = json.loads(response.text)
-                                
-                                if self.debug_mode:
-                                    json_debug_filename = f"article_debug_{i}_{article_id}.json"
-                                    with open(json_debug_filename, 'w', encoding='utf-8') as f:
-                                        json.dump({
-                                            'api_url': api_url,
-                                            'status_code': response.status_code,
-                                            'headers': dict(response.headers),
-                                            'response_data': json_data
-                                        }, f, ensure_ascii=False, indent=2)
-                                    print(f"JSON调试信息已保存到: {json_debug_filename}")
-                                
-                                # 打印JSON结构信息
-                                if isinstance(json_data, dict):
-                                    print(f"JSON根级键: {list(json_data.keys())}")
-                                    if 'data' in json_data:
-                                        data_keys = list(json_data['data'].keys()) if isinstance(json_data['data'], dict) else 'not dict'
-                                        print(f"data字段键: {data_keys}")
-                                        # 查找可能的下一章信息
-                                        if isinstance(json_data['data'], dict):
-                                            next_keys = [k for k in json_data['data'].keys() if 'next' in k.lower() or 'series' in k.lower() or 'chapter' in k.lower()]
-                                            if next_keys:
-                                                print(f"可能包含下一章信息的键: {next_keys}")
-                                                for key in next_keys:
-                                                    print(f"  {key}: {json_data['data'][key]}")
-                            except json.JSONDecodeError:
-                                print("响应不是有效的JSON格式")
-                        
-                        # 解析内容
-                        article_data = self.parse_article_content(response.text, api_url)
-                        if article_data and (article_data.get('content') or article_data.get('title')):
-                            return article_data
-                            
-                except Exception as e:
-                    print(f"API {i} 请求失败: {e}")
-                    # 出错时保存调试信息
-                    if hasattr(self, 'debug_mode') and self.debug_mode:
-                        try:
-                            error_debug_filename = f"article_error_{i}_{article_id}.txt"
-                            with open(error_debug_filename, 'w', encoding='utf-8') as f:
-                                f.write(f"API URL: {api_url}\n")
-                                f.write(f"Error: {str(e)}\n")
-                                f.write(f"Exception Type: {type(e).__name__}\n")
-                            print(f"错误调试信息已保存到: {error_debug_filename}")
-                        except:
-                            pass
-                    continue
-                
-                # 在每次请求之间添加延时
-                time.sleep(1)
+            # 被限流时限速器已经退避，按降低后的速率重试同一接口一次，不直接换到没有下一章链接的接口
+            if response.status_code in THROTTLE_STATUS_CODES:
+                print(f"API {i} 被限流，退避后重试一次")
+                response = self.request(api_url, headers=headers, timeout=15, cancelled=cancelled,
+                                        use_cache=not conditional)
+                print(f"响应状态码: {response.status_code}")
+            
+            # 内容未修改：直接复用上次解析的章节，不再解码和解析
+            if response.status_code == 304 and conditional:
+                article_data = self.validators.not_modified_chapter(api_url)
+                if article_data:
+                    print(f"API {i} 内容未修改，复用上次解析的章节")
+                    if article_data.get('next_chapter_url'):
+                        self._announce_next_chapter(article_data['next_chapter_url'])
+                    return article_data
+                # 保存的章节已丢失：不带条件请求头重新下载
+                response = self.request(api_url, headers=base_headers, timeout=15, cancelled=cancelled)
+                print(f"响应状态码: {response.status_code}")
             
+            # 其他接口已经胜出时不再解析这个注定被丢弃的响应
+            if cancelled is not None and cancelled.is_set():
+                raise FetchCancelled(f"请求已取消: {api_url}")
+            article_data = self.parse_api_response(i, api_url, article_id, response)
+            # 缓存中的专栏详情没有下一章链接时可能是缓存之后才更新的最后一章，绕过缓存重新请求一次
+            # （其他接口的响应本来就没有下一章链接，不在此列）
+            if (article_data and getattr(response, 'from_cache', False) and not self.offline
+                    and not article_data.get('next_chapter_url') and self.is_series_detail_url(api_url)):
+                print(f"API {i} 缓存的章节没有下一章链接，重新请求以检查新章节")
+                fresh = self.request(api_url, headers=base_headers, timeout=15, cancelled=cancelled, use_cache=False)
+                print(f"响应状态码: {fresh.status_code}")
+                fresh_data = self.parse_api_response(i, api_url, article_id, fresh)
+                if fresh_data:
+                    response, article_data = fresh, fresh_data
+            if article_data and self.validators:
+                self.validators.store(api_url, response, article_data)
+            return article_data
+                
+        except FetchCancelled:
+            print(f"API {i} 已取消（其他接口已成功）")
             return None
         except Exception as e:
-            print(f"获取文章内容失败: {e}")
+            print(f"API {i} 请求失败: {e}")
+            # 出错时保存调试信息
+            if hasattr(self, 'debug_mode') and self.debug_mode:
+                try:
+                    error_debug_filename = f"article_error_{i}_{article_id}.txt"
+                    with open(error_debug_filename, 'w', encoding='utf-8') as f:
+                        f.write(f"API URL: {api_url}\n")
+                        f.write(f"Error: {str(e)}\n")
+                        f.write(f"Exception Type: {type(e).__name__}\n")
+                    print(f"错误调试信息已保存到: {error_debug_filename}")
+                except:
+                    pass
             return None
     
-    def add_pangu_spacing(self, text):
-        """添加盘古之白：在中文字符和英文字母/数字之间添加空格"""
-        if not text:
-            return text
+    def is_series_detail_url(self, api_url):
+        """是否为头条文章详情接口（只有它的响应带有专栏的下一章链接）"""
+        return split_endpoint_url(api_url)[0] == 'weibo.com/ttarticle/x/m/aj/detail'
+    
+    def parse_api_response(self, i, api_url, article_id, response):
+        """解码并解析接口响应，没有有效内容时返回None"""
+        if response.status_code != 200:
+            return None
         
-        # 在中文字符和英文字母/数字之间添加空格
-        # 中文字符后跟英文字母/数字
-        text = re.sub(r'([\u4e00-\u9fff])([a-zA-Z0-9])', r'\1 \2', text)
-        # 英文字母/数字后跟中文字符
-        text = re.sub(r'([a-zA-Z0-9])([\u4e00-\u9fff])', r'\1 \2', text)
+        # 响应文本只解码一次
+        with self.span('decode_text'):
+            text = response.text
         
-        # 在中文字符和英文标点之间添加空格（可选）
-        text = re.sub(r'([\u4e00-\u9fff])([!"#$%&\'()*+,\-./:;<=>?@\[\\\]^_`{|}~])', r'\1 \2', text)
-        text = re.sub(r'([!"#$%&\'()*+,\-./:;<=>?@\[\\\]^_`{|}~])([\u4e00-\u9fff])', r'\1 \2', text)
+        # 检查是否需要登录
+        if self.is_access_denied(text):
+            print(f"API {i} 需要登录或无权限，跳过")
+            return None
+            
+        # 只在调试模式下保存调试信息
+        if self.debug_mode:
+            debug_filename = f"article_debug_{i}_{article_id}.html"
+            with open(debug_filename, 'w', encoding='utf-8') as f:
+                f.write(f"<!-- API URL: {api_url} -->\n")
+                f.write(f"<!-- Status Code: {response.status_code} -->\n")
+                f.write(f"<!-- Response Headers: {dict(response.headers)} -->\n")
+                f.write(f"<!-- Response Content Length: {len(text)} -->\n")
+                f.write(f"<!-- Response Content Type: {response.headers.get('Content-Type', 'unknown')} -->\n")
+                f.write(text)
+            print(f"调试信息已保存到: {debug_filename}")
+        print(f"响应内容长度: {len(text)}")
+        print(f"响应内容前200字符: {text[:200]}")
         
-        # 清理多余的空格，但保留换行符
-        text = re.sub(r'[ \t]+', ' ', text)
+        # JSON响应直接从字节解码一次，解析时复用解码结果
+        decode_started = time.monotonic()
+        with self.span('decode_json'):
+            json_data = self.decode_json_response(response, text)
+        decode_seconds = time.monotonic() - decode_started
+        if json_data is not None:
+            if self.debug_mode:
+                json_debug_filename = f"article_debug_{i}_{article_id}.json"
+                with open(json_debug_filename, 'w', encoding='utf-8') as f:
+                    json.dump({
+                        'api_url': api_url,
+                        'status_code': response.status_code,
+                        'headers': dict(response.headers),
+                        'response_data': json_data
+                    }, f, ensure_ascii=False, indent=2)
+                print(f"JSON调试信息已保存到: {json_debug_filename}")
+            
+            # 打印JSON结构信息
+            if isinstance(json_data, dict):
+                print(f"JSON根级键: {list(json_data.keys())}")
+                if 'data' in json_data:
+                    data_keys = list(json_data['data'].keys()) if isinstance(json_data['data'], dict) else 'not dict'
+                    print(f"data字段键: {data_keys}")
+                    # 查找可能的下一章信息
+                    if isinstance(json_data['data'], dict):
+                        next_keys = [k for k in json_data['data'].keys() if 'next' in k.lower() or 'series' in k.lower() or 'chapter' in k.lower()]
+                        if next_keys:
+                            print(f"可能包含下一章信息的键: {next_keys}")
+                            for key in next_keys:
+                                print(f"  {key}: {json_data['data'][key]}")
         
-        return text
+        # 解析内容
+        parse_started = time.monotonic()
+        with self.span('parse', json=json_data is not None):
+            article_data = self.parse_article_content(text, api_url, json_data)
+        if self.metrics:
+            self.metrics.record_parse(api_url, decode_seconds + time.monotonic() - parse_started)
+        if article_data and (article_data.get('content') or article_data.get('title')):
+            return article_data
+        return None
     
-    def clean_invisible_characters(self, text):
-        """清理文本中的不可见字符和特殊空白符"""
-        if not text:
-            return text
-        
-        # 定义需要清理的不可见字符
-        invisible_chars = {
-            '\u00A0': ' ',  # 不间断空格 (Non-breaking Space) -> 普通空格
-            '\u200B': '',   # 零宽空格 (Zero-width space) -> 删除
-            '\u200C': '',   # 零宽非连字符 (Zero-width non-joiner) -> 删除
-            '\u200D': '',   # 零宽连字符 (Zero-width joiner) -> 删除
-            '\u2060': '',   # 词连接符 (Word joiner) -> 删除
-            '\uFEFF': '',   # 零宽非断空格 (Zero-width no-break space) -> 删除
-            '\u180E': '',   # 蒙古文元音分隔符 (Mongolian vowel separator) -> 删除
-            '\u2000': ' ',  # En quad -> 普通空格
-            '\u2001': ' ',  # Em quad -> 普通空格
-            '\u2002': ' ',  # En space -> 普通空格
-            '\u2003': ' ',  # Em space -> 普通空格
-            '\u2004': ' ',  # Three-per-em space -> 普通空格
-            '\u2005': ' ',  # Four-per-em space -> 普通空格
-            '\u2006': ' ',  # Six-per-em space -> 普通空格
-            '\u2007': ' ',  # Figure space -> 普通空格
-            '\u2008': ' ',  # Punctuation space -> 普通空格
-            '\u2009': ' ',  # Thin space -> 普通空格
-            '\u200A': ' ',  # Hair space -> 普通空格
-            '\u202F': ' ',  # Narrow no-break space -> 普通空格
-            '\u205F': ' ',  # Medium mathematical space -> 普通空格
-            '\u3000': ' ',  # 全角空格 -> 普通空格
-        }
-        
-        # 替换不可见字符
-        for invisible_char, replacement in invisible_chars.items():
-            text = text.replace(invisible_char, replacement)
+    def get_article_content(self, article_id):
+        """获取文章内容"""
+        if self.async_fetch:
+            return asyncio.run(self.get_article_content_async(article_id))
         
-        return text
+        try:
+            print(f"正在获取文章内容: {article_id}")
+            
+            for depth, (i, api_url) in enumerate(self.ordered_detail_api_urls(article_id), 1):
+                article_data = self.fetch_article_from_api(i, api_url, article_id)
+                if article_data:
+                    if self.metrics:
+                        self.metrics.record_fallback(depth, i)
+                    return article_data
+            
+            if self.metrics:
+                self.metrics.record_fallback(None, None)
+            return None
+        except Exception as e:
+            print(f"获取文章内容失败: {e}")
+            return None
+    
+    async def get_article_content_async(self, article_id):
+        """
+        并发请求所有API，采用第一个带有下一章链接的结果；没有下一章链接的结果（如微博正文接口）
+        只有在优先级更高的接口全部失败后才采用。选定结果后取消其余尚未发出的请求
+        """
+        try:
+            print(f"正在并发获取文章内容: {article_id} (并发数: {self.fanout})")
+            
+            loop = asyncio.get_running_loop()
+            semaphore = asyncio.Semaphore(max(1, self.fanout))
+            cancelled = threading.Event()
+            api_urls = self.ordered_detail_api_urls(article_id)
+            # 每次并发获取使用独立的线程池：选定结果后仍在进行的落选请求只占用这个线程池，
+            # 不会拖慢预取线程或下一章的并发请求
+            executor = ThreadPoolExecutor(max_workers=max(1, min(self.fanout, len(api_urls))))
+            
+            async def attempt(position, i, api_url):
+                async with semaphore:
+                    fetch = self.tracer.wrap(self.fetch_article_from_api) if self.tracer else self.fetch_article_from_api
+                    future = executor.submit(fetch, i, api_url, article_id, cancelled)
+                    with self._fanout_lock:
+                        self._fanout_futures.add(future)
+                    future.add_done_callback(self._discard_fanout_future)
+                    article_data = await asyncio.wrap_future(future, loop=loop)
+                    return position, i, article_data
+            
+            tasks = [asyncio.ensure_future(attempt(position, i, api_url)) for position, (i, api_url) in enumerate(api_urls)]
+            try:
+                results = {}  # 优先级位置 -> 结果（失败为None）
+                for next_done in asyncio.as_completed(tasks):
+                    position, i, article_data = await next_done
+                    results[position] = article_data
+                    winner = None
+                    if article_data and article_data.get('next_chapter_url'):
+                        winner = (i, article_data)
+                    else:
+                        # 优先级最高的已完成结果，且它之前的接口都已失败
+                        for earlier in range(len(api_urls)):
+                            if earlier not in results:
+                                break
+                            if results[earlier]:
+                                winner = (api_urls[earlier][0], results[earlier])
+                                break
+                    if winner:
+                        # 并发模式下的回退深度为选定结果时已完成的请求数
+                        if self.metrics:
+                            self.metrics.record_fallback(len(results), winner[0])
+                        return winner[1]
+                if self.metrics:
+                    self.metrics.record_fallback(None, None)
+                return None
+            finally:
+                # 通知仍在等待限速或尚未发出的请求放弃；已经发出的请求结果会被丢弃
+                cancelled.set()
+                for task in tasks:
+                    task.cancel()
+                executor.shutdown(wait=False)
+        except Exception as e:
+            print(f"并发获取文章内容失败: {e}")
+            return None
+    
+    def _discard_fanout_future(self, future):
+        with self._fanout_lock:
+            self._fanout_futures.discard(future)
+    
+    def wait_for_fanout(self):
+        """等待并发模式下已发出的请求（包括落选后仍在进行的）全部结束"""
+        with self._fanout_lock:
+            futures = list(self._fanout_futures)
+        wait(futures)
+    
+    def add_pangu_spacing(self, text):
+        """添加盘古之白：在中文字符和英文字母/数字之间添加空格"""
+        return text_normalizer.add_pangu_spacing(text)
+    
+    def clean_invisible_characters(self, text):
+        """清理文本中的不可见字符和特殊空白符"""
+        return text_normalizer.clean_invisible_characters(text)
     
     def convert_to_simplified_fullwidth(self, text):
         """将繁体中文转换为简体中文，并将半角标点转换为全角标点"""
-        if not text:
+        return text_normalizer.normalize_text(text, pangu=False, **MARKDOWN_QUOTES)
+    
+    def decode_json_response(self, response, text):
+        """按Content-Type（或内容开头）判断JSON响应，直接从字节解码一次；不是JSON时返回None"""
+        content_type = response.headers.get('Content-Type', '')
+        if 'json' not in content_type and not text.lstrip().startswith('{'):
+            return None
+        try:
+            return json.loads(response.content)
+        except ValueError:
+            print("响应不是有效的JSON格式")
+            return None
+    
+    def clean_json_html_content(self, content):
+        """把JSON字段中的HTML片段转换为纯文本，保留换行"""
+        content = BR_TAG_PATTERN.sub('\n', content)
+        return HTML_TAG_PATTERN.sub('', content)
+    
+    def decode_escaped_text(self, text, field_name):
+        """部分接口返回的字段经过二次转义，包含字面的\\u序列时再解码一次"""
+        if not text or r'\u' not in text:
             return text
+        try:
+            return text.encode('utf-8').decode('unicode_escape')
+        except Exception as e:
+            print(f"{field_name}解码失败: {e}")
+            return text
+    
+    def parse_json_article(self, json_data, article_data):
+        """按响应结构分派到对应接口的解析器"""
+        print(f"成功解析JSON，数据键: {list(json_data.keys()) if isinstance(json_data, dict) else 'not dict'}")
+        if not isinstance(json_data, dict) or not isinstance(json_data.get('data'), dict):
+            return None
         
-        # 0. 首先清理不可见字符
-        text = self.clean_invisible_characters(text)
-        
-        # 1. 繁体转简体（如果zhconv可用）
-        if convert is not None:
-            try:
-                text = convert(text, 'zh-cn')
-            except Exception as e:
-                print(f"繁体转简体失败: {e}")
-        
-        # 2. 半角到全角标点符号映射（不包括引号）
-        half_to_full_map_base = {
-            '!': '！', '(': '（', ')': '）', ',': '，', ':': '：', ';': '；', '?': '？', '[': '【', ']': '】'
-        }
-        
-        # 3. 智能处理双引号和单引号
-        in_double_quote = False
-        in_single_quote = False
-        processed_content_with_quotes = []
+        if json_data.get('code') == '100000':
+            # 头条文章详情接口
+            return self.parse_ttarticle_json(json_data['data'], article_data)
+        # 微博正文/长文本接口（ok == 1 以及其他带data的结构）
+        self.parse_status_json(json_data['data'], article_data)
         
-        for char in text:
-            if char == '"':
-                if not in_double_quote:
-                    processed_content_with_quotes.append('"')
-                    in_double_quote = True
-                else:
-                    processed_content_with_quotes.append('"')
-                    in_double_quote = False
-            elif char == "'":
-                if not in_single_quote:
-                    processed_content_with_quotes.append(''')
-                    in_single_quote = True
-                else:
-                    processed_content_with_quotes.append(''')
-                    in_single_quote = False
-            else:
-                processed_content_with_quotes.append(char)
+        # 如果找到了内容，返回
+        if article_data.get('content') or article_data.get('title'):
+            return article_data
+        return None
+    
+    def parse_ttarticle_json(self, data, article_data):
+        """解析头条文章详情接口（code == '100000'）"""
+        # 提取标题（需要解码Unicode）
+        article_data['title'] = self.decode_escaped_text(data.get('title', ''), '标题')
         
-        # 转换回字符串
-        content_after_quotes = "".join(processed_content_with_quotes)
+        # 提取作者信息
+        if 'uid' in data:
+            article_data['author_uid'] = str(data['uid'])
         
-        # 4. 转换其他半角符号为全角（不包括已处理的引号）
-        final_fullwidth_content = []
-        for char in content_after_quotes:
-            final_fullwidth_content.append(half_to_full_map_base.get(char, char))
+        # 尝试从多个字段提取作者名称
+        author_name = ''
+        for key in ('author', 'author_name', 'user_name', 'screen_name', 'nickname'):
+            if key in data:
+                author_name = data[key]
+                break
         
-        return "".join(final_fullwidth_content)
-    
-    def extract_formatted_text(self, element):
-        """提取保留换行格式的文本内容"""
-        if not element:
-            return ''
+        if author_name:
+            # 处理Unicode编码的作者名称
+            author_name = self.decode_escaped_text(str(author_name), '作者名称')
+            article_data['author'] = author_name
+            print(f"提取到作者: {author_name}")
+        else:
+            print(f"未找到作者信息，数据键: {list(data.keys())}")
         
-        # 处理段落标签，保留换行
-        for p in element.find_all('p'):
-            p.append('\n\n')
+        # 提取发布时间
+        article_data['publish_time'] = data.get('create_at', data.get('complete_create_at', ''))
         
-        # 处理换行标签
-        for br in element.find_all('br'):
-            br.replace_with('\n')
+        # 尝试获取文章详细内容
+        content = data.get('content')
+        if content:
+            # 处理Unicode编码的内容
+            content = self.decode_escaped_text(content, '内容')
+            article_data['content'] = self.clean_json_html_content(content)
         
-        # 处理div标签，在末尾添加换行
-        for div in element.find_all('div'):
-            div.append('\n')
+        # 查找下一章链接 - 从JSON数据中查找
+        if data.get('sibling') and data['sibling'].get('next'):
+            next_info = data['sibling']['next']
+            # 优先使用url字段，这是正确的页面链接格式
+            if 'url' in next_info:
+                article_data['next_chapter_url'] = next_info['url']
+                print(f"从sibling字段找到下一章链接: {next_info['url']}")
+            # 如果没有url字段，尝试使用id构建链接
+            elif 'id' in next_info:
+                next_id = next_info['id']
+                article_data['next_chapter_url'] = f"https://weibo.com/ttarticle/p/show?id={next_id}"
+                print(f"使用ID构建下一章链接: {article_data['next_chapter_url']}")
+            
+            if 'title' in next_info:
+                print(f"下一章标题: {self.decode_escaped_text(next_info['title'], '下一章标题')}")
+        elif 'next_article_id' in data:
+            next_id = data['next_article_id']
+            article_data['next_chapter_url'] = f"https://weibo.com/ttarticle/p/show?id={next_id}"
+        elif data.get('series_info'):
+            series_info = data['series_info']
+            if 'next_id' in series_info:
+                next_id = series_info['next_id']
+                article_data['next_chapter_url'] = f"https://weibo.com/ttarticle/p/show?id={next_id}"
         
-        # 获取文本并清理多余的空行
-        text = element.get_text()
-        # 将多个连续的换行符替换为最多两个
-        text = re.sub(r'\n{3,}', '\n\n', text)
+        # 详情数据中带有专栏目录时保存下来，供目录发现阶段使用（爬取时不写入输出）
+        if self.discover_toc:
+            series_toc = find_series_toc(data)
+            if series_toc:
+                article_data['series_toc'] = series_toc
         
-        # 应用盘古之白格式化
-        text = self.add_pangu_spacing(text)
+        # 下一章链接已知，通知预取器提前获取下一章
+        if article_data['next_chapter_url']:
+            self._announce_next_chapter(article_data['next_chapter_url'])
         
-        return text.strip()
-    
-    def find_next_chapter_url(self, soup):
-        """查找下一章的URL"""
-        # 查找下一篇文章的链接
-        next_selectors = [
-            'a[href*="ttarticle"][title*="下一篇"]',
-            'a[href*="ttarticle"]:contains("下一篇")',
-            'a[href*="ttarticle"]:contains("下一章")',
-            '.special-button a[href*="ttarticle"]',
-            'a[href*="show?id="]:contains("下")',
-        ]
+        # 如果没有content字段，尝试获取完整内容
+        if not article_data.get('content'):
+            # 尝试从summary获取部分内容
+            summary = data.get('summary', '')
+            if summary:
+                article_data['content'] = summary
+            
+            # 尝试通过文章URL获取完整内容
+            article_url = data.get('url', '')
+            if article_url:
+                print(f"尝试获取完整文章内容: {article_url}")
+                try:
+                    with self.span('refetch_full_content', url=article_url):
+                        full_response = self.request(article_url, timeout=10)
+                        if full_response.status_code == 200:
+                            full_content = self.parse_article_content(full_response.text, article_url)
+                            if full_content and full_content.get('content'):
+                                article_data['content'] = full_content['content']
+                                # 也更新下一章链接（JSON中的sibling信息优先）
+                                if full_content.get('next_chapter_url') and not article_data.get('next_chapter_url'):
+                                    article_data['next_chapter_url'] = full_content['next_chapter_url']
+                except Exception as e:
+                    print(f"获取完整内容失败: {e}")
         
-        for selector in next_selectors:
-            try:
-                next_link = soup.select_one(selector)
-                if next_link and next_link.get('href'):
-                    href = next_link.get('href')
-                    # 确保是完整的URL
-                    if href.startswith('http'):
-                        return href
-                    elif href.startswith('/'):
-                        return f"https://weibo.com{href}"
-                    else:
-                        return f"https://weibo.com/ttarticle/p/{href}"
-            except:
-                continue
+        return article_data
+    
+    def parse_status_json(self, data, article_data):
+        """解析微博正文和长文本接口（statuses/extend、statuses/longtext 等，ok == 1）"""
+        article_data['title'] = data.get('title', '')
+        # 保留换行格式
+        content = data.get('longTextContent', data.get('text', ''))
+        if content:
+            article_data['content'] = self.clean_json_html_content(content)
         
-        # 如果没有找到，尝试通过文本查找
-        links = soup.find_all('a', href=True)
-        for link in links:
-            link_text = link.get_text(strip=True)
-            if any(keyword in link_text for keyword in ['下一篇', '下一章', '下一页']):
-                href = link.get('href')
-                if 'ttarticle' in href or 'show?id=' in href:
-                    if href.startswith('http'):
-                        return href
-                    elif href.startswith('/'):
-                        return f"https://weibo.com{href}"
+        # 提取作者信息
+        user_info = data.get('user')
+        if isinstance(user_info, dict):
+            author_name = user_info.get('screen_name', user_info.get('name', ''))
+            if author_name:
+                article_data['author'] = author_name
+                print(f"从user字段提取到作者: {author_name}")
+            if 'id' in user_info:
+                article_data['author_uid'] = str(user_info['id'])
+        elif 'author' in data:
+            article_data['author'] = data['author']
+        elif 'screen_name' in data:
+            article_data['author'] = data['screen_name']
         
-        return None
+        # 提取发布时间
+        article_data['publish_time'] = data.get('created_at', '')
+        return article_data
     
-    def parse_article_content(self, html_content, source_url):
-        """解析文章内容"""
+    def parse_article_content(self, html_content, source_url, json_data=None):
+        """解析文章内容（json_data为已解码的JSON响应，提供时不再重复解码）"""
         try:
             article_data = {
                 'source_url': source_url,
@@ -455,179 +2245,14 @@ class WeiboTTArticleCrawler:
                 'raw_html': html_content[:1000] + '...' if len(html_content) > 1000 else html_content
             }
             
-            # 尝试解析JSON响应
-            try:
-                json_data = json.loads(html_content)
-                print(f"成功解析JSON，数据键: {list(json_data.keys()) if isinstance(json_data, dict) else 'not dict'}")
-                
-                if isinstance(json_data, dict):
-                    # 处理微博头条文章API响应
-                    if json_data.get('code') == '100000' and 'data' in json_data:
-                        data = json_data['data']
-                        
-                        # 提取标题（需要解码Unicode）
-                        title = data.get('title', '')
-                        if title:
-                            try:
-                                # 解码Unicode编码的标题
-                                if r'\u' in title:
-                                    title = title.encode('utf-8').decode('unicode_escape')
-                            except Exception as e:
-                                print(f"标题解码失败: {e}")
-                        article_data['title'] = title
-                        
-                        # 提取作者信息
-                        if 'uid' in data:
-                            article_data['author_uid'] = str(data['uid'])
-                        
-                        # 尝试从多个字段提取作者名称
-                        author_name = ''
-                        if 'author' in data:
-                            author_name = data['author']
-                        elif 'author_name' in data:
-                            author_name = data['author_name']
-                        elif 'user_name' in data:
-                            author_name = data['user_name']
-                        elif 'screen_name' in data:
-                            author_name = data['screen_name']
-                        elif 'nickname' in data:
-                            author_name = data['nickname']
-                        
-                        if author_name:
-                            # 处理Unicode编码的作者名称
-                            try:
-                                if r'\u' in str(author_name):
-                                    author_name = str(author_name).encode('utf-8').decode('unicode_escape')
-                            except Exception as e:
-                                print(f"作者名称解码失败: {e}")
-                            article_data['author'] = str(author_name)
-                            print(f"提取到作者: {author_name}")
-                        else:
-                            print(f"未找到作者信息，数据键: {list(data.keys())}")
-                        
-                        # 提取发布时间
-                        article_data['publish_time'] = data.get('create_at', data.get('complete_create_at', ''))
-                        
-                        # 尝试获取文章详细内容
-                        if 'content' in data:
-                            content = data['content']
-                            if content:
-                                # 处理Unicode编码的内容
-                                try:
-                                    if r'\u' in content:
-                                        content = content.encode('utf-8').decode('unicode_escape')
-                                except Exception as e:
-                                    print(f"内容解码失败: {e}")
-                                content = content.replace('<br>', '\n').replace('<br/>', '\n').replace('<br />', '\n')
-                                content = re.sub(r'<[^>]+>', '', content)
-                                article_data['content'] = content
-                        
-                        # 如果没有content字段，尝试获取完整内容
-                        if not article_data.get('content'):
-                            # 尝试从summary获取部分内容
-                            summary = data.get('summary', '')
-                            if summary:
-                                article_data['content'] = summary
-                            
-                            # 尝试通过文章URL获取完整内容
-                            article_url = data.get('url', '')
-                            if article_url:
-                                print(f"尝试获取完整文章内容: {article_url}")
-                                try:
-                                    full_response = self.session.get(article_url, headers=self.headers, timeout=10)
-                                    if full_response.status_code == 200:
-                                        full_content = self.parse_article_content(full_response.text, article_url)
-                                        if full_content and full_content.get('content'):
-                                            article_data['content'] = full_content['content']
-                                            # 也更新下一章链接
-                                            if full_content.get('next_chapter_url'):
-                                                article_data['next_chapter_url'] = full_content['next_chapter_url']
-                                except Exception as e:
-                                    print(f"获取完整内容失败: {e}")
-                        
-                        # 查找下一章链接 - 从JSON数据中查找
-                        if 'sibling' in data and data['sibling'] and 'next' in data['sibling'] and data['sibling']['next']:
-                            next_info = data['sibling']['next']
-                            # 优先使用url字段，这是正确的页面链接格式
-                            if 'url' in next_info:
-                                article_data['next_chapter_url'] = next_info['url']
-                                print(f"从sibling字段找到下一章链接: {next_info['url']}")
-                            # 如果没有url字段，尝试使用id构建链接
-                            elif 'id' in next_info:
-                                next_id = next_info['id']
-                                article_data['next_chapter_url'] = f"https://weibo.com/ttarticle/p/show?id={next_id}"
-                                print(f"使用ID构建下一章链接: {article_data['next_chapter_url']}")
-                            
-                            if 'title' in next_info:
-                                next_title = next_info['title']
-                                # 处理Unicode编码的标题
-                                if r'\u' in next_title:
-                                    try:
-                                        next_title = next_title.encode().decode('unicode_escape')
-                                    except Exception as e:
-                                        print(f"下一章标题解码失败: {e}")
-                                print(f"下一章标题: {next_title}")
-                        elif 'next_article_id' in data:
-                            next_id = data['next_article_id']
-                            article_data['next_chapter_url'] = f"https://weibo.com/ttarticle/p/show?id={next_id}"
-                        elif 'series_info' in data and data['series_info']:
-                            series_info = data['series_info']
-                            if 'next_id' in series_info:
-                                next_id = series_info['next_id']
-                                article_data['next_chapter_url'] = f"https://weibo.com/ttarticle/p/show?id={next_id}"
-                        
-                        return article_data
-                    
-                    # 处理其他JSON结构
-                    elif 'data' in json_data:
-                        data = json_data['data']
-                        article_data['title'] = data.get('title', '')
-                        # 保留换行格式
-                        content = data.get('longTextContent', data.get('text', ''))
-                        if content:
-                            content = content.replace('<br>', '\n').replace('<br/>', '\n').replace('<br />', '\n')
-                            content = re.sub(r'<[^>]+>', '', content)  # 清理其他HTML标签
-                            article_data['content'] = content
-                        if 'user' in data:
-                            article_data['author'] = data['user'].get('screen_name', '')
-                        article_data['publish_time'] = data.get('created_at', '')
-                    
-                    elif 'ok' in json_data and json_data['ok'] == 1:
-                        # 微博API成功响应
-                        if 'data' in json_data:
-                            data = json_data['data']
-                            content = data.get('longTextContent', data.get('text', ''))
-                            if content:
-                                content = content.replace('<br>', '\n').replace('<br/>', '\n').replace('<br />', '\n')
-                                content = re.sub(r'<[^>]+>', '', content)
-                                article_data['content'] = content
-                            
-                            # 提取作者信息
-                            if 'user' in data:
-                                user_info = data['user']
-                                if isinstance(user_info, dict):
-                                    author_name = user_info.get('screen_name', user_info.get('name', ''))
-                                    if author_name:
-                                        article_data['author'] = author_name
-                                        print(f"从user字段提取到作者: {author_name}")
-                                    if 'id' in user_info:
-                                        article_data['author_uid'] = str(user_info['id'])
-                            elif 'author' in data:
-                                article_data['author'] = data['author']
-                            elif 'screen_name' in data:
-                                article_data['author'] = data['screen_name']
-                            
-                            # 提取发布时间
-                            if 'created_at' in data:
-                                article_data['publish_time'] = data['created_at']
-                    
-                    # 如果找到了内容，返回
-                    if article_data.get('content') or article_data.get('title'):
-                        return article_data
-            
-            except json.JSONDecodeError:
-                # 不是JSON，尝试解析HTML
-                pass
+            # JSON响应交给对应接口的解析器，不再进入HTML解析
+            if json_data is None and html_content.lstrip().startswith('{'):
+                try:
+                    json_data = json.loads(html_content)
+                except json.JSONDecodeError:
+                    json_data = None
+            if json_data is not None:
+                return self.parse_json_article(json_data, article_data)
             
             # 解析HTML内容
             # 检查HTML是否指定了编码
@@ -648,114 +2273,35 @@ class WeiboTTArticleCrawler:
                         except Exception as e:
                             print(f"重新解码失败: {e}，使用原始内容")
             
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # 查找标题
-            title_selectors = [
-                'title',
-                'h1.title',
-                '.WB_detail .title',
-                '.article-title',
-                '[class*="title"]'
-            ]
-            
-            for selector in title_selectors:
-                title_elem = soup.select_one(selector)
-                if title_elem and title_elem.get_text(strip=True):
-                    title_text = title_elem.get_text(strip=True)
-                    # 清理标题中的网站名称
-                    if '微博' in title_text:
-                        title_text = title_text.split('微博')[0].strip()
-                    article_data['title'] = title_text
-                    print(f"从HTML提取标题: {title_text}")
-                    break
-            
-            # 查找作者信息
-            author_selectors = [
-                '.WB_detail .author',
-                '.author-name',
-                '.username',
-                '.user-name',
-                '.screen-name',
-                '.nickname',
-                '.WB_detail .WB_cardwrap .WB_info .W_f14',
-                '.WB_info .W_f14',
-                '.author',
-                '.user',
-                '[class*="author"]',
-                '[class*="user"]',
-                '[data-author]',
-                'a[href*="/u/"]',
-                'a[href*="weibo.com/"]'
-            ]
-            
-            for selector in author_selectors:
-                author_elem = soup.select_one(selector)
-                if author_elem and author_elem.get_text(strip=True):
-                    author_text = author_elem.get_text(strip=True)
-                    # 清理作者名称中的多余信息
-                    author_text = author_text.split('\n')[0].strip()  # 取第一行
-                    author_text = re.sub(r'\s+', ' ', author_text)  # 合并多个空格
-                    if len(author_text) > 0 and len(author_text) < 50:  # 合理的作者名称长度
-                        article_data['author'] = author_text
-                        print(f"通过选择器 {selector} 找到作者: {author_text}")
-                        
-                        # 尝试从链接中提取UID
-                        author_link = author_elem.find('a') if author_elem.name != 'a' else author_elem
-                        if author_link and author_link.get('href'):
-                            href = author_link.get('href')
-                            uid_match = re.search(r'/(?:u/)?([0-9]+)', href)
-                            if uid_match:
-                                article_data['author_uid'] = uid_match.group(1)
-                                print(f"提取到作者UID: {uid_match.group(1)}")
-                        break
-            
-            # 如果还没找到作者，尝试从data属性中提取
-            if not article_data.get('author'):
-                author_data_elem = soup.find(attrs={'data-author': True})
-                if author_data_elem:
-                    author_name = author_data_elem.get('data-author')
-                    if author_name:
-                        article_data['author'] = author_name
-                        print(f"从data-author属性找到作者: {author_name}")
+            # 一次遍历提取标题、作者、UID、发布时间、正文和下一章链接
+            with self.span('extract_html', bytes=len(html_content)):
+                fields = html_extractor.extract_article_fields(html_content)
             
-            # 查找发布时间
-            time_selectors = [
-                '.WB_detail .time',
-                '.publish-time',
-                '.created-time',
-                '[class*="time"]'
-            ]
+            if fields['title']:
+                article_data['title'] = fields['title']
+                print(f"从HTML提取标题: {fields['title']}")
             
-            for selector in time_selectors:
-                time_elem = soup.select_one(selector)
-                if time_elem and time_elem.get_text(strip=True):
-                    article_data['publish_time'] = time_elem.get_text(strip=True)
-                    break
+            if fields['author']:
+                article_data['author'] = fields['author']
+                print(f"通过选择器 {fields['author_selector']} 找到作者: {fields['author']}")
+                if fields['author_uid']:
+                    article_data['author_uid'] = fields['author_uid']
+                    print(f"提取到作者UID: {fields['author_uid']}")
+            elif fields['data_author']:
+                # 如果还没找到作者，尝试从data属性中提取
+                article_data['author'] = fields['data_author']
+                print(f"从data-author属性找到作者: {fields['data_author']}")
             
-            # 查找文章内容 - 使用更精确的选择器
-            content_selectors = [
-                '.WB_editor_iframe_new[node-type="contentBody"]',
-                '.WB_detail .WB_text',
-                '.article-content',
-                '.content-body',
-                '[class*="content"][class*="body"]'
-            ]
+            if fields['publish_time']:
+                article_data['publish_time'] = fields['publish_time']
             
-            for selector in content_selectors:
-                content_elem = soup.select_one(selector)
-                if content_elem:
-                    content_text = self.extract_formatted_text(content_elem)
-                    if len(content_text) > 50:
-                        article_data['content'] = content_text
-                        print(f"通过选择器 {selector} 找到内容，长度: {len(content_text)}")
-                        break
+            if fields['content']:
+                article_data['content'] = fields['content']
+                print(f"通过选择器 {fields['content_selector']} 找到内容，长度: {len(fields['content'])}")
             
-            # 查找下一章链接
-            next_url = self.find_next_chapter_url(soup)
-            if next_url:
-                article_data['next_chapter_url'] = next_url
-                print(f"找到下一章链接: {next_url}")
+            if fields['next_chapter_url']:
+                article_data['next_chapter_url'] = fields['next_chapter_url']
+                print(f"找到下一章链接: {fields['next_chapter_url']}")
             
             # 如果没有从作者链接找到UID，尝试从页面其他地方提取
             if 'author_uid' not in article_data:
@@ -797,23 +2343,17 @@ class WeiboTTArticleCrawler:
                         break
             
             # 从script标签中查找JSON数据
-            scripts = soup.find_all('script')
-            for script in scripts:
-                script_content = script.get_text()
-                if 'longTextContent' in script_content:
-                    json_matches = re.findall(r'\{[^{}]*"longTextContent"[^{}]*\}', script_content)
-                    for match in json_matches:
-                        try:
-                            data = json.loads(match)
-                            if 'longTextContent' in data:
-                                # 保留换行格式
-                                content = data['longTextContent'].replace('<br>', '\n').replace('<br/>', '\n').replace('<br />', '\n')
-                                # 清理HTML标签但保留换行
-                                content = re.sub(r'<[^>]+>', '', content)
-                                article_data['content'] = content
-                                break
-                        except:
-                            continue
+            for script_content in fields['scripts']:
+                json_matches = re.findall(r'\{[^{}]*"longTextContent"[^{}]*\}', script_content)
+                for match in json_matches:
+                    try:
+                        data = json.loads(match)
+                        if 'longTextContent' in data:
+                            # 清理HTML标签但保留换行
+                            article_data['content'] = self.clean_json_html_content(data['longTextContent'])
+                            break
+                    except:
+                        continue
             
             # 如果找到了有效内容，返回
             if article_data['content'] or article_data['title']:
@@ -843,8 +2383,12 @@ class WeiboTTArticleCrawler:
             
             articles = []
             
+            # 完整目录模式：翻页获取作者的全部文章
+            if author_uid and self.full_catalog:
+                articles = self.get_author_catalog(author_uid)
+            
             # 如果有作者UID，尝试直接获取用户的文章
-            if author_uid:
+            elif author_uid:
                 uid_urls = [
                     f"https://weibo.com/ajax/statuses/mymblog?uid={author_uid}&page=1&feature=0",
                     f"https://m.weibo.cn/api/container/getIndex?containerid=107603{author_uid}",
@@ -854,7 +2398,7 @@ class WeiboTTArticleCrawler:
                 for i, url in enumerate(uid_urls, 1):
                     try:
                         print(f"尝试UID API {i}: {url}")
-                        response = self.session.get(url, headers=self.headers, timeout=10)
+                        response = self.request(url, timeout=10)
                         
                         if response.status_code == 200:
                             # 只在调试模式下保存调试文件
@@ -896,7 +2440,7 @@ class WeiboTTArticleCrawler:
                 for i, url in enumerate(search_urls, 1):
                     try:
                         print(f"尝试搜索API {i}: {url}")
-                        response = self.session.get(url, headers=self.headers, timeout=10)
+                        response = self.request(url, timeout=10)
                         
                         if response.status_code == 200:
                             # 只在调试模式下保存调试文件
@@ -1012,13 +2556,178 @@ class WeiboTTArticleCrawler:
         
         return articles
     
-    def save_results_with_chapters(self, all_chapters, other_articles=[]):
+    def author_catalog_url(self, index, author_uid, page, since_id=None):
+        """作者文章列表接口第page页（或since_id游标之后一页）的URL，第一页与单页模式的URL相同"""
+        if index == 1:
+            url = f"https://weibo.com/ajax/statuses/mymblog?uid={author_uid}&page={page}&feature=0"
+            return f"{url}&since_id={since_id}" if since_id else url
+        if index == 2:
+            url = f"https://m.weibo.cn/api/container/getIndex?containerid=107603{author_uid}"
+            if since_id:
+                return f"{url}&since_id={since_id}"
+            return f"{url}&page={page}" if page > 1 else url
+        return f"https://weibo.com/ttarticle/api/profile/articles?uid={author_uid}&page_size={CATALOG_PAGE_SIZE}&page={page}"
+    
+    def fetch_catalog_page(self, index, url):
+        """
+        请求作者文章列表的一页，返回（文章列表, 下一页的since_id），失败时返回None；
+        响应中没有since_id字段时游标为None（按页码翻页），字段为空表示已到最后一页
+        """
+        try:
+            print(f"获取作者目录 {index}: {url}")
+            response = self.request(url, timeout=10)
+            if response.status_code != 200:
+                print(f"作者目录 {index} 请求失败，状态码: {response.status_code}")
+                return None
+            data = response.json()
+        except (requests.RequestException, ValueError) as e:
+            print(f"作者目录 {index} 请求出错: {e}")
+            return None
+        if not isinstance(data, dict):
+            return None
+        page_data = data.get('data') if isinstance(data.get('data'), dict) else {}
+        cursor_holder = page_data if 'since_id' in page_data else page_data.get('cardlistInfo') or {}
+        since_id = str(cursor_holder['since_id'] or '') if 'since_id' in cursor_holder else None
+        return self.parse_articles_from_response(data, f"Catalog-{index}"), since_id
+    
+    def crawl_catalog_endpoint(self, index, author_uid, executor):
+        """
+        翻页获取一个作者文章列表接口的全部文章（按页顺序）
+        返回since_id的接口只能逐页跟随游标，游标为空时结束；按页码翻页的接口每次并发请求 catalog_workers 页，
+        遇到空页、不满一页（指定了每页篇数的接口）、没有新文章的页（接口忽略了翻页参数）或达到 catalog_max_pages 时停止
+        """
+        first = self.fetch_catalog_page(index, self.author_catalog_url(index, author_uid, 1))
+        if not first or not first[0]:
+            return []
+        articles, since_id = first
+        seen = {catalog_key(article) for article in articles}
+        page = 1
+        
+        def add_page(page_articles):
+            new_articles = [article for article in page_articles if catalog_key(article) not in seen]
+            seen.update(catalog_key(article) for article in new_articles)
+            articles.extend(new_articles)
+            return bool(new_articles)
+        
+        def is_last_page(page_articles):
+            return index == 3 and len(page_articles) < CATALOG_PAGE_SIZE
+        
+        if since_id is not None:
+            while since_id and page < self.catalog_max_pages:
+                page += 1
+                result = self.fetch_catalog_page(index, self.author_catalog_url(index, author_uid, page, since_id))
+                if not result or not add_page(result[0]):
+                    break
+                since_id = result[1]
+            return articles
+        
+        if is_last_page(articles):
+            return articles
+        while page < self.catalog_max_pages:
+            pages = range(page + 1, min(page + max(1, self.catalog_workers), self.catalog_max_pages) + 1)
+            results = list(executor.map(
+                lambda number: self.fetch_catalog_page(index, self.author_catalog_url(index, author_uid, number)), pages))
+            for result in results:
+                if not result or not add_page(result[0]) or is_last_page(result[0]):
+                    return articles
+            page = pages[-1]
+        return articles
+    
+    def get_author_catalog(self, author_uid, include_content=True):
+        """
+        完整作者目录：翻页获取三个作者文章列表接口的全部文章，按文章ID去重合并；
+        开启 catalog_content 时再并发获取其中每篇头条文章的完整正文。所有请求都经过主机限速器
+        """
+        print(f"正在获取作者 {author_uid} 的完整文章目录...")
+        workers = max(1, self.catalog_workers)
+        with ThreadPoolExecutor(max_workers=3) as endpoint_executor, \
+                ThreadPoolExecutor(max_workers=workers) as page_executor:
+            results = list(endpoint_executor.map(
+                lambda index: self.crawl_catalog_endpoint(index, author_uid, page_executor), (1, 2, 3)))
+        
+        # 按接口顺序合并，同一篇文章只保留一条，后面接口多出的字段补充进来
+        catalog = {}
+        for index, endpoint_articles in enumerate(results, 1):
+            print(f"作者目录 {index} 共 {len(endpoint_articles)} 篇")
+            for article in endpoint_articles:
+                entry = catalog.setdefault(catalog_key(article), article)
+                for field, value in article.items():
+                    if not entry.get(field):
+                        entry[field] = value
+        articles = list(catalog.values())
+        print(f"作者目录去重后共 {len(articles)} 篇")
+        
+        if include_content and self.catalog_content:
+            ttarticles = [article for article in articles if article_id_shape(catalog_key(article)) == 'ttarticle']
+            print(f"正在获取 {len(ttarticles)} 篇头条文章的完整正文（并发数: {workers}）")
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                contents = list(executor.map(lambda article: self.get_article_content(catalog_key(article)), ttarticles))
+            for article, article_data in zip(ttarticles, contents):
+                if article_data:
+                    for field in ('content', 'author', 'author_uid', 'publish_time'):
+                        if article_data.get(field):
+                            article[field] = article_data[field]
+        return articles
+    
+    def crawl_author(self, author_uid, output_name=None):
+        """归档整个作者：获取完整目录（开启 catalog_content 时包括每篇头条文章的正文）并保存"""
+        articles = self.get_author_catalog(author_uid)
+        if not articles:
+            print("未能获取到作者的文章目录")
+            return None
+        # 已获取正文的头条文章作为正文输出，其余只保留目录信息
+        full_articles = [article for article in articles if article.get('content')]
+        other_articles = [article for article in articles if not article.get('content')]
+        if not output_name:
+            output_name = f"weibo_author_{author_uid}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        json_file, md_file = self.save_results_with_chapters(full_articles, other_articles, output_name)
+        print(f"\n作者归档完成！完整正文: {len(full_articles)}篇，仅目录: {len(other_articles)}篇")
+        return {'articles': articles, 'files': {'json': json_file, 'txt': md_file}}
+    
+    def render_markdown(self, all_chapters, other_articles=[]):
+        """把章节和作者其他文章渲染为格式化后的Markdown文本"""
+        # 每章组装为一段文本，繁体转简体按段缓存并行处理
+        blocks = []
+        
+        if all_chapters:
+            # 组装所有章节内容
+            for i, chapter in enumerate(all_chapters):
+                title = chapter.get('title', '未知')
+                
+                content = chapter.get('content', '无内容')
+                # content中多行换行改成只空一行，没空行也换成空一行
+                # 将多个连续换行符替换为双个换行符（一个空行）
+                formatted_content = BLANK_LINES_PATTERN.sub('\n\n', content)
+                # 将单个换行符也替换为双个换行符（确保段落间有空行）
+                formatted_content = SINGLE_NEWLINE_PATTERN.sub('\n\n', formatted_content)
+                blocks.append(f"## {title}\n\n{formatted_content}\n\n")
+        
+        if other_articles:
+            for i, article in enumerate(other_articles, 1):
+                title = article.get('title', '未知')
+                article_url = article.get('url', '无链接')
+                content = article.get('content', '无内容')[:200] + '...'
+                formatted_content = BLANK_LINES_PATTERN.sub('\n', content)
+                blocks.append(f"## {title}\n{article_url}\n{formatted_content}\n\n")
+        
+        # 完成盘古之白、不可见字符清理、繁体转简体和标点符号转换，结果与整本书一次转换相同
+        with self.span('normalize', blocks=len(blocks)):
+            return text_normalizer.normalize_blocks(blocks, cache=self.convert_cache,
+                                                    workers=self.convert_workers, **MARKDOWN_QUOTES)
+    
+    def save_results_with_chapters(self, all_chapters, other_articles=[], output_name=None):
         """保存包含章节的爬取结果"""
+        with self.trace('save_results', force=True, chapters=len(all_chapters)):
+            return self._save_results_with_chapters(all_chapters, other_articles, output_name)
+    
+    def _save_results_with_chapters(self, all_chapters, other_articles, output_name):
         try:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            if not output_name:
+                output_name = f"ttarticle_chapters_{timestamp}"
             
             # 保存JSON格式
-            json_filename = f"ttarticle_chapters_{timestamp}.json"
+            json_filename = f"{output_name}.json"
             result_data = {
                 'all_chapters': all_chapters,
                 'other_articles': other_articles,
@@ -1027,52 +2736,14 @@ class WeiboTTArticleCrawler:
                 'total_other_articles': len(other_articles)
             }
             
-            with open(json_filename, 'w', encoding='utf-8') as f:
+            with self.span('write_json'), open(json_filename, 'w', encoding='utf-8') as f:
                 json.dump(result_data, f, ensure_ascii=False, indent=2)
             print(f"结果已保存到: {json_filename}")
             
             # 保存markdown格式
-            md_filename = f"ttarticle_chapters_{timestamp}.md"
-            
-            # 先组装所有内容为完整文本
-            full_content = []
+            md_filename = f"{output_name}.md"
             
-            if all_chapters:
-                # 组装所有章节内容
-                for i, chapter in enumerate(all_chapters):
-                    title = chapter.get('title', '未知')
-                    full_content.append(f"## {title}\n\n")
-                    
-                    content = chapter.get('content', '无内容')
-                    # content中多行换行改成只空一行，没空行也换成空一行
-                    import re
-                    # 将多个连续换行符替换为双个换行符（一个空行）
-                    formatted_content = re.sub(r'\n\s*\n+', '\n\n', content)
-                    # 将单个换行符也替换为双个换行符（确保段落间有空行）
-                    formatted_content = re.sub(r'(?<!\n)\n(?!\n)', '\n\n', formatted_content)
-                    full_content.append(f"{formatted_content}\n\n")
-            
-            if other_articles:
-                for i, article in enumerate(other_articles, 1):
-                    title = article.get('title', '未知')
-                    full_content.append(f"## {title}\n")
-                    
-                    article_url = article.get('url', '无链接')
-                    full_content.append(f"{article_url}\n")
-                    
-                    content = article.get('content', '无内容')[:200] + '...'
-                    import re
-                    formatted_content = re.sub(r'\n\s*\n+', '\n', content)
-                    full_content.append(f"{formatted_content}\n\n")
-            
-            # 将所有内容合并为一个字符串
-            final_text = ''.join(full_content)
-            
-            # 统一进行盘古之白格式化处理
-            final_formatted_text = self.add_pangu_spacing(final_text)
-            
-            # 应用繁体转简体和标点符号转换
-            final_converted_text = self.convert_to_simplified_fullwidth(final_formatted_text)
+            final_converted_text = self.render_markdown(all_chapters, other_articles)
             
             # 写入文件
             with open(md_filename, 'w', encoding='utf-8') as f:
@@ -1088,58 +2759,282 @@ class WeiboTTArticleCrawler:
         """保存爬取结果（兼容旧版本）"""
         return self.save_results_with_chapters([article_data], other_articles)
     
-    def crawl_all_chapters(self, start_url, max_chapters=50):
-        """连续爬取专栏的所有章节"""
+    def series_toc_from_catalog(self, article_data):
+        """从作者的完整目录中找出与当前章同一专栏（标题中专栏名相同）的头条文章，按章节序号排列"""
+        author_uid = article_data.get('author_uid')
+        series_name, _ = split_chapter_title(article_data.get('title', ''))
+        if not author_uid or not series_name:
+            return None
+        entries = []
+        for position, article in enumerate(self.get_author_catalog(author_uid, include_content=False)):
+            article_id = catalog_key(article)
+            name, number = split_chapter_title(article.get('title', ''))
+            if name == series_name and article_id_shape(article_id) == 'ttarticle':
+                entries.append((number, position, article_id))
+        if all(number is not None for number, _, _ in entries):
+            entries.sort()
+        return list(dict.fromkeys(article_id for _, _, article_id in entries))
+    
+    def discover_series_toc(self, article_data, article_id, series_toc=None):
+        """
+        目录发现：依次尝试详情数据中的专栏目录和作者目录，返回当前章之后按阅读顺序排列的章节ID；
+        目录必须同时包含当前章和下一章链接指向的章节，否则视为不可信
+        """
+        next_match = CATALOG_ID_PATTERN.search(article_data.get('next_chapter_url') or '')
+        if not next_match:
+            return None
+        next_id = next_match.group(1)
+        sources = (('详情数据', lambda: series_toc), ('作者目录', lambda: self.series_toc_from_catalog(article_data)))
+        for name, load in sources:
+            with self.span('discover_toc', source=name):
+                ids = load()
+            toc = order_toc(ids, article_id, next_id) if ids else None
+            if toc:
+                print(f"从{name}发现专栏目录: 当前章之后还有 {len(toc)} 章")
+                return toc
+        print("未发现可用的专栏目录，按下一章链接逐章爬取")
+        return None
+    
+    def _announce_next_chapter(self, next_url):
+        """下一章链接已知时调用，流水线模式下立即开始预取"""
+        if self._prefetcher:
+            self._prefetcher.schedule(next_url)
+    
+    def fetch_chapter(self, article_id):
+        """获取章节内容，优先使用已预取的结果"""
+        future = self._prefetcher.take(article_id) if self._prefetcher else None
+        if future:
+            print(f"使用预取结果: {article_id}")
+            with self.span('prefetch_wait', article_id=article_id):
+                return future.result()
+        return self.get_article_content(article_id)
+    
+    def journal_path_for(self, start_url):
+        """章节日志文件路径（按起始文章ID区分）"""
+        article_id = self.extract_article_id_from_url(start_url) or 'unknown'
+        return f"ttarticle_journal_{article_id}.jsonl"
+    
+    def crawl_all_chapters(self, start_url, max_chapters=50, chapter_sink=None, first_number=1):
+        """
+        连续爬取专栏的所有章节（提供chapter_sink时逐章交给它处理而不在内存中保留）
+        first_number是第一章的章节编号，增量更新时从上次的章节数之后编号，章节日志中记录的就是最终编号
+        """
         all_chapters = []
         current_url = start_url
         chapter_count = 0
         
-        while current_url and chapter_count < max_chapters:
-            try:
-                print(f"\n正在爬取第 {chapter_count + 1} 章: {current_url}")
-                
-                # 提取文章ID
-                article_id = self.extract_article_id_from_url(current_url)
-                if not article_id:
-                    print("无法提取文章ID，停止爬取")
-                    break
-                
-                # 获取文章内容
-                article_data = self.get_article_content(article_id)
-                if not article_data:
-                    print("无法获取文章内容，停止爬取")
-                    break
-                
-                # 检查是否获取到有效内容
-                if not article_data.get('content') and not article_data.get('title'):
-                    print(f"第 {chapter_count + 1} 章没有有效内容，可能需要登录或被限制访问")
-                    break
-                
-                # 添加章节编号
-                article_data['chapter_number'] = chapter_count + 1
-                all_chapters.append(article_data)
-                
-                print(f"成功获取第 {chapter_count + 1} 章: {article_data.get('title', '无标题')}")
-                
-                # 查找下一章链接
-                next_url = article_data.get('next_chapter_url')
-                if next_url:
-                    print(f"找到下一章链接: {next_url}")
-                    current_url = next_url
-                    chapter_count += 1
-                    time.sleep(3)  # 添加更长的延迟避免被限制
+        journal = None
+        if self.use_journal:
+            journal = ChapterJournal(self.journal_path_for(start_url))
+            if self.resume:
+                all_chapters, current_url = journal.load()
+                if all_chapters:
+                    chapter_count = len(all_chapters)
+                    print(f"从章节日志恢复了 {chapter_count} 章，继续爬取: {current_url or '无（已爬取完成）'}")
                 else:
-                    print("未找到下一章链接，爬取完成")
+                    current_url = start_url
+            else:
+                journal.reset()
+            print(f"章节日志: {journal.path}")
+        
+        if chapter_sink:
+            for chapter in all_chapters:
+                chapter_sink(chapter)
+            all_chapters = []
+        
+        if self.prefetch_depth > 0 or self.discover_toc:
+            if self.prefetch_depth > 0:
+                print(f"流水线预取已开启，预取深度: {self.prefetch_depth}")
+            # 目录发现模式下预取器的线程数取两者较大值，预取深度为0时不随下一章链接预取
+            workers = max(self.prefetch_depth, self.toc_workers if self.discover_toc else 0)
+            self._prefetcher = ChapterPrefetcher(self, self.prefetch_depth, max_chapters - chapter_count - 1, workers)
+        toc = None  # 目录中尚未确认的章节ID（按阅读顺序）
+        toc_checked = not self.discover_toc
+        
+        try:
+            while current_url and chapter_count < max_chapters:
+                try:
+                    with self.trace(f"chapter {chapter_count + 1}", url=current_url):
+                        print(f"\n正在爬取第 {chapter_count + 1} 章: {current_url}")
+                        
+                        # 提取文章ID
+                        article_id = self.extract_article_id_from_url(current_url)
+                        if not article_id:
+                            print("无法提取文章ID，停止爬取")
+                            break
+                        
+                        # 获取文章内容
+                        article_data = self.fetch_chapter(article_id)
+                        if not article_data:
+                            print("无法获取文章内容，停止爬取")
+                            break
+                        
+                        # 检查是否获取到有效内容
+                        if not article_data.get('content') and not article_data.get('title'):
+                            print(f"第 {chapter_count + 1} 章没有有效内容，可能需要登录或被限制访问")
+                            break
+                        
+                        # 本次爬取的第一章：发现专栏目录后并行获取其余章节，之后的下一章链接只用于确认顺序
+                        series_toc = article_data.pop('series_toc', None)
+                        if not toc_checked:
+                            toc_checked = True
+                            toc = self.discover_series_toc(article_data, article_id, series_toc)
+                            if toc:
+                                toc = toc[:max_chapters - chapter_count - 1]
+                                self._prefetcher.schedule_all(toc)
+                        elif toc:
+                            if toc[0] == article_id:
+                                toc.pop(0)
+                            else:
+                                print(f"下一章链接与专栏目录不一致，以下一章链接为准: {article_id}")
+                                toc = None
+                        
+                        # 添加章节编号
+                        article_data['chapter_number'] = first_number + chapter_count
+                        if self.metrics:
+                            self.metrics.record_chapter()
+                        if journal:
+                            journal.append(article_data)
+                        if chapter_sink:
+                            chapter_sink(article_data)
+                        else:
+                            all_chapters.append(article_data)
+                        
+                        print(f"成功获取第 {chapter_count + 1} 章: {article_data.get('title', '无标题')}")
+                        
+                        # 查找下一章链接
+                        next_url = article_data.get('next_chapter_url')
+                        if next_url:
+                            print(f"找到下一章链接: {next_url}")
+                            current_url = next_url
+                            chapter_count += 1
+                            if self._prefetcher and chapter_count < max_chapters:
+                                self._prefetcher.schedule(next_url)
+                        else:
+                            print("未找到下一章链接，爬取完成")
+                            break
+                        
+                except Exception as e:
+                    print(f"爬取第 {chapter_count + 1} 章时出错: {e}")
                     break
-                    
-            except Exception as e:
-                print(f"爬取第 {chapter_count + 1} 章时出错: {e}")
-                break
+        finally:
+            if self._prefetcher:
+                self._prefetcher.close()
+                self._prefetcher = None
         
         return all_chapters
     
-    def crawl_article(self, url, max_chapters=50):
+    def load_previous_chapters(self, previous_file):
+        """读取上次的输出文件（JSON结果或章节日志），返回（结果数据, 章节列表）"""
+        if previous_file.endswith('.jsonl'):
+            chapters, _ = ChapterJournal(previous_file).load()
+            return None, chapters
+        with open(previous_file, 'r', encoding='utf-8') as f:
+            result_data = json.load(f)
+        if 'chapters_file' in result_data:
+            # 流式输出的汇总文件，章节保存在同目录的JSONL文件中
+            chapters_file = os.path.join(os.path.dirname(previous_file), result_data['chapters_file'])
+            with open(chapters_file, 'r', encoding='utf-8') as f:
+                return result_data, [json.loads(line) for line in f if line.strip()]
+        return result_data, result_data.get('all_chapters', [])
+    
+    def chapter_article_id(self, chapter):
+        """从章节记录的来源链接中提取文章ID"""
+        source_url = chapter.get('source_url', '')
+        id_match = re.search(r'/id/([^/?#]+)', source_url)
+        if id_match:
+            return id_match.group(1)
+        return self.extract_article_id_from_url(source_url)
+    
+    def update_series(self, previous_file, max_chapters=50):
+        """增量更新：从上次的最后一章继续，只爬取新增章节并追加到原有的JSON和Markdown文件"""
+        try:
+            result_data, previous_chapters = self.load_previous_chapters(previous_file)
+            if not previous_chapters:
+                print(f"上次的输出中没有章节: {previous_file}")
+                return None
+            
+            last_chapter = previous_chapters[-1]
+            print(f"上次已爬取 {len(previous_chapters)} 章，最后一章: {last_chapter.get('title', '无标题')}")
+            
+            # 上次因章节数上限停止时已知下一章链接，否则重新检查最后一章的sibling.next
+            next_url = last_chapter.get('next_chapter_url')
+            if not next_url:
+                article_id = self.chapter_article_id(last_chapter)
+                if not article_id:
+                    print("无法确定最后一章的文章ID")
+                    return None
+                print(f"重新检查最后一章是否有下一章: {article_id}")
+                self.refresh_cache = True
+                try:
+                    refreshed = self.get_article_content(article_id)
+                finally:
+                    self.refresh_cache = False
+                next_url = refreshed.get('next_chapter_url') if refreshed else None
+            
+            if not next_url:
+                print("没有新章节")
+                return []
+            
+            new_chapters = self.crawl_all_chapters(next_url, max_chapters, first_number=len(previous_chapters) + 1)
+            if not new_chapters:
+                print("没有获取到新章节")
+                return []
+            
+            self.append_results(previous_file, result_data, new_chapters)
+            print(f"\n更新完成！新增 {len(new_chapters)} 章，共 {len(previous_chapters) + len(new_chapters)} 章")
+            return new_chapters
+        except Exception as e:
+            print(f"增量更新失败: {e}")
+            return None
+    
+    def append_results(self, previous_file, result_data, new_chapters):
+        """把新章节追加到上次的JSON（或章节日志）和Markdown文件"""
+        if result_data is None:
+            journal = ChapterJournal(previous_file)
+            for chapter in new_chapters:
+                journal.append(chapter)
+            print(f"新章节已追加到: {previous_file}")
+        else:
+            if 'chapters_file' in result_data:
+                chapters_file = os.path.join(os.path.dirname(previous_file), result_data['chapters_file'])
+                with open(chapters_file, 'a', encoding='utf-8') as f:
+                    for chapter in new_chapters:
+                        f.write(json.dumps(chapter, ensure_ascii=False) + '\n')
+                result_data['total_chapters'] += len(new_chapters)
+            else:
+                result_data['all_chapters'].extend(new_chapters)
+                result_data['total_chapters'] = len(result_data['all_chapters'])
+            result_data['crawl_time'] = datetime.now().isoformat()
+            with open(previous_file, 'w', encoding='utf-8') as f:
+                json.dump(result_data, f, ensure_ascii=False, indent=2)
+            print(f"新章节已追加到: {previous_file}")
+        
+        md_filename = os.path.splitext(previous_file)[0] + '.md'
+        if not os.path.exists(md_filename):
+            return
+        new_text = self.render_markdown(new_chapters)
+        other_articles = (result_data or {}).get('other_articles') or []
+        if not other_articles:
+            with open(md_filename, 'a', encoding='utf-8') as f:
+                f.write(new_text)
+        else:
+            # 作者其他文章位于Markdown末尾，新章节需要插入到它们之前
+            with open(md_filename, 'r', encoding='utf-8') as f:
+                md_text = f.read()
+            tail = self.render_markdown([], other_articles)
+            if md_text.endswith(tail):
+                md_text = md_text[:len(md_text) - len(tail)] + new_text + tail
+            else:
+                md_text += new_text
+            with open(md_filename, 'w', encoding='utf-8') as f:
+                f.write(md_text)
+        print(f"新章节已追加到: {md_filename}")
+    
+    def crawl_article(self, url, max_chapters=50, output_name=None):
         """爬取指定URL的文章及其后续章节"""
+        if self.stream_output:
+            return self.crawl_article_streaming(url, max_chapters, output_name)
         try:
             print(f"开始爬取微博头条文章: {url}")
             
@@ -1158,7 +3053,7 @@ class WeiboTTArticleCrawler:
             other_articles = self.get_author_articles(main_article)
             
             # 保存结果
-            json_file, txt_file = self.save_results_with_chapters(all_chapters, other_articles)
+            json_file, txt_file = self.save_results_with_chapters(all_chapters, other_articles, output_name)
             
             print(f"\n爬取完成！")
             print(f"专栏章节: {len(all_chapters)}篇")
@@ -1175,6 +3070,260 @@ class WeiboTTArticleCrawler:
         except Exception as e:
             print(f"爬取过程中出错: {e}")
             return None
+    
+    def crawl_article_streaming(self, url, max_chapters=50, output_name=None):
+        """流式爬取：每章写入JSONL和Markdown后即从内存释放"""
+        if not output_name:
+            output_name = f"ttarticle_chapters_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        writer = ChapterStreamWriter(output_name, self.render_markdown)
+        try:
+            print(f"开始流式爬取微博头条文章: {url}")
+            
+            self.crawl_all_chapters(url, max_chapters, chapter_sink=writer.write_chapter)
+            
+            if not writer.count:
+                print("未能获取任何章节")
+                return None
+            
+            # 尝试获取作者的其他文章
+            other_articles = self.get_author_articles(writer.first_chapter)
+            
+            json_file, md_file = writer.finalize(other_articles)
+            
+            print(f"\n爬取完成！")
+            print(f"专栏章节: {writer.count}篇")
+            print(f"作者其他文章: {len(other_articles)}篇")
+            print(f"总计: {writer.count + len(other_articles)}篇文章")
+            
+            return {
+                'total_chapters': writer.count,
+                'main_article': writer.first_chapter,
+                'other_articles': other_articles,
+                'files': {'json': json_file, 'jsonl': writer.chapters_file, 'txt': md_file}
+            }
+        except Exception as e:
+            print(f"爬取过程中出错: {e}")
+            return None
+        finally:
+            writer.close()
+
+def load_batch_urls(batch_file):
+    """从文件读取批量爬取的起始URL（每行一个，忽略空行和#注释）"""
+    with open(batch_file, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.strip().startswith('#')]
+
+
+def crawl_batch(urls, crawler_factory, max_chapters=50, concurrency=4):
+    """并发爬取多个专栏，每个专栏使用独立的爬虫实例并分别保存结果"""
+    def crawl_one(url):
+        crawler = crawler_factory()
+        series_id = crawler.extract_article_id_from_url(url) or 'unknown'
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return crawler.crawl_article(url, max_chapters, output_name=f"ttarticle_chapters_{series_id}_{timestamp}")
+    
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        futures = {executor.submit(crawl_one, url): url for url in urls}
+        for future in as_completed(futures):
+            url = futures[future]
+            try:
+                results[url] = future.result()
+            except Exception as e:
+                print(f"爬取专栏失败 {url}: {e}")
+                results[url] = None
+    
+    succeeded = sum(1 for result in results.values() if result)
+    print(f"\n批量爬取完成: 成功 {succeeded}/{len(urls)} 个专栏")
+    return results
+
+
+class SavedResponseStore:
+    """离线重新解析使用的响应来源：按（接口, 文章ID）提供调试文件或响应归档中保存的响应，接口与ResponseCache.get相同"""
+    
+    DEBUG_DUMP_PATTERN = re.compile(r'^article_debug_(\d+)_(.+)\.(html|json)$')
+    HEADER_COMMENT_PATTERN = re.compile(r'^<!-- ([^:]+): (.*) -->$')
+    
+    def __init__(self):
+        self.responses = {}  # "接口|文章ID" -> （保存时间, CachedResponse）
+    
+    def key_for(self, url):
+        endpoint, article_id = split_endpoint_url(url)
+        return f"{endpoint}|{article_id}"
+    
+    def add(self, response, saved_at):
+        """加入一个响应；同一接口有多个响应时优先状态码200的，其次保存时间较新的"""
+        key = self.key_for(response.url)
+        current = self.responses.get(key)
+        rank = (response.status_code == 200, saved_at)
+        if current is None or rank >= (current[1].status_code == 200, current[0]):
+            self.responses[key] = (saved_at, response)
+    
+    def add_source(self, source):
+        """加入 collect_saved_responses 返回的一个来源"""
+        kind, path, fetch = source
+        if kind == 'archive':
+            self.add(ResponseArchive.read_response(path, fetch), fetch['fetched_at'])
+        elif kind == 'html':
+            self.add(self.read_debug_html(path), datetime.fromtimestamp(os.path.getmtime(path)).isoformat())
+        else:
+            self.add(self.read_debug_json(path), datetime.fromtimestamp(os.path.getmtime(path)).isoformat())
+    
+    @classmethod
+    def read_debug_html(cls, path):
+        """读取 article_debug_*.html：开头的注释行记录了URL、状态码和响应头，之后是完整的响应文本"""
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            meta = {}
+            while len(meta) < 5:
+                line = f.readline()
+                match = cls.HEADER_COMMENT_PATTERN.match(line.rstrip('\n'))
+                if not match:
+                    raise ValueError(f"不是调试文件: {path}")
+                meta[match.group(1)] = match.group(2)
+            text = f.read()
+        try:
+            headers = ast.literal_eval(meta['Response Headers'])
+        except (ValueError, SyntaxError):
+            headers = {'Content-Type': meta['Response Content Type']}
+        return CachedResponse(meta['API URL'], int(meta['Status Code']), headers, text.encode('utf-8'), 'utf-8')
+    
+    @staticmethod
+    def read_debug_json(path):
+        """读取 article_debug_*.json（只有解析后的JSON，重新序列化为响应文本）"""
+        with open(path, 'r', encoding='utf-8') as f:
+            dump = json.load(f)
+        content = json.dumps(dump['response_data'], ensure_ascii=False).encode('utf-8')
+        return CachedResponse(dump['api_url'], dump['status_code'], dump['headers'], content, 'utf-8')
+    
+    def get(self, url, allow_expired=False):
+        entry = self.responses.get(self.key_for(url))
+        return entry[1] if entry else None
+
+
+def collect_saved_responses(directory):
+    """
+    查找目录中的调试文件和响应归档，按文章ID分组
+    返回 {文章ID: [来源, ...]} 和 {文章ID: 最早保存时间}；来源为（'html'|'json'|'archive', 路径, fetch记录）
+    同一次请求同时有.html和.json调试文件时只使用保存了原始响应文本的.html
+    """
+    sources = {}
+    first_seen = {}
+    
+    def add(article_id, source, saved_at):
+        sources.setdefault(article_id, []).append(source)
+        if article_id not in first_seen or saved_at < first_seen[article_id]:
+            first_seen[article_id] = saved_at
+    
+    for root, _, filenames in os.walk(directory):
+        for filename in sorted(filenames):
+            path = os.path.join(root, filename)
+            match = SavedResponseStore.DEBUG_DUMP_PATTERN.match(filename)
+            if match:
+                if match.group(3) == 'json' and os.path.exists(path[:-len('json')] + 'html'):
+                    continue
+                saved_at = datetime.fromtimestamp(os.path.getmtime(path)).isoformat()
+                add(match.group(2), (match.group(3), path, None), saved_at)
+            elif filename.startswith('weibo_archive_') and filename.endswith('.gz'):
+                for header, _ in ResponseArchive.iter_records(path, with_payload=False):
+                    if header['type'] == 'fetch':
+                        add(header['article_id'], ('archive', path, header), header['fetched_at'])
+    
+    # 只保留请求过文章详情接口的文章ID（排除作者文章列表等请求）
+    detail_endpoints = {split_endpoint_url(url)[0] for url in WeiboTTArticleCrawler.build_detail_api_urls(None, '0')}
+    article_ids = {article_id for article_id, article_sources in sources.items()
+                   if any(kind != 'archive' or fetch['endpoint'] in detail_endpoints
+                          for kind, _, fetch in article_sources)}
+    return {article_id: sources[article_id] for article_id in article_ids}, first_seen
+
+
+_reparse_crawler = None
+
+
+def _init_reparse_worker():
+    global _reparse_crawler
+    with contextlib.redirect_stdout(io.StringIO()):
+        _reparse_crawler = WeiboTTArticleCrawler(cookies_dict={'reparse': '1'})
+    _reparse_crawler.offline = True
+    _reparse_crawler.use_journal = False
+
+
+def reparse_article(article_id, sources):
+    """在工作进程中用保存的响应离线解析一篇文章，返回（文章ID, 文章数据或None）"""
+    store = SavedResponseStore()
+    for source in sources:
+        try:
+            store.add_source(source)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"读取保存的响应失败 {source[1]}: {e}")
+    _reparse_crawler.cache = store
+    with contextlib.redirect_stdout(io.StringIO()):
+        article_data = _reparse_crawler.get_article_content(article_id)
+    return article_id, article_data
+
+
+def order_by_next_chapter(chapters_by_id, first_seen, crawler):
+    """按 next_chapter_url 链排列章节：从没有被其他章节指向的章节开始，多条链按最早保存时间排列"""
+    next_of = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for article_id, chapter in chapters_by_id.items():
+            next_url = chapter.get('next_chapter_url')
+            next_id = crawler.extract_article_id_from_url(next_url) if next_url else None
+            if next_id in chapters_by_id and next_id != article_id:
+                next_of[article_id] = next_id
+    pointed = set(next_of.values())
+    by_time = sorted(chapters_by_id, key=lambda article_id: (first_seen.get(article_id, ''), article_id))
+    heads = [article_id for article_id in by_time if article_id not in pointed]
+    
+    ordered, visited = [], set()
+    # 先沿链排列，剩余的（链中出现环时）按保存时间追加
+    for article_id in heads + by_time:
+        while article_id and article_id not in visited:
+            visited.add(article_id)
+            ordered.append(chapters_by_id[article_id])
+            article_id = next_of.get(article_id)
+    return ordered
+
+
+def reparse_saved_responses(directory, crawler, workers=None, output_name=None):
+    """用调试文件和响应归档离线重新解析所有章节（进程池并行），按下一章链接排序后保存JSON和Markdown"""
+    sources, first_seen = collect_saved_responses(directory)
+    if not sources:
+        print(f"目录中没有找到调试文件或响应归档: {directory}")
+        return None
+    
+    workers = workers or os.cpu_count() or 1
+    print(f"找到 {len(sources)} 篇文章的保存响应，使用 {workers} 个进程重新解析")
+    started = time.perf_counter()
+    chapters_by_id = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_reparse_worker) as executor:
+        futures = [executor.submit(reparse_article, article_id, article_sources)
+                   for article_id, article_sources in sources.items()]
+        for future in as_completed(futures):
+            article_id, article_data = future.result()
+            if article_data and (article_data.get('content') or article_data.get('title')):
+                chapters_by_id[article_id] = article_data
+            else:
+                print(f"文章 {article_id} 无法从保存的响应中解析")
+    
+    all_chapters = order_by_next_chapter(chapters_by_id, first_seen, crawler)
+    for number, chapter in enumerate(all_chapters, 1):
+        chapter['chapter_number'] = number
+    print(f"重新解析完成: {len(all_chapters)}/{len(sources)} 篇，耗时 {time.perf_counter() - started:.2f} 秒")
+    if not all_chapters:
+        return None
+    
+    if not output_name:
+        output_name = f"ttarticle_chapters_reparsed_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    return crawler.save_results_with_chapters(all_chapters, [], output_name)
+
+
+def parse_host_rates(host_rate_args, value_type=float):
+    """解析 HOST=RATE 格式的按主机参数（限速、连接池大小）"""
+    host_rates = {}
+    for item in host_rate_args or []:
+        host, _, rate = item.partition('=')
+        host_rates[host.strip()] = value_type(rate)
+    return host_rates
+
 
 def main():
     parser = argparse.ArgumentParser(description='微博头条文章爬虫 - Cookie支持版本')
@@ -1182,11 +3331,61 @@ def main():
     parser.add_argument('--cookies', '-c', help='Cookie文件路径 (支持.json或.txt格式)')
     parser.add_argument('--max-chapters', '-m', type=int, default=50, help='最大爬取章节数 (默认: 50)')
     parser.add_argument('--debug', '-d', action='store_true', help='启用调试模式，保存调试文件')
+    parser.add_argument('--async-fetch', '-a', action='store_true', help='并发请求所有详情API，采用最先成功的结果')
+    parser.add_argument('--fanout', type=int, default=6, help='并发模式下同时请求的API数 (默认: 6)')
+    parser.add_argument('--prefetch', type=int, default=0, help='流水线预取深度，下一章链接已知即开始获取 (默认: 0，关闭)')
+    parser.add_argument('--toc', action='store_true', help='目录发现：先从详情数据或作者目录获取专栏的完整章节列表，再并行获取各章，下一章链接只用于确认顺序')
+    parser.add_argument('--toc-workers', type=int, default=4, help='按目录并行获取章节的并发数，仍遵守主机限速 (默认: 4)')
+    parser.add_argument('--batch', '-b', help='批量模式：从文件读取多个专栏起始URL（每行一个）')
+    parser.add_argument('--concurrency', type=int, default=4, help='批量模式下同时爬取的专栏数 (默认: 4)')
+    parser.add_argument('--rate', type=float, default=1.0, help='每个主机每秒允许的请求数 (默认: 1.0)')
+    parser.add_argument('--host-rate', action='append', metavar='HOST=RATE', help='为指定主机设置每秒请求数，可重复使用')
+    parser.add_argument('--adaptive-rate', action='store_true', help='根据响应状态和延迟自适应调整请求速率 (AIMD)')
+    parser.add_argument('--max-rate', type=float, default=4.0, help='自适应模式下每个主机的最高请求速率 (默认: 4.0)')
+    parser.add_argument('--pool-size', type=int, default=10, help='每个主机保留的keep-alive连接数 (默认: 10)')
+    parser.add_argument('--host-pool-size', action='append', metavar='HOST=N', help='为指定主机设置连接池大小，可重复使用')
+    parser.add_argument('--retries', type=int, default=3, help='连接错误和5xx响应的自动重试次数，0表示不重试 (默认: 3)')
+    parser.add_argument('--retry-backoff', type=float, default=0.5, help='重试的指数退避系数，单位秒 (默认: 0.5)')
+    parser.add_argument('--cache-dir', default='.weibo_cache', help='响应缓存目录 (默认: .weibo_cache)')
+    parser.add_argument('--cache-size', type=int, default=200, help='响应缓存容量上限，单位MB (默认: 200)')
+    parser.add_argument('--no-cache', action='store_true', help='不使用响应缓存')
+    parser.add_argument('--offline', action='store_true', help='离线模式：只从响应缓存读取，不发送任何网络请求')
+    parser.add_argument('--validators-file', default='.weibo_validators.json', help='条件请求校验信息文件：保存ETag/Last-Modified和章节哈希，解析好的章节存放在同名_chapters目录中，重新爬取时未修改的章节不再下载和解析 (默认: .weibo_validators.json)')
+    parser.add_argument('--no-revalidate', action='store_true', help='不发送条件请求，每次都完整下载章节')
+    parser.add_argument('--health-file', default='.weibo_endpoint_health.json', help='接口健康记录文件，跨运行保存 (默认: .weibo_endpoint_health.json)')
+    parser.add_argument('--no-health', action='store_true', help='不使用接口健康记分板，按固定顺序尝试所有接口')
+    parser.add_argument('--resume', '-r', action='store_true', help='从章节日志的最后位置继续爬取，已完成的章节不再请求')
+    parser.add_argument('--no-journal', action='store_true', help='不写入章节日志')
+    parser.add_argument('--stream', '-s', action='store_true', help='流式输出：每爬取一章立即写入JSONL和Markdown文件')
+    parser.add_argument('--update', '-u', metavar='FILE', help='增量更新：读取上次输出的JSON文件（或章节日志），只爬取新增章节并追加到原文件')
+    parser.add_argument('--convert-workers', type=int, default=0, help='繁体转简体的并行进程数 (默认: 0，使用CPU核数)')
+    parser.add_argument('--convert-cache', default='.weibo_zhconv_cache', help='繁简转换缓存目录，未改动的章节不再重复转换 (默认: .weibo_zhconv_cache)')
+    parser.add_argument('--convert-cache-size', type=int, default=100, help='繁简转换缓存容量上限（MB），超出时淘汰最久未使用的条目 (默认: 100)')
+    parser.add_argument('--no-convert-cache', action='store_true', help='不使用繁简转换缓存')
+    parser.add_argument('--archive-dir', default='weibo_archives', help='原始响应归档目录，每次运行写入一个归档文件 (默认: weibo_archives)')
+    parser.add_argument('--no-archive', action='store_true', help='不归档原始响应')
+    parser.add_argument('--metrics-dir', default='weibo_metrics', help='运行指标目录：写入Prometheus文本格式的weibo_crawler.prom和每次运行的JSON摘要 (默认: weibo_metrics)')
+    parser.add_argument('--metrics-interval', type=int, default=60, help='长时间运行时每隔多少秒写出一次运行指标，0表示只在结束时写出 (默认: 60)')
+    parser.add_argument('--no-metrics', action='store_true', help='不统计运行指标')
+    parser.add_argument('--trace', nargs='?', const='', metavar='FILE', help='记录每章的追踪span并导出为Chrome trace JSON (默认文件: weibo_trace_时间戳.json)')
+    parser.add_argument('--trace-sample', type=float, default=1.0, help='追踪的章节采样率，0-1 (默认: 1.0，记录每一章)')
+    parser.add_argument('--profile', nargs='?', const='', metavar='PREFIX', help='性能分析：写出cProfile统计文件和折叠栈文件，并打印各阶段耗时 (默认文件名前缀: weibo_profile_时间戳)')
+    parser.add_argument('--profile-interval', type=float, default=5.0, help='性能分析的调用栈采样间隔，单位毫秒 (默认: 5)')
+    parser.add_argument('--base-url', help='把所有请求转发到该地址（如本地模拟服务器 http://127.0.0.1:8000），请求路径为 /主机/路径')
+    parser.add_argument('--reparse', metavar='DIR', help='离线重新解析：用目录中的调试文件(article_debug_*)和响应归档重建章节并保存结果，不发送网络请求')
+    parser.add_argument('--reparse-workers', type=int, default=0, help='重新解析使用的进程数 (默认: 0，使用CPU核数)')
+    parser.add_argument('--full-catalog', action='store_true', help='完整作者目录：翻页获取作者的全部文章（按文章ID去重），代替只取第一页')
+    parser.add_argument('--catalog-pages', type=int, default=50, help='每个作者目录接口最多翻的页数 (默认: 50)')
+    parser.add_argument('--catalog-workers', type=int, default=4, help='作者目录翻页和正文获取的并发数，仍遵守主机限速 (默认: 4)')
+    parser.add_argument('--catalog-content', action='store_true', help='同时获取作者目录中每篇头条文章的完整正文（隐含 --full-catalog）')
+    parser.add_argument('--author', metavar='UID', help='归档整个作者：获取该UID的完整文章目录并保存，配合 --catalog-content 保存全部正文')
     
     args = parser.parse_args()
     
     # 如果没有提供URL，提示用户输入
-    if not args.url:
+    if args.batch or args.update or args.reparse or args.author:
+        url = None
+    elif not args.url:
         print("微博头条文章爬虫 - Cookie支持版本")
         print("=" * 50)
         url = input("请输入要爬取的微博头条文章URL: ").strip()
@@ -1224,18 +3423,154 @@ def main():
             print("   或创建cookies.json文件，格式如: {\"SUB\": \"value\", \"SUBP\": \"value\"}")
             print("   或使用--cookies参数指定cookie文件路径")
     
-    # 创建爬虫实例
-    crawler = WeiboTTArticleCrawler(cookies_file=cookies_file)
+    # 所有爬虫实例共享同一个按主机限速的令牌桶
+    if args.adaptive_rate:
+        rate_limiter = AdaptiveHostRateLimiter(args.rate, parse_host_rates(args.host_rate), max_rate=args.max_rate)
+    else:
+        rate_limiter = HostRateLimiter(args.rate, parse_host_rates(args.host_rate))
+    
+    # 所有爬虫实例共享同一组连接池，keep-alive连接跨实例、跨接口复用
+    transport = HttpTransport(args.pool_size, parse_host_rates(args.host_pool_size, int), args.retries, args.retry_backoff)
+    
+    # 所有爬虫实例共享同一个响应缓存
+    response_cache = None
+    if not args.no_cache:
+        response_cache = ResponseCache(args.cache_dir, args.cache_size * 1024 * 1024)
+    elif args.offline:
+        print("错误：离线模式需要使用响应缓存，不能与--no-cache同时使用")
+        return
+    
+    # 所有爬虫实例共享同一份条件请求校验信息
+    validators = None if args.no_revalidate else ValidatorStore(args.validators_file)
+    
+    # 所有爬虫实例共享同一个接口健康记分板
+    scoreboard = None if args.no_health else EndpointScoreboard(args.health_file)
+    
+    # 所有爬虫实例共享同一个繁简转换缓存
+    convert_cache = None
+    if not args.no_convert_cache:
+        convert_cache = text_normalizer.ConversionCache(args.convert_cache, args.convert_cache_size * 1024 * 1024)
+    
+    # 本次运行的所有请求写入同一个响应归档文件
+    archive = None
+    if not args.no_archive:
+        archive_name = f"weibo_archive_{datetime.now().strftime('%Y%m%d_%H%M%S')}.gz"
+        archive = ResponseArchive(os.path.join(args.archive_dir, archive_name))
+    
+    # 所有爬虫实例共享同一个运行指标；发送SIGUSR1信号可随时写出当前指标
+    metrics = None
+    if not args.no_metrics:
+        metrics = MetricsRegistry(args.metrics_dir, args.metrics_interval)
+        if hasattr(signal, 'SIGUSR1'):
+            signal.signal(signal.SIGUSR1, lambda signum, frame: metrics.write())
+    
+    # 所有爬虫实例写入同一个追踪文件
+    tracer = None
+    if args.trace is not None:
+        trace_file = args.trace or f"weibo_trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        tracer = Tracer(trace_file, args.trace_sample)
+    
+    def create_crawler():
+        # 创建爬虫实例
+        crawler = WeiboTTArticleCrawler(cookies_file=cookies_file, rate_limiter=rate_limiter,
+                                        response_cache=response_cache, scoreboard=scoreboard,
+                                        convert_cache=convert_cache, archive=archive, metrics=metrics,
+                                        tracer=tracer, transport=transport, validators=validators)
+        crawler.convert_workers = args.convert_workers or None
+        crawler.offline = args.offline
+        crawler.use_journal = not args.no_journal
+        crawler.resume = args.resume
+        crawler.stream_output = args.stream
+        
+        # 设置调试模式
+        crawler.debug_mode = args.debug
+        
+        # 设置并发请求模式
+        crawler.async_fetch = args.async_fetch
+        crawler.fanout = args.fanout
+        crawler.prefetch_depth = args.prefetch
+        crawler.discover_toc = args.toc
+        crawler.toc_workers = args.toc_workers
+        crawler.base_url = args.base_url
+        
+        # 设置作者目录模式
+        crawler.full_catalog = args.full_catalog or args.catalog_content
+        crawler.catalog_max_pages = args.catalog_pages
+        crawler.catalog_workers = args.catalog_workers
+        crawler.catalog_content = args.catalog_content
+        return crawler
+    
+    def finish_run():
+        # 保存共享状态并输出运行统计
+        if profiler:
+            profiler.stop_and_report()
+        rate_limiter.print_summary()
+        transport.print_summary()
+        if response_cache:
+            response_cache.close()
+            response_cache.print_summary()
+        if validators:
+            validators.save()
+            validators.print_summary()
+        if scoreboard:
+            scoreboard.save()
+            scoreboard.print_summary()
+        if convert_cache:
+            convert_cache.print_summary()
+        if archive:
+            archive.close()
+            archive.print_summary()
+        if metrics:
+            metrics.print_summary()
+        if tracer:
+            tracer.write()
+    
+    # 性能分析覆盖之后的整个爬取过程，在finish_run中停止
+    profiler = None
+    if args.profile is not None:
+        profile_prefix = args.profile or f"weibo_profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        profiler = CrawlProfiler(profile_prefix, args.profile_interval / 1000)
+        profiler.start()
+    
+    if args.reparse:
+        print(f"\n离线重新解析: {args.reparse}")
+        reparse_saved_responses(args.reparse, create_crawler(), args.reparse_workers or None)
+        finish_run()
+        return
+    
+    if args.author:
+        print(f"\n归档作者: {args.author}{'（包括全部正文）' if args.catalog_content else ''}")
+        create_crawler().crawl_author(args.author)
+        finish_run()
+        return
+    
+    if args.update:
+        print(f"\n增量更新: {args.update}")
+        create_crawler().update_series(args.update, args.max_chapters)
+        finish_run()
+        return
+    
+    if args.batch:
+        urls = load_batch_urls(args.batch)
+        print(f"\n批量爬取: {len(urls)} 个专栏，并发数: {args.concurrency}，每主机限速: {args.rate} 请求/秒")
+        crawl_batch(urls, create_crawler, args.max_chapters, args.concurrency)
+        finish_run()
+        return
     
-    # 设置调试模式
-    crawler.debug_mode = args.debug
+    crawler = create_crawler()
     
     print(f"\n开始爬取: {url}")
     print(f"最大章节数: {args.max_chapters}")
+    print(f"每主机限速: {args.rate} 请求/秒{' (自适应)' if args.adaptive_rate else ''}")
+    print(f"响应缓存: {'关闭' if args.no_cache else args.cache_dir}{' (离线模式)' if args.offline else ''}")
     print(f"调试模式: {'开启' if args.debug else '关闭'}")
+    print(f"并发请求: {f'开启 (并发数: {args.fanout})' if args.async_fetch else '关闭'}")
+    print(f"流水线预取: {f'开启 (深度: {args.prefetch})' if args.prefetch > 0 else '关闭'}")
+    print(f"目录发现: {f'开启 (并发数: {args.toc_workers})' if args.toc else '关闭'}")
     
     # 开始爬取
     result = crawler.crawl_article(url, args.max_chapters)
+    finish_run()
     
     if result:
         print("\n爬取成功！")